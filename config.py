@@ -2,11 +2,17 @@
 Configuration for Market Cap Options Tracker
 """
 
+import bisect
 import json
 from dataclasses import dataclass, asdict
 from typing import Dict, List, Optional
 
 
+# Market cap categories and the caps separating them, smallest first
+MARKET_CAP_CATEGORIES = ['micro_cap', 'small_cap', 'mid_cap', 'large_cap', 'mega_cap']
+MARKET_CAP_BREAKPOINTS = [500_000_000, 2_000_000_000, 10_000_000_000, 100_000_000_000]
+
+
 @dataclass
 class TradingConfig:
     """Trading parameters"""
@@ -36,6 +42,36 @@ class TradingConfig:
     profit_exit_threshold: float = 0.40
     days_before_exp_exit: int = 7
     iv_spike_exit: float = 1.5
+    
+    # Monte Carlo expected returns (0 paths keeps the fixed-scenario estimate). Drift 0 scores each
+    # call's pricing edge against its own IV, which the engine's tiers in utils/chain_scoring.py are
+    # calibrated for; a real-world equity drift such as 0.08 adds a bullish tilt on top
+    monte_carlo_paths: int = 0
+    monte_carlo_seed: int = 42
+    monte_carlo_drift: float = 0.0
+    
+    # Bull call debit spreads, ranked alongside single calls
+    enable_spreads: bool = True
+    spread_max_width_pct: float = 0.10
+    spread_max_legs_apart: int = 5
+    
+    # Multipliers on the scoring terms (see WEIGHTED_TERMS in utils/chain_scoring.py); try them with --rerank
+    scoring_weights: Dict[str, float] = None
+    
+    def __post_init__(self):
+        if self.scoring_weights is None:
+            self.scoring_weights = {
+                'moneyness': 1.0,
+                'expiration': 1.0,
+                'liquidity': 1.0,
+                'delta': 1.0,
+                'theta': 1.0,
+                'gamma': 1.0,
+                'iv': 1.0,
+                'expected_return': 1.0,
+                'technical': 1.0,
+                'risk_reward': 1.0
+            }
 
 
 @dataclass
@@ -51,6 +87,21 @@ class ScannerConfig:
     min_relative_strength: float = 1.1
     min_price_above_ma: float = 0.05
     
+    # Restrict scans to these sectors (None scans every sector)
+    sectors: Optional[List[str]] = None
+    
+    # Declarative screens: name -> expression over stock fields (see utils/screens.py)
+    screens: Dict[str, str] = None
+    
+    # Delta rescans: re-score a symbol only if it moved past these since the last scan
+    delta_price_threshold: float = 0.01
+    delta_volume_threshold: float = 0.5
+    delta_chain_max_age_minutes: int = 120
+    
+    # Option analysis: how many top candidates to analyze, and scoring processes (0 = one per core, 1 = in-process)
+    max_stocks_to_analyze: int = 25
+    analysis_workers: int = 0
+    
     # Market cap adaptive settings
     micro_cap_volume_min: int = 500_000
     small_cap_volume_min: int = 1_000_000
@@ -79,6 +130,12 @@ class ScannerConfig:
                 'cup_and_handle',
                 'momentum_surge'
             ]
+        if self.screens is None:
+            self.screens = {
+                'min_price': 'price >= 1',
+                'min_volume': 'volume >= 100000',
+                'momentum_60d': 'price_change_60d >= 0'
+            }
 
 
 @dataclass
@@ -89,10 +146,15 @@ class DataConfig:
     yahoo_finance_enabled: bool = True
     finnhub_api_token: Optional[str] = None
     quote_refresh_interval: int = 5
+    # --daemon re-checks positions near expiry or an exit trigger this often (minutes)
+    hot_quote_refresh_interval: int = 1
     options_refresh_interval: int = 15
     fundamentals_refresh_interval: int = 1440
     use_cache: bool = True
     cache_expiry_minutes: int = 60
+    max_workers: int = 8
+    requests_per_minute: int = 120
+    intraday_bars: int = 390
 
 
 class Config:
@@ -159,58 +221,27 @@ class Config:
     
     def get_market_cap_category(self, market_cap: float) -> str:
         """Get market cap category for adaptive filtering"""
-        if market_cap < 500_000_000:
-            return 'micro_cap'
-        elif market_cap < 2_000_000_000:
-            return 'small_cap'
-        elif market_cap < 10_000_000_000:
-            return 'mid_cap'
-        elif market_cap < 100_000_000_000:
-            return 'large_cap'
-        else:
-            return 'mega_cap'
+        return MARKET_CAP_CATEGORIES[bisect.bisect_right(MARKET_CAP_BREAKPOINTS, market_cap)]
+    
+    def get_adaptive_thresholds(self, category: str) -> Dict:
+        """Resolve every adaptive screening threshold for a market cap category at once"""
+        return {
+            'volume_min': getattr(self.scanner, f'{category}_volume_min', self.trading.min_volume),
+            'growth_min': getattr(self.scanner, f'{category}_growth_min', self.scanner.min_revenue_growth),
+            'pe_max': getattr(self.scanner, f'{category}_pe_max', self.scanner.max_pe_ratio)
+        }
     
     def get_adaptive_volume_min(self, market_cap: float) -> int:
         """Get adaptive volume minimum based on market cap"""
-        category = self.get_market_cap_category(market_cap)
-        
-        volume_map = {
-            'micro_cap': self.scanner.micro_cap_volume_min,
-            'small_cap': self.scanner.small_cap_volume_min,
-            'mid_cap': self.scanner.mid_cap_volume_min,
-            'large_cap': self.scanner.large_cap_volume_min,
-            'mega_cap': self.scanner.mega_cap_volume_min
-        }
-        
-        return volume_map.get(category, self.trading.min_volume)
+        return self.get_adaptive_thresholds(self.get_market_cap_category(market_cap))['volume_min']
     
     def get_adaptive_growth_min(self, market_cap: float) -> float:
         """Get adaptive growth minimum based on market cap"""
-        category = self.get_market_cap_category(market_cap)
-        
-        growth_map = {
-            'micro_cap': self.scanner.micro_cap_growth_min,
-            'small_cap': self.scanner.small_cap_growth_min,
-            'mid_cap': self.scanner.mid_cap_growth_min,
-            'large_cap': self.scanner.large_cap_growth_min,
-            'mega_cap': self.scanner.mega_cap_growth_min
-        }
-        
-        return growth_map.get(category, self.scanner.min_revenue_growth)
+        return self.get_adaptive_thresholds(self.get_market_cap_category(market_cap))['growth_min']
     
     def get_adaptive_pe_max(self, market_cap: float) -> float:
         """Get adaptive PE maximum based on market cap"""
-        category = self.get_market_cap_category(market_cap)
-        
-        pe_map = {
-            'micro_cap': self.scanner.micro_cap_pe_max,
-            'small_cap': self.scanner.small_cap_pe_max,
-            'mid_cap': self.scanner.mid_cap_pe_max,
-            'large_cap': self.scanner.large_cap_pe_max,
-            'mega_cap': self.scanner.mega_cap_pe_max
-        }
-        
-        return pe_map.get(category, self.scanner.max_pe_ratio)
+        return self.get_adaptive_thresholds(self.get_market_cap_category(market_cap))['pe_max']
     
     def get_adaptive_risk_settings(self, market_cap: float) -> Dict:
         """Get adaptive risk settings based on market cap"""
@@ -348,7 +379,25 @@ EXAMPLE_CONFIG_JSON = {
         "theta_exit_threshold": 0.03,
         "profit_exit_threshold": 0.40,
         "days_before_exp_exit": 7,
-        "iv_spike_exit": 1.5
+        "iv_spike_exit": 1.5,
+        "monte_carlo_paths": 0,
+        "monte_carlo_seed": 42,
+        "monte_carlo_drift": 0.0,
+        "enable_spreads": True,
+        "spread_max_width_pct": 0.10,
+        "spread_max_legs_apart": 5,
+        "scoring_weights": {
+            "moneyness": 1.0,
+            "expiration": 1.0,
+            "liquidity": 1.0,
+            "delta": 1.0,
+            "theta": 1.0,
+            "gamma": 1.0,
+            "iv": 1.0,
+            "expected_return": 1.0,
+            "technical": 1.0,
+            "risk_reward": 1.0
+        }
     },
     "scanner": {
         "patterns": ["breakout", "flag", "ascending_triangle", "cup_and_handle", "momentum_surge"],
@@ -358,6 +407,17 @@ EXAMPLE_CONFIG_JSON = {
         "min_institutional_ownership": 0.05,
         "min_relative_strength": 1.1,
         "min_price_above_ma": 0.05,
+        "sectors": None,
+        "screens": {
+            "min_price": "price >= 1",
+            "min_volume": "volume >= 100000",
+            "momentum_60d": "price_change_60d >= 0"
+        },
+        "delta_price_threshold": 0.01,
+        "delta_volume_threshold": 0.5,
+        "delta_chain_max_age_minutes": 120,
+        "max_stocks_to_analyze": 25,
+        "analysis_workers": 0,
         "micro_cap_volume_min": 500000,
         "small_cap_volume_min": 1000000,
         "mid_cap_volume_min": 2000000,
@@ -377,10 +437,14 @@ EXAMPLE_CONFIG_JSON = {
     "data": {
         "yahoo_finance_enabled": True,
         "quote_refresh_interval": 5,
+        "hot_quote_refresh_interval": 1,
         "options_refresh_interval": 15,
         "fundamentals_refresh_interval": 1440,
         "use_cache": True,
-        "cache_expiry_minutes": 60
+        "cache_expiry_minutes": 60,
+        "max_workers": 8,
+        "requests_per_minute": 120,
+        "intraday_bars": 390
     }
 }
 
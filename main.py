@@ -9,12 +9,18 @@ import logging
 from datetime import datetime
 import argparse
 import os
+from collections import deque
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from utils.market_scanner import MarketScanner
+from utils.monitor_daemon import MonitorDaemon
 from utils.options_analyzer import OptionsAnalyzer
+from utils.portfolio_manager import PortfolioManager
 from utils.data_fetcher import DataFetcher
+from utils.run_journal import RunJournal
+from utils.scan_snapshot import ScanSnapshot
+from utils.ranking import TopKRanker, best_of
 from config import Config
 
 # Configure logging
@@ -82,98 +88,262 @@ class OptionsTracker:
             self.data_fetcher = DataFetcher(self.config)
             self.scanner = MarketScanner(self.config, self.data_fetcher)
             self.options_analyzer = OptionsAnalyzer(self.config, self.data_fetcher)
+            # Shares the fetcher so rolls are priced off the vol surfaces this tracker's scans fit
+            self.portfolio = PortfolioManager(self.config, data_fetcher=self.data_fetcher)
+            self.ranker = TopKRanker()
             
         except Exception as e:
             logger.error(f"Failed to initialize tracker: {e}")
             raise
     
-    def find_opportunities(self, top_n: int = 10):
+    def find_opportunities(self, top_n: int = 10, resume: bool = False, delta: bool = False):
         """Find top call options opportunities"""
         logger.info("="*80)
         logger.info("SCANNING FOR OPTIONS OPPORTUNITIES")
         logger.info("="*80)
         
+        journal = self._open_journal(top_n, resume)
+        self.scanner.journal = journal
+        
+        baseline = RunJournal.latest_completed() if delta else None
+        if delta and baseline is None:
+            logger.info("No completed scan to compare against - running a full scan")
+        
         try:
+            if baseline is not None and not journal.has_stage('candidates'):
+                filtered = self._delta_candidates(baseline, journal)
+                return self._analyze_and_rank(filtered, journal, top_n)
+            
             # Step 1: Get stocks within market cap range
             logger.info("\n1. Finding stocks within market cap range...")
-            candidates = self.scanner.find_stocks_by_market_cap()
+            if journal.has_stage('candidates'):
+                candidates = journal.stage_result('candidates')
+                logger.info("   Resumed candidate list from scan journal")
+            else:
+                candidates = self.scanner.find_stocks_by_market_cap()
+                journal.record_stage('candidates', candidates)
             logger.info(f"   Found {len(candidates)} stocks in range")
             
             if not candidates:
                 logger.warning("No candidates found. Check market hours and data availability.")
+                journal.complete()
                 return []
             
             # Step 2: Apply technical filters
             logger.info("\n2. Applying technical analysis...")
-            filtered = self.scanner.apply_filters(candidates)
-            logger.info(f"   {len(filtered)} stocks passed technical filters")
-            
-            # If too few, relax filters further
-            if len(filtered) < 5:
-                logger.info("   Too few results - relaxing filters...")
-                # Get top movers even if they don't pass all filters
-                filtered = self._get_top_movers(candidates, 30)
+            if journal.has_stage('filtered'):
+                filtered = journal.stage_result('filtered')
+                logger.info("   Resumed filtered list from scan journal")
+            else:
+                filtered = self.scanner.apply_filters(candidates)
+                logger.info(f"   {len(filtered)} stocks passed technical filters")
+                
+                # If too few, relax filters further
+                if len(filtered) < 5:
+                    logger.info("   Too few results - relaxing filters...")
+                    # Get top movers even if they don't pass all filters
+                    filtered = self._get_top_movers(candidates, 30)
+                journal.record_stage('filtered', filtered)
             
             # --- User feedback for rate limits ---
             if hasattr(self.scanner, 'skipped_due_to_rate_limit') and self.scanner.skipped_due_to_rate_limit > 0:
                 print(f"\n⚠️  Skipped {self.scanner.skipped_due_to_rate_limit} stocks due to rate limits. Try reducing the number of tickers or wait before running again.")
             
-            # Step 3: Analyze options for each
-            logger.info(f"\n3. Analyzing options for {len(filtered)} stocks...")
-            all_recommendations = []
-            
-            # Analyze stocks for diversification
-            stocks_to_analyze = min(len(filtered), 25)
+            return self._analyze_and_rank(filtered, journal, top_n)
             
-            for i, stock in enumerate(filtered[:stocks_to_analyze], 1):
+        except Exception as e:
+            logger.error(f"Fatal error in find_opportunities: {e}")
+            logger.error("Progress is saved - rerun with --resume to continue this scan")
+            return []
+        finally:
+            self.scanner.journal = None
+            self.data_fetcher.save_all_caches()
+    
+    def _analyze_and_rank(self, filtered: List[Dict], journal: RunJournal, top_n: int = 10) -> List[Dict]:
+        """Analyze options for the filtered stocks, then rank and display the best per stock"""
+        # Step 3: Analyze options for each
+        logger.info(f"\n3. Analyzing options for {len(filtered)} stocks...")
+        # Best contract per stock so far; query self.ranker.top() for partial results mid-scan
+        self.ranker = TopKRanker(k=top_n)
+        analyzed = journal.symbol_results('analysis')
+        if analyzed:
+            logger.info(f"   Reusing analysis for {len(analyzed)} stocks")
+        score_cache = self.options_analyzer.score_cache
+        if score_cache is not None:
+            score_cache.reset_stats()
+        
+        # Analyze stocks for diversification
+        stocks_to_analyze = min(len(filtered), self.config.scanner.max_stocks_to_analyze)
+        candidates = filtered[:stocks_to_analyze]
+        
+        # Every chain fetched below is kept so --rerank can re-score this scan offline
+        snapshot = ScanSnapshot(stocks=candidates)
+        self.options_analyzer.snapshot = snapshot
+        
+        # Chains are scored in a process pool; results come back in candidate order
+        pending = [stock for stock in candidates if stock['symbol'] not in analyzed]
+        results = self.options_analyzer.analyze_stocks(pending, self.config.scanner.analysis_workers or None)
+        
+        # Reused analyses are offered in candidate order too, so ranker ties break the same way
+        position = {stock['symbol']: i for i, stock in enumerate(candidates)}
+        reused = deque(stock['symbol'] for stock in candidates if stock['symbol'] in analyzed)
+        
+        def offer_reused(before: int):
+            while reused and position[reused[0]] < before:
+                self.ranker.offer_all(analyzed[reused.popleft()])
+        
+        try:
+            for stock, recommendations in results:
+                symbol = stock['symbol']
+                if symbol not in position or symbol in analyzed:
+                    logger.warning(f"Ignoring analysis for {symbol}, which was not pending in this scan")
+                    continue
+                offer_reused(position[symbol])
                 
                 try:
-                    # Get multiple recommendations per stock
-                    recommendations = self.options_analyzer.analyze_stock(stock)
+                    journal.record_symbol(symbol, 'inputs', self._scan_inputs(stock))
+                    # Resume and delta scans only re-offer to the best-per-symbol ranker
+                    journal.record_symbol(symbol, 'analysis', best_of(recommendations or []))
                     
                     if recommendations:
-                        all_recommendations.extend(recommendations)
+                        self.ranker.offer_all(recommendations)
                         
                 except Exception as e:
-                    logger.error(f"Error analyzing {stock['symbol']}: {e}")
+                    logger.error(f"Error analyzing {symbol}: {e}")
                     continue
+            offer_reused(len(candidates))
+        finally:
+            self.options_analyzer.snapshot = None
+        
+        journal.complete()
+        if score_cache is not None and score_cache.hits + score_cache.misses:
+            logger.info(f"   Score cache: reused {score_cache.hits} of {score_cache.hits + score_cache.misses} "
+                        f"contract scores ({score_cache.hit_rate():.0%} hit rate)")
+            score_cache.save()
+        
+        # Resumed and unchanged symbols were not refetched; keep their chains from the last snapshot
+        if analyzed:
+            snapshot.carry_forward(ScanSnapshot.load(), list(analyzed))
+        snapshot.save()
+        
+        return self._present_top(top_n)
+    
+    def rerank(self, top_n: int = 10) -> List[Dict]:
+        """Re-score and re-rank the last scan's snapshot with the current config, without network calls"""
+        snapshot = ScanSnapshot.load()
+        if snapshot is None or not len(snapshot):
+            logger.warning("No scan snapshot to re-rank - run a scan first")
+            return []
+        logger.info("="*80)
+        logger.info(f"RE-RANKING SNAPSHOT FROM {snapshot.created}")
+        logger.info("="*80)
+        
+        # The snapshot stands in for the data fetcher, so only stored chains are read
+        analyzer = OptionsAnalyzer(self.config, snapshot)
+        self.ranker = TopKRanker(k=top_n)
+        stocks = [stock for stock in snapshot.stocks if stock['symbol'] in snapshot.chains]
+        with timer(f"Re-ranking {len(stocks)} stocks"):
+            for _, recommendations in analyzer.analyze_stocks(stocks, self.config.scanner.analysis_workers or None):
+                if recommendations:
+                    self.ranker.offer_all(recommendations)
+        if analyzer.score_cache is not None:
+            analyzer.score_cache.save()
+        
+        # Snapshot prices may be stale, so re-ranked picks are shown but not offered for monitoring
+        return self._present_top(top_n, prompt=False)
+    
+    def _present_top(self, top_n: int, prompt: bool = True) -> List[Dict]:
+        """Diversify the ranked contracts to the best per stock, then display them"""
+        # Best option per stock for diversification, highest score first
+        if self.ranker.offered:
+            diversified_recommendations = self.ranker.top(top_n)
+            if not diversified_recommendations:
+                logger.warning("No valid recommendations with 'score' found.")
+                return []
             
-            # Sort and diversify recommendations
-            if all_recommendations:
-                # Filter out any recommendations missing 'score'
-                valid_recommendations = [rec for rec in all_recommendations if 'score' in rec]
-                if not valid_recommendations:
-                    logger.warning("No valid recommendations with 'score' found.")
-                    return []
-                valid_recommendations.sort(key=lambda x: x['score'], reverse=True)
-                
-                # Get best option per stock for diversification
-                diversified_recommendations = []
-                seen_stocks = set()
-                
-                for rec in valid_recommendations:
-                    if rec['symbol'] not in seen_stocks:
-                        diversified_recommendations.append(rec)
-                        seen_stocks.add(rec['symbol'])
-                        
-                        if len(diversified_recommendations) >= 10:
-                            break
-                
-                # Display recommendations
-                self._display_top_recommendations(diversified_recommendations)
+            # Reasons are rendered only for what gets shown
+            for rec in diversified_recommendations:
+                self.options_analyzer.explain(rec)
+            
+            # Display recommendations
+            self._display_top_recommendations(diversified_recommendations)
+            if prompt:
                 self._prompt_for_monitoring(diversified_recommendations)
+            return diversified_recommendations
+        
+        logger.warning("\nNo option opportunities found. Try:")
+        logger.warning("1. Clear cache: python main.py --clear-cache")
+        logger.warning("2. Adjust market cap range in config.json")
+        logger.warning("3. Check market hours")
+        logger.warning("4. Wait for rate limits to reset")
+        return []
+    
+    def _delta_candidates(self, baseline: RunJournal, journal: RunJournal) -> List[Dict]:
+        """Carry forward unchanged symbols from the last scan; refresh only the ones that moved"""
+        logger.info(f"\n1-2. Delta scan against {baseline.run_id}...")
+        previous_analysis = baseline.symbol_results('analysis')
+        previous_inputs = baseline.symbol_results('inputs')
+        previous = [stock for stock in (baseline.stage_result('filtered') or [])
+                    if stock['symbol'] in previous_analysis]
+        
+        fresh = self.data_fetcher.update_stock_data_with_current_prices([dict(stock) for stock in previous])
+        changed = []
+        for stock in fresh:
+            symbol = stock['symbol']
+            inputs = previous_inputs.get(symbol)
+            if self._inputs_changed(inputs, stock):
+                changed.append(stock)
             else:
-                logger.warning("\nNo option opportunities found. Try:")
-                logger.warning("1. Clear cache: python main.py --clear-cache")
-                logger.warning("2. Adjust market cap range in config.json")
-                logger.warning("3. Check market hours")
-                logger.warning("4. Wait for rate limits to reset")
-            
-            return all_recommendations
-            
-        except Exception as e:
-            logger.error(f"Fatal error in find_opportunities: {e}")
-            return []
+                journal.record_symbol(symbol, 'inputs', inputs)
+                journal.record_symbol(symbol, 'analysis', best_of(previous_analysis[symbol]))
+        logger.info(f"   {len(changed)}/{len(fresh)} stocks moved beyond thresholds - re-scoring those only")
+        
+        self.scanner.refresh_technicals(changed)
+        journal.record_stage('filtered', fresh)
+        return fresh
+    
+    def _scan_inputs(self, stock: Dict) -> Dict:
+        """Inputs a later delta scan compares against"""
+        return {
+            'price': stock.get('price', 0),
+            'volume': stock.get('volume', 0),
+            'time': datetime.now().isoformat()
+        }
+    
+    def _inputs_changed(self, previous: Optional[Dict], stock: Dict) -> bool:
+        """Whether price, volume or chain age moved past the delta-scan thresholds"""
+        if not previous:
+            return True
+        scanner_config = self.config.scanner
+        
+        old_price = previous.get('price') or 0
+        if old_price <= 0 or abs(stock.get('price', 0) / old_price - 1) > scanner_config.delta_price_threshold:
+            return True
+        
+        old_volume = previous.get('volume') or 0
+        if old_volume > 0 and abs(stock.get('volume', 0) / old_volume - 1) > scanner_config.delta_volume_threshold:
+            return True
+        
+        chain_age = (datetime.now() - datetime.fromisoformat(previous['time'])).total_seconds() / 60
+        return chain_age > scanner_config.delta_chain_max_age_minutes
+    
+    def _open_journal(self, top_n: int, resume: bool) -> RunJournal:
+        """Resume the last incomplete scan if asked and compatible, else start a new journal"""
+        params = {
+            'market_cap_min': self.config.trading.market_cap_min,
+            'market_cap_max': self.config.trading.market_cap_max,
+            'top_n': top_n
+        }
+        if resume:
+            journal = RunJournal.latest_incomplete()
+            if journal is None:
+                logger.info("No incomplete scan to resume - starting a new scan")
+            elif journal.params != params:
+                logger.warning("Last incomplete scan used different settings - starting a new scan")
+            else:
+                logger.info(f"Resuming scan {journal.run_id}")
+                return journal
+        return RunJournal.start(params)
     
     def _get_top_movers(self, stocks: List[Dict], n: int = 20) -> List[Dict]:
         """Get stocks with best momentum"""
@@ -200,7 +370,7 @@ class OptionsTracker:
     def _display_top_recommendations(self, recommendations: List[Dict]):
         """Display top recommendations in a clean, modern format with enhanced reasoning"""
         print("\n" + "="*70)
-        print("🚀 TOP 10 CALL OPTIONS RECOMMENDATIONS")
+        print(f"🚀 TOP {len(recommendations)} CALL OPTIONS RECOMMENDATIONS")
         print("="*70)
         
         if not recommendations:
@@ -210,12 +380,12 @@ class OptionsTracker:
             print("   • Wait for rate limits to reset")
             return
         
-        for i, rec in enumerate(recommendations[:10], 1):
+        for i, rec in enumerate(recommendations, 1):
             moneyness = rec['current_stock_price'] / rec['strike'] if rec.get('strike') else 0
             breakeven_move = ((rec['strike'] + rec['entry_price']) / rec['current_stock_price'] - 1) * 100 if rec.get('strike') and rec.get('entry_price') and rec.get('current_stock_price') else 0
             
             print(f"\n{i}. {rec['symbol']} @ ${rec['current_stock_price']:.2f}")
-            print(f"   ${rec['strike']}C {rec['expiration']} ({rec['days_to_expiration']}d)")
+            print(f"   {self._contract_label(rec)} {rec['expiration']} ({rec['days_to_expiration']}d)")
             print(f"   Entry: ${rec['entry_price']:.2f} | BE: +{breakeven_move:.1f}% | Score: {rec['score']:.0f}")
             
             # Enhanced reasoning display
@@ -247,6 +417,14 @@ class OptionsTracker:
                 print(f"   📈 Good potential return")
             else:
                 print(f"   ⚠️  Moderate potential - monitor closely")
+            if rec.get('return_p5') is not None:
+                print(f"   🎲 PoP: {rec['probability_of_profit']:.0%} | "
+                      f"Return range: {rec['return_p5']:+.0%} to {rec['return_p95']:+.0%}")
+            elif rec.get('max_profit') is not None:
+                print(f"   🎲 PoP: {rec['probability_of_profit']:.0%} | "
+                      f"Max profit ${rec['max_profit']:.2f} / max loss ${rec['max_loss']:.2f}")
+            if rec.get('fallback_scored'):
+                print(f"   ⚠️  Scored from fixed scenarios - the simulation was unavailable for this chain")
             
             # Add specific reasoning for negative momentum stocks
             if rec.get('analysis', {}).get('risk_assessment') == 'High':
@@ -262,6 +440,13 @@ class OptionsTracker:
         print("• Set tight stop losses and take profits quickly")
         print("="*70)
     
+    @staticmethod
+    def _contract_label(rec: Dict) -> str:
+        """$50C for a single call, $50/$55C spread for a bull call spread"""
+        if rec.get('short_strike') is not None:
+            return f"${rec['strike']}/${rec['short_strike']}C spread"
+        return f"${rec['strike']}C"
+    
     def _prompt_for_monitoring(self, recommendations: List[Dict]):
         """Prompt for position monitoring"""
         print("\n📊 MONITOR POSITIONS?")
@@ -279,7 +464,7 @@ class OptionsTracker:
                 if 0 <= idx < min(len(recommendations), 10):
                     rec = recommendations[idx]
                     
-                    print(f"\nHow many contracts of {rec['symbol']} ${rec['strike']}C?")
+                    print(f"\nHow many contracts of {rec['symbol']} {self._contract_label(rec)}?")
                     contracts = int(input("> ") or "1")
                     
                     self.options_analyzer.add_to_monitoring(rec, contracts)
@@ -297,23 +482,36 @@ class OptionsTracker:
         exit_signals = self.options_analyzer.monitor_positions()
         
         if exit_signals:
-            print("\n" + "!"*80)
-            print("ACTION REQUIRED")
-            print("!"*80)
-            
-            for signal in exit_signals:
-                print(f"\n{signal['symbol']} ${signal['strike']} {signal['expiration']}")
-                print(f"ACTION: {signal['action']} - {signal.get('urgency', 'RECOMMENDED')}")
-                print(f"Recommendation: {signal['recommendation']}")
+            self._print_exit_signals(exit_signals)
+    
+    def _print_exit_signals(self, exit_signals: List[Dict]):
+        """Print positions that need action"""
+        print("\n" + "!"*80)
+        print("ACTION REQUIRED")
+        print("!"*80)
+        
+        for signal in exit_signals:
+            print(f"\n{signal['symbol']} ${signal['strike']} {signal['expiration']}")
+            print(f"ACTION: {signal['action']} - {signal.get('urgency', 'RECOMMENDED')}")
+            print(f"Recommendation: {signal['recommendation']}")
+    
+    def run_daemon(self):
+        """Keep monitoring positions in this process, refreshing those near a trigger more often"""
+        logger.info("="*80)
+        logger.info("MONITOR DAEMON")
+        logger.info("="*80)
+        MonitorDaemon(self.options_analyzer, self.data_fetcher, self.config,
+                      on_signal=self._print_exit_signals).run()
     
-    def run_analysis(self, scan_new: bool = True, monitor: bool = True):
+    def run_analysis(self, scan_new: bool = True, monitor: bool = True, resume: bool = False,
+                     delta: bool = False, top_n: int = 10):
         """Run analysis cycle"""
         
         if monitor:
             self.monitor_positions()
         
         if scan_new:
-            self.find_opportunities()
+            self.find_opportunities(top_n=top_n, resume=resume, delta=delta)
     
     def clear_cache(self):
         """Clear cached data"""
@@ -327,24 +525,35 @@ def main():
     parser = argparse.ArgumentParser(description='Improved Small-Cap Options Tracker')
     parser.add_argument('--scan', action='store_true', help='Scan for new opportunities')
     parser.add_argument('--monitor', action='store_true', help='Monitor existing positions')
+    parser.add_argument('--daemon', action='store_true', help='Keep monitoring positions on a schedule until stopped')
+    parser.add_argument('--resume', action='store_true', help='Resume the last interrupted scan')
+    parser.add_argument('--delta', action='store_true', help='Rescan only symbols that moved since the last scan')
+    parser.add_argument('--rerank', action='store_true', help='Re-score the last scan from its snapshot (no network)')
+    parser.add_argument('--top-n', type=int, default=10, help='Number of recommendations to show')
     parser.add_argument('--clear-cache', action='store_true', help='Clear cached data')
     parser.add_argument('--config', default='config.json', help='Path to configuration file')
     
     args = parser.parse_args()
     
-    for dir in ['logs', 'reports', 'data', 'data/cache']:
+    for dir in ['logs', 'reports', 'data', 'data/cache', 'data/runs']:
         Path(dir).mkdir(exist_ok=True)
     
     tracker = OptionsTracker(args.config)
     
     if args.clear_cache:
         tracker.clear_cache()
+    elif args.daemon:
+        tracker.run_daemon()
+    elif args.rerank:
+        tracker.rerank(top_n=args.top_n)
+    elif args.resume or args.delta:
+        tracker.run_analysis(scan_new=True, monitor=False, resume=args.resume, delta=args.delta, top_n=args.top_n)
     elif args.monitor and not args.scan:
         tracker.run_analysis(scan_new=False, monitor=True)
     elif args.scan and not args.monitor:
-        tracker.run_analysis(scan_new=True, monitor=False)
+        tracker.run_analysis(scan_new=True, monitor=False, top_n=args.top_n)
     else:
-        tracker.run_analysis(scan_new=True, monitor=True)
+        tracker.run_analysis(scan_new=True, monitor=True, top_n=args.top_n)
 
 
 if __name__ == '__main__':
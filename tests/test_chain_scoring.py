@@ -0,0 +1,101 @@
+"""
+Parity between the vectorized chain scorer and OptionsAnalyzer's scalar scorer
+"""
+
+import numpy as np
+import pytest
+
+from utils.chain_scoring import WEIGHTED_TERMS, build_analysis, reason_codes, render_reasons, score_chain
+from utils.options_analyzer import OptionsAnalyzer
+
+SPOT = 50.0
+STOCK = {'symbol': 'TEST', 'price': SPOT, 'rsi': 35, 'relative_strength': 1.2,
+         'price_change_20d': -0.12, 'price_change_60d': -0.2, 'volume_ratio': 1.3,
+         'market_cap': 2e9, 'sector': 'Technology'}
+
+
+def synthetic_chain(size: int = 5000, seed: int = 7):
+    """Seeded random chain of calls around SPOT"""
+    rng = np.random.default_rng(seed)
+    chain = []
+    for _ in range(size):
+        strike = round(SPOT * rng.uniform(0.8, 1.35), 1)
+        ask = max(0.0, rng.choice([rng.uniform(0.05, 8.0), 0.0], p=[0.95, 0.05]))
+        bid = ask * rng.uniform(0.5, 1.0)
+        option = {
+            'symbol': 'TEST', 'strike': strike, 'expiration': '2030-01-01',
+            'days_to_expiration': int(rng.integers(5, 90)), 'bid': bid, 'ask': ask,
+            'mid': (bid + ask) / 2 if ask > 0 else rng.uniform(0, 3),
+            'volume': int(rng.integers(0, 400)), 'open_interest': int(rng.integers(0, 2000)),
+            'implied_volatility': rng.uniform(0.1, 1.2), 'spread_pct': rng.uniform(0, 0.6),
+            'delta': round(rng.uniform(0.05, 0.95), 3), 'theta': -rng.uniform(0, 0.3),
+            'gamma': rng.uniform(0, 0.08), 'vega': 0.1, 'iv_percentile': rng.uniform(5, 95)
+        }
+        if rng.random() < 0.1:
+            option['current_stock_price'] = SPOT
+        chain.append(option)
+    return chain
+
+
+def edge_chain():
+    """Contracts at the boundaries of the scoring tiers (a None override drops the field)"""
+    base = {'symbol': 'TEST', 'strike': 52.0, 'expiration': '2030-01-01', 'days_to_expiration': 30,
+            'bid': 1.0, 'ask': 1.1, 'mid': 1.05, 'volume': 100, 'open_interest': 500,
+            'implied_volatility': 0.5, 'spread_pct': 0.1, 'delta': 0.4, 'theta': -0.05,
+            'gamma': 0.03, 'vega': 0.1, 'iv_percentile': 50}
+    edges = {
+        'zero bid/ask': {'bid': 0.0, 'ask': 0.0, 'mid': 0.0},
+        'zero bid': {'bid': 0.0, 'mid': 0.55},
+        'zero ask, quoted mid': {'ask': 0.0, 'mid': 0.8},
+        'nan iv': {'implied_volatility': float('nan')},
+        'nan iv, no percentile': {'implied_volatility': float('nan'), 'iv_percentile': None},
+        'zero dte': {'days_to_expiration': 0},
+        'zero dte, zero ask': {'days_to_expiration': 0, 'bid': 0.0, 'ask': 0.0, 'mid': 0.0},
+        'deep itm': {'strike': 20.0, 'bid': 29.5, 'ask': 30.5, 'mid': 30.0, 'delta': 0.99},
+        'deep otm': {'strike': 150.0, 'bid': 0.0, 'ask': 0.05, 'mid': 0.025, 'delta': 0.01},
+        'no greeks': {'delta': None, 'theta': None, 'gamma': None},
+        'no activity': {'volume': 0, 'open_interest': 0},
+    }
+    rows = []
+    for name, overrides in edges.items():
+        option = {**base, **overrides}
+        rows.append((name, {key: value for key, value in option.items() if value is not None}))
+    return rows
+
+
+def mismatches(chain, weights=None):
+    """Contracts whose batch score or analysis differs from the scalar path"""
+    analyzer = OptionsAnalyzer.__new__(OptionsAnalyzer)
+    bonus, technical_reasons = analyzer._technical_bonus(STOCK)
+    batch = score_chain(chain, SPOT, bonus, weights=weights)
+    codes, params = reason_codes(batch)
+
+    different = []
+    for i, option in enumerate(chain):
+        score, analysis = analyzer._score_option_comprehensive(option, SPOT, STOCK, weights)
+        reasons = render_reasons(codes[i], params[i], option, technical_reasons)
+        vector = build_analysis(float(batch['score'][i]), params[i], reasons)
+        same = (score == vector['total_score'] and analysis['reasons'] == vector['reasons']
+                and all(analysis[k] == vector[k] for k in analysis if k not in ('total_score', 'reasons')))
+        if not same:
+            different.append((option, score, analysis, vector))
+    return different
+
+
+def test_synthetic_chain_matches_scalar_scorer():
+    assert mismatches(synthetic_chain()) == []
+
+
+@pytest.mark.parametrize('name,option', edge_chain(), ids=[name for name, _ in edge_chain()])
+def test_edge_contract_matches_scalar_scorer(name, option):
+    assert mismatches([option]) == []
+
+
+def test_edge_contracts_score_together():
+    # Batched together, no edge row may disturb the others' columns
+    assert mismatches([option for _, option in edge_chain()]) == []
+
+
+def test_weighted_terms_match_scalar_scorer():
+    weights = {term: 0.5 + 0.25 * i for i, term in enumerate(WEIGHTED_TERMS)}
+    assert mismatches(synthetic_chain(1000, seed=11), weights) == []
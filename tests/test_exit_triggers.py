@@ -0,0 +1,81 @@
+"""
+Exit trigger levels match the stock prices at which the rules fire on a brute-force grid
+"""
+
+import numpy as np
+import pytest
+
+from utils.exit_triggers import (LATE_PROFIT_TARGET, MAX_THETA_RATIO, MIN_LATE_DELTA, PROFIT_TARGET, STOP_LOSS,
+                                 STOCK_STOP, call_greeks, compute_levels)
+
+SPOT, STRIKE, SHORT_STRIKE, DAYS, IV = 50.0, 52.0, 56.0, 12, 0.45
+GRID = np.linspace(30, 80, 200001)
+TOLERANCE = 2 * (GRID[1] - GRID[0])
+
+
+def first(mask):
+    """Grid price at which a rule's condition first holds"""
+    assert mask.any()
+    return GRID[np.argmax(mask)]
+
+
+def pnl_levels(values, entry):
+    pnl = values / entry - 1
+    levels = {'stop_loss': first(pnl > STOP_LOSS)}
+    for rule, target in (('profit_target', PROFIT_TARGET), ('late_profit', LATE_PROFIT_TARGET)):
+        if (pnl >= target).any():
+            levels[rule] = first(pnl >= target)
+    return levels
+
+
+def assert_levels_match(levels, brute):
+    assert set(levels.levels) == set(brute)
+    for rule, level in brute.items():
+        assert levels.levels[rule][1] == pytest.approx(level, abs=TOLERANCE), rule
+
+
+def test_single_call_levels_match_grid():
+    entry = float(call_greeks(SPOT, STRIKE, 30, IV)[0])
+    position = {'strike': STRIKE, 'entry_price': entry, 'current_stock_price_at_entry': 53.0}
+    levels = compute_levels(position, SPOT, float(call_greeks(SPOT, STRIKE, DAYS, IV)[0]), DAYS, IV)
+
+    values, deltas, _, thetas = call_greeks(GRID, STRIKE, DAYS, IV)
+    brute = pnl_levels(values, entry)
+    brute['delta_floor'] = first(deltas >= MIN_LATE_DELTA)
+    brute['theta'] = first(np.abs(thetas) / values <= MAX_THETA_RATIO)
+    brute['stock_stop'] = 53.0 * (1 + STOCK_STOP)
+    assert_levels_match(levels, brute)
+    assert levels.lower == max(level for side, level in levels.levels.values() if side == 'below')
+
+
+def test_spread_levels_match_grid():
+    long_30, short_30 = call_greeks(SPOT, STRIKE, 30, IV)[0], call_greeks(SPOT, SHORT_STRIKE, 30, IV)[0]
+    entry = float(long_30 - short_30)
+    position = {'strike': STRIKE, 'short_strike': SHORT_STRIKE, 'entry_price': entry}
+    value = float(call_greeks(SPOT, STRIKE, DAYS, IV)[0] - call_greeks(SPOT, SHORT_STRIKE, DAYS, IV)[0])
+    levels = compute_levels(position, SPOT, value, DAYS, IV)
+
+    long_leg, short_leg = call_greeks(GRID, STRIKE, DAYS, IV), call_greeks(GRID, SHORT_STRIKE, DAYS, IV)
+    values = long_leg[0] - short_leg[0]
+    deltas = long_leg[1] - short_leg[1]
+    thetas = long_leg[3] - short_leg[3]
+    brute = pnl_levels(values, entry)
+    # Net delta is single-peaked, so the floor and ceiling bound where it is above the minimum
+    above = np.flatnonzero(deltas >= MIN_LATE_DELTA)
+    brute['delta_floor'] = GRID[above[0]]
+    brute['delta_ceiling'] = GRID[above[-1]]
+    brute['theta'] = first(np.maximum(-thetas, 0) / values <= MAX_THETA_RATIO)
+    assert_levels_match(levels, brute)
+
+
+def test_no_levels_inside_expiry_window():
+    position = {'strike': STRIKE, 'entry_price': 1.0}
+    assert compute_levels(position, SPOT, 1.0, 5, IV) is None
+
+
+def test_estimate_value_tracks_model():
+    entry = float(call_greeks(SPOT, STRIKE, 45, IV)[0])
+    levels = compute_levels({'strike': STRIKE, 'entry_price': entry}, SPOT,
+                            float(call_greeks(SPOT, STRIKE, 30, IV)[0]), 30, IV)
+    assert levels.estimate_value(51.0) == pytest.approx(float(call_greeks(51.0, STRIKE, 30, IV)[0]), abs=0.01)
+    assert levels.near(levels.lower) and levels.near(levels.upper) and not levels.near(SPOT)
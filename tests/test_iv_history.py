@@ -0,0 +1,52 @@
+"""
+IV percentile and rank from the rolling store match a brute-force window
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from utils.iv_history import IVHistoryStore
+
+
+def simulated_store(path):
+    """A year and a half of daily readings, some replaced by a same-day update"""
+    rng = np.random.default_rng(5)
+    store = IVHistoryStore(path)
+    readings = []
+    for i in range(540):
+        day = date(2024, 1, 1) + timedelta(days=i)
+        iv = float(rng.uniform(0.2, 0.9))
+        store.record('TEST', iv, day)
+        if rng.random() < 0.2:
+            iv = float(rng.uniform(0.2, 0.9))
+            store.record('TEST', iv, day)
+        readings.append((day.toordinal(), iv))
+    return store, readings
+
+
+def test_lookup_matches_brute_force(tmp_path):
+    store, readings = simulated_store(tmp_path / "iv.pkl")
+    last = readings[-1][0]
+    window = np.array([iv for day, iv in readings if day > last - 365])
+    assert store.observations('TEST') == len(window)
+
+    probes = np.random.default_rng(6).uniform(0.1, 1.0, 50)
+    percentile, rank = store.lookup('TEST', probes)
+    assert np.allclose(percentile, [(window < probe).mean() * 100 for probe in probes])
+    assert np.allclose(rank, np.clip((probes - window.min()) / (window.max() - window.min()) * 100, 0, 100))
+
+
+def test_save_and_reload(tmp_path):
+    store, _ = simulated_store(tmp_path / "iv.pkl")
+    store.save()
+    reloaded = IVHistoryStore(store.path)
+    assert reloaded.observations('TEST') == store.observations('TEST')
+    assert np.array_equal(reloaded.series['TEST'][2], store.series['TEST'][2])
+
+
+def test_no_stats_until_enough_history(tmp_path):
+    store = IVHistoryStore(tmp_path / "iv.pkl", min_observations=20)
+    for i in range(19):
+        store.record('TEST', 0.4 + i * 0.01, date(2024, 1, 1) + timedelta(days=i))
+    assert store.lookup('TEST', [0.5]) == (None, None)
@@ -0,0 +1,42 @@
+"""
+The vectorized IV solver recovers the vols contracts were priced at
+"""
+
+import numpy as np
+
+from utils.iv_solver import call_price, call_vega, implied_volatility
+
+SPOT = 50.0
+
+
+def test_recovers_known_iv():
+    price = call_price(np.array([SPOT]), np.array([52.0]), np.array([45 / 365.0]), np.array([0.45]))
+    iv, converged = implied_volatility(price, SPOT, np.array([52.0]), np.array([45.0]))
+    assert converged[0]
+    assert abs(iv[0] - 0.45) < 1e-6
+
+
+def test_round_trips_a_synthetic_chain():
+    rng = np.random.default_rng(3)
+    n = 5000
+    strike = SPOT * rng.uniform(0.7, 1.4, n)
+    days = rng.integers(5, 400, n).astype(float)
+    true_vol = rng.uniform(0.08, 2.5, n)
+    years = days / 365.0
+    price = call_price(np.full(n, SPOT), strike, years, true_vol)
+
+    iv, converged = implied_volatility(price, SPOT, strike, days)
+    assert converged.mean() > 0.99
+    # Deep OTM/ITM prices carry almost no vol information, so check the price error too
+    repriced = call_price(np.full(n, SPOT), strike, years, np.where(converged, iv, 0.3))
+    assert np.abs(repriced - price)[converged].max() < 1e-5
+    informative = converged & (call_vega(SPOT, strike, years, true_vol) > 0.01)
+    assert np.abs(iv - true_vol)[informative].max() < 1e-3
+
+
+def test_out_of_band_prices_are_flagged():
+    # Zero premium, more than the stock, and below intrinsic value
+    iv, converged = implied_volatility(np.array([0.0, 60.0, 1.0]), SPOT, np.array([50.0, 50.0, 40.0]),
+                                       np.array([30, 30, 30]))
+    assert not converged.any()
+    assert np.isnan(iv).all()
@@ -0,0 +1,46 @@
+"""
+Monte Carlo draws are antithetic and seeded, and a fairly priced call breaks even
+"""
+
+import numpy as np
+from scipy.stats import norm
+
+from utils.monte_carlo import simulate_calls, standard_normals
+
+
+def test_antithetic_draws_have_zero_mean():
+    z = standard_normals(2000)
+    assert len(z) == 2000
+    assert np.array_equal(z[:1000], -z[1000:])
+    assert abs(z.mean()) < 1e-12
+
+
+def test_odd_path_count_is_exact():
+    assert len(standard_normals(2001)) == 2001
+    assert len(simulate_calls(50.0, np.array([52.0]), np.array([1.0]), np.array([30.0]), np.array([0.4]),
+                              paths=1)['expected_return']) == 1
+
+
+def test_same_seed_same_draws():
+    assert np.array_equal(standard_normals(500, seed=3), standard_normals(500, seed=3))
+    assert not np.array_equal(standard_normals(500, seed=3), standard_normals(500, seed=4))
+
+
+def test_fair_premium_breaks_even():
+    # With zero drift the simulated call value converges on Black-Scholes (r = 0)
+    spot, strike, days, iv = 50.0, 52.0, 45, 0.45
+    t = days / 365.0
+    d1 = (np.log(spot / strike) + 0.5 * iv ** 2 * t) / (iv * np.sqrt(t))
+    fair = spot * norm.cdf(d1) - strike * norm.cdf(d1 - iv * np.sqrt(t))
+    result = simulate_calls(spot, np.array([strike]), np.array([fair]), np.array([days]), np.array([iv]),
+                            paths=200_000)
+    assert abs(result['expected_return'][0]) < 0.02
+    assert abs(result['probability_of_profit'][0] - norm.cdf(np.log(spot / (strike + fair)) / (iv * np.sqrt(t))
+                                                             - 0.5 * iv * np.sqrt(t))) < 0.01
+
+
+def test_unpriced_contracts_score_zero():
+    result = simulate_calls(50.0, np.array([50.0, 55.0]), np.array([0.0, 1.2]), np.array([30.0, 30.0]),
+                            np.array([0.4, 0.4]))
+    assert all(values[0] == 0.0 for values in result.values())
+    assert result['probability_of_profit'][1] > 0
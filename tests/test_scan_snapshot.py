@@ -0,0 +1,62 @@
+"""
+Chains packed into a scan snapshot unpack to the same contracts, and pickle smaller
+"""
+
+import pickle
+
+import numpy as np
+
+from utils.records import OptionContract
+from utils.scan_snapshot import ScanSnapshot, pack_chain, unpack_chain
+
+
+def synthetic_chain(size: int = 2000, seed: int = 9):
+    """Contracts with mixed field types; a fifth of them have no Greeks"""
+    rng = np.random.default_rng(seed)
+    chain = []
+    for i in range(size):
+        bid = float(rng.uniform(0.05, 8.0))
+        contract = OptionContract(
+            symbol='TEST', type='CALL', strike=round(float(rng.uniform(30, 70)), 1),
+            expiration='2030-01-18', days_to_expiration=int(rng.integers(5, 90)), bid=bid, ask=bid * 1.05,
+            mid=bid * 1.025, last=bid, volume=int(rng.integers(0, 400)), open_interest=int(rng.integers(0, 2000)),
+            implied_volatility=float(rng.uniform(0.1, 1.2)), in_the_money=bool(rng.random() < 0.4),
+            contract_symbol=f"TEST300118C{i:08d}", spread_pct=0.05, liquidity_score=60)
+        if rng.random() < 0.8:
+            contract.update({'delta': float(rng.uniform(0.05, 0.95)), 'theta': -0.02, 'gamma': 0.03, 'vega': 0.1})
+        chain.append(contract)
+    return chain
+
+
+def test_pack_unpack_round_trip():
+    chain = synthetic_chain()
+    rebuilt = unpack_chain(pack_chain(chain))
+    assert len(rebuilt) == len(chain)
+    for original, copy in zip(chain, rebuilt):
+        assert copy.to_dict() == original.to_dict()
+        assert [type(value) for value in copy.to_dict().values()] == \
+            [type(value) for value in original.to_dict().values()]
+
+
+def test_columns_pickle_smaller_than_contracts():
+    chain = synthetic_chain()
+    as_dicts = len(pickle.dumps([c.to_dict() for c in chain], protocol=pickle.HIGHEST_PROTOCOL))
+    as_columns = len(pickle.dumps(pack_chain(chain), protocol=pickle.HIGHEST_PROTOCOL))
+    assert as_columns < as_dicts
+
+
+def test_snapshot_save_load_and_carry_forward(tmp_path):
+    path = tmp_path / "snapshot.pkl"
+    previous = ScanSnapshot([{'symbol': 'OLD'}])
+    previous.add_chain('OLD', synthetic_chain(50, seed=1))
+    snapshot = ScanSnapshot([{'symbol': 'NEW'}])
+    snapshot.add_chain('NEW', synthetic_chain(50, seed=2))
+    snapshot.carry_forward(previous, ['NEW', 'OLD', 'MISSING'])
+    snapshot.save(path)
+
+    loaded = ScanSnapshot.load(path)
+    assert len(loaded) == 2
+    assert loaded.stocks == [{'symbol': 'NEW'}]
+    assert [c.to_dict() for c in loaded.get_options_chain('OLD')] == \
+        [c.to_dict() for c in synthetic_chain(50, seed=1)]
+    assert loaded.get_options_chain('MISSING') == []
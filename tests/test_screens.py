@@ -0,0 +1,31 @@
+"""
+Screens are checked against the known fields when compiled, and fail closed when evaluation breaks
+"""
+
+import numpy as np
+
+from utils.filter_planner import FilterPlanner
+from utils.market_scanner import SCREEN_FIELDS
+from utils.screens import compile_screens
+
+STOCKS = [{'symbol': 'A', 'price': 5.0, 'volume': 2e5, 'rsi': 35.0},
+          {'symbol': 'B', 'price': 0.5, 'volume': 5e5, 'rsi': 55.0},
+          {'symbol': 'C', 'price': 12.0, 'volume': 5e4}]
+
+
+def test_unknown_fields_are_rejected_at_compile_time():
+    screens = compile_screens({'typo': 'rsii < 40', 'cheap': 'price between 1 and 10',
+                               'quiet_intraday': 'not (intraday_rsi > 80)', 'bad_intraday': 'intraday_pattern == 1'},
+                              SCREEN_FIELDS)
+    assert [screen.name for screen in screens] == ['cheap', 'quiet_intraday']
+
+
+def test_screen_masks_treat_missing_values_as_failing():
+    oversold, = compile_screens({'oversold': 'rsi < 40 and volume >= 1e5'}, SCREEN_FIELDS)
+    assert np.array_equal(oversold.apply(STOCKS), [True, False, False])
+
+
+def test_failing_screen_rejects_every_candidate(tmp_path):
+    planner = FilterPlanner(stats_file=tmp_path / "stats.json")
+    planner.add_screen('broken', lambda stocks: 1 / 0, ['universe'])
+    assert planner.run(STOCKS) == []
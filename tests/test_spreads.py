@@ -0,0 +1,54 @@
+"""
+Spreads score on the single-leg scale, so the two rank against each other directly
+"""
+
+import numpy as np
+
+from utils.chain_scoring import WEIGHTED_TERMS, score_chain
+from utils.spreads import find_spreads, score_spreads
+
+SPOT = 50.0
+BONUS = 8
+
+# An at-the-money call and a 50/58 spread whose net Greeks, debit, IV and liquidity match it
+SINGLE = {'symbol': 'TEST', 'strike': 50.0, 'expiration': '2030-01-01', 'days_to_expiration': 35,
+          'bid': 1.9, 'ask': 2.0, 'mid': 1.95, 'volume': 200, 'open_interest': 600, 'spread_pct': 0.05,
+          'implied_volatility': 0.45, 'iv_percentile': 50, 'delta': 0.35, 'theta': -0.03, 'gamma': 0.03,
+          'current_stock_price': SPOT}
+POINT_TERMS = ('moneyness', 'expiration', 'delta', 'theta', 'gamma', 'iv', 'expected_return', 'risk_reward')
+
+
+def single_score(weights=None):
+    return score_chain([SINGLE], SPOT, BONUS, weights=weights)
+
+
+def spread_score(weights=None):
+    return score_spreads(SPOT, np.array([50.0]), np.array([2.0]), np.array([6.0]), np.array([0.45]), 35,
+                         np.array([100.0]), BONUS, np.array([0.35]), np.array([-0.03]), np.array([0.03]),
+                         np.array([50.0]), weights)
+
+
+def test_equivalent_spread_and_single_score_equally():
+    single, spread = single_score(), spread_score()
+    for term in POINT_TERMS:
+        assert single['tiers'][term][0] == spread['tiers'][term][0], term
+    assert spread['score'][0] == single['score'][0]
+
+
+def test_scoring_weights_reach_spreads():
+    weights = {term: 0.5 + 0.25 * i for i, term in enumerate(WEIGHTED_TERMS)}
+    assert spread_score(weights)['score'][0] == single_score(weights)['score'][0]
+    assert spread_score(weights)['score'][0] != spread_score()['score'][0]
+
+
+def test_find_spreads_applies_weights():
+    legs = []
+    for strike, bid, ask, delta, theta in ((48, 3.0, 3.2, 0.60, -0.040), (50, 1.9, 2.0, 0.48, -0.045),
+                                           (52, 1.0, 1.1, 0.35, -0.040), (54, 0.45, 0.5, 0.22, -0.030)):
+        legs.append({**SINGLE, 'strike': float(strike), 'bid': bid, 'ask': ask, 'mid': (bid + ask) / 2,
+                     'delta': delta, 'theta': theta, 'liquidity_score': 100})
+    spreads = find_spreads(legs, SPOT, BONUS)
+    assert spreads
+    halved = find_spreads(legs, SPOT, BONUS, weights={'technical': 0.5})
+    for spread, weighted in zip(spreads, halved):
+        assert weighted['score'] == spread['score'] - BONUS * 0.5
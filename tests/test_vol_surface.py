@@ -0,0 +1,55 @@
+"""
+The SVI surface recovers a known smile from noisy, gappy quotes and prices off it
+"""
+
+import numpy as np
+
+from utils.iv_solver import RISK_FREE_RATE, call_price
+from utils.vol_surface import fit_surface, svi_total_variance
+
+SPOT = 50.0
+STRIKES = np.arange(40, 62, 1.0)
+TRUTH = {20: [0.010, 0.04, -0.5, 0.02, 0.15], 45: [0.020, 0.06, -0.4, 0.03, 0.2], 70: [0.030, 0.07, -0.35, 0.03, 0.25]}
+
+
+def true_ivs(days):
+    t = days / 365.0
+    k = np.log(STRIKES / (SPOT * np.exp(RISK_FREE_RATE * t)))
+    return np.sqrt(svi_total_variance(np.array(TRUTH[days]), k) / t)
+
+
+def fitted_surface():
+    rng = np.random.default_rng(11)
+    slices = []
+    for days in TRUTH:
+        ivs = true_ivs(days) * (1 + rng.normal(0, 0.01, len(STRIKES)))
+        ivs[rng.random(len(STRIKES)) < 0.15] = np.nan  # unquoted strikes
+        slices.append((days, STRIKES, ivs))
+    return fit_surface(SPOT, slices)
+
+
+def test_recovers_known_smiles():
+    surface = fitted_surface()
+    for days in TRUTH:
+        assert np.abs(surface.iv(STRIKES, days) - true_ivs(days)).max() < 0.01
+
+
+def test_interpolates_between_expiries():
+    surface = fitted_surface()
+    atm = [float(surface.iv(50.0, days)) for days in (20, 30, 45, 60, 70)]
+    assert min(atm[0], atm[2]) <= atm[1] <= max(atm[0], atm[2])
+    assert min(atm[2], atm[4]) <= atm[3] <= max(atm[2], atm[4])
+
+
+def test_quote_prices_at_surface_iv():
+    surface = fitted_surface()
+    quote = surface.quote(55.0, 60)
+    expected = call_price(np.array([SPOT]), np.array([55.0]), np.array([60 / 365.0]),
+                          np.array([quote['implied_volatility']]))
+    assert abs(float(quote['price']) - float(expected[0])) < 1e-9
+    assert 0 < float(quote['delta']) < 0.5
+    assert float(quote['theta']) < 0
+
+
+def test_no_usable_quotes_means_no_surface():
+    assert fit_surface(SPOT, [(30, STRIKES, np.full(len(STRIKES), np.nan))]) is None
@@ -0,0 +1,402 @@
+"""
+Vectorized scoring of whole option chains
+
+score_chain() computes every component of OptionsAnalyzer's comprehensive
+score with array math over a chain at once. Each component records which
+tier (branch) every contract fell into; those compact reason codes are all a
+scored contract carries until explain() renders its human-readable reasons,
+which only happens for contracts that are displayed or persisted. With the Monte Carlo
+engine off, scores match the scalar path exactly (tests/test_chain_scoring.py checks this).
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .monte_carlo import simulate_calls
+
+logger = logging.getLogger(__name__)
+
+
+# Chain fields the scorer reads, with the defaults the scalar path falls back to
+REQUIRED_FIELDS = ('strike', 'ask', 'mid', 'days_to_expiration', 'implied_volatility')
+OPTIONAL_FIELDS = ('delta', 'theta', 'gamma', 'volume', 'open_interest', 'spread_pct',
+                   'iv_percentile', 'current_stock_price')
+
+# Extra per-contract outputs when the Monte Carlo engine is on
+SIMULATED_FIELDS = ('probability_of_profit', 'return_p5', 'return_p95')
+
+# (points, reason template) per tier, in the order the scalar path tests them
+MONEYNESS_TIERS = [
+    (25, "Optimal strike near money (${strike:.2f})"),
+    (20, "Good OTM strike for momentum (${strike:.2f})"),
+    (18, "Slightly ITM with intrinsic value (${strike:.2f})"),
+    (15, "Further OTM for higher leverage (${strike:.2f})"),
+    (10, "Deep ITM - expensive but safer (${strike:.2f})"),
+    (5, "Far OTM - high risk (${strike:.2f})")
+]
+EXPIRATION_TIERS = [
+    (20, "Optimal expiration ({days} days) with reasonable time value"),
+    (15, "Good expiration ({days} days)"),
+    (10, "Acceptable expiration ({days} days)"),
+    (5, "Short expiration ({days} days) - high theta risk"),
+    (8, "Long expiration ({days} days) - expensive time value")
+]
+ACTIVITY_TIERS = [
+    (0, "High volume ({volume}) - easy to trade"),
+    (0, "Decent volume ({volume}) - tradeable"),
+    (0, "High open interest ({open_interest}) - good liquidity"),
+    (0, "Good open interest ({open_interest})")
+]
+SPREAD_TIERS = [
+    (0, "Tight bid-ask spread"),
+    (0, "Acceptable spread"),
+    (0, "Wide spread but tradeable")
+]
+DELTA_TIERS = [
+    (8, "Good delta ({delta:.2f}) - balanced risk/reward"),
+    (6, "Acceptable delta ({delta:.2f})"),
+    (4, "High delta ({delta:.2f}) - expensive but safer"),
+    (3, "Low delta ({delta:.2f}) - high leverage")
+]
+THETA_TIERS = [
+    (4, "Low theta decay ({theta:.3f})"),
+    (2, "Moderate theta decay ({theta:.3f})"),
+    (-2, "High theta decay ({theta:.3f}) - time decay risk")
+]
+GAMMA_TIERS = [
+    (3, "Good gamma ({gamma:.3f}) - responsive to stock moves")
+]
+IV_TIERS = [
+    (10, "Reasonable IV ({iv:.1%}) - not overpriced"),
+    (7, "Acceptable IV ({iv:.1%})"),
+    (3, "High IV ({iv:.1%}) - expensive but potential for IV crush"),
+    (5, "Low IV ({iv:.1%}) - cheap but low volatility")
+]
+EXPECTED_RETURN_TIERS = [
+    (10, "High expected return ({expected_return:.1%})"),
+    (7, "Good expected return ({expected_return:.1%})"),
+    (4, "Positive expected return ({expected_return:.1%})"),
+    (2, "Moderate expected return ({expected_return:.1%})"),
+    (-5, "Poor expected return ({expected_return:.1%})")
+]
+RISK_REWARD_TIERS = [
+    (10, "Excellent risk/reward ratio ({risk_reward:.1f})"),
+    (8, "Good risk/reward ratio ({risk_reward:.1f})"),
+    (5, "Acceptable risk/reward ratio ({risk_reward:.1f})"),
+    (2, "Moderate risk/reward ratio ({risk_reward:.1f})")
+]
+
+# Tier thresholds, highest tier first. Fixed-scenario returns assume the stock moves, so they
+# run high; simulated returns price each call against its own IV and centre on zero
+# (utils/monte_carlo.py), and simulated risk/reward is the mean winning multiple of premium,
+# so the engine gets its own cut-offs. On a synthetic chain quoted within ~15% of fair value they
+# split returns near their 90th/75th/60th/35th percentiles and risk/reward near 70th/55th/40th/15th
+EXPECTED_RETURN_THRESHOLDS = (0.3, 0.1, 0.0, -0.2)
+SIMULATED_EXPECTED_RETURN_THRESHOLDS = (0.15, 0.05, 0.0, -0.10)
+RISK_REWARD_THRESHOLDS = (2.0, 1.5, 1.0, 0.5)
+SIMULATED_RISK_REWARD_THRESHOLDS = (5.0, 3.0, 2.0, 1.0)
+
+# Components in the order their points are added and their reasons listed
+COMPONENTS = [
+    ('moneyness', MONEYNESS_TIERS),
+    ('expiration', EXPIRATION_TIERS),
+    ('activity', ACTIVITY_TIERS),
+    ('spread', SPREAD_TIERS),
+    ('delta', DELTA_TIERS),
+    ('theta', THETA_TIERS),
+    ('gamma', GAMMA_TIERS),
+    ('iv', IV_TIERS),
+    ('expected_return', EXPECTED_RETURN_TIERS),
+    ('risk_reward', RISK_REWARD_TIERS)
+]
+
+# Score terms a config's scoring_weights can scale (missing names weigh 1.0)
+WEIGHTED_TERMS = ('moneyness', 'expiration', 'liquidity', 'delta', 'theta', 'gamma', 'iv',
+                  'expected_return', 'technical', 'risk_reward')
+
+
+def chain_columns(chain: List[Dict]) -> Dict[str, np.ndarray]:
+    """Columnar float view of a chain; missing optional fields are NaN"""
+    columns = {}
+    for field in REQUIRED_FIELDS:
+        columns[field] = np.array([float(option[field]) for option in chain], dtype=float)
+    for field in OPTIONAL_FIELDS:
+        columns[field] = np.array([np.nan if option.get(field) is None else float(option[field])
+                                   for option in chain], dtype=float)
+    return columns
+
+
+def _default(values: np.ndarray, default: float) -> np.ndarray:
+    return np.where(np.isnan(values), default, values)
+
+
+def _tier(conditions: List[np.ndarray], default: int = -1) -> np.ndarray:
+    """Index of the first true condition per contract (default if none)"""
+    return np.select(conditions, list(range(len(conditions))), default=default)
+
+
+def _points(tiers: np.ndarray, table: List) -> np.ndarray:
+    points = np.array([p for p, _ in table] + [0], dtype=float)
+    return points[tiers]  # tier -1 picks the trailing 0
+
+
+def _py_min(a, b):
+    """Python's min(a, b), including its NaN behaviour"""
+    return np.where(b < a, b, a)
+
+
+def _py_max(a, b):
+    """Python's max(a, b), including its NaN behaviour"""
+    return np.where(b > a, b, a)
+
+
+def point_tiers(moneyness: np.ndarray, days: np.ndarray, time_value_pct: np.ndarray, delta: np.ndarray,
+                theta_ratio: np.ndarray, gamma: np.ndarray, iv: np.ndarray, iv_percentile: np.ndarray,
+                expected_return: np.ndarray, risk_reward: np.ndarray,
+                return_thresholds: Tuple[float, ...] = EXPECTED_RETURN_THRESHOLDS,
+                risk_reward_thresholds: Tuple[float, ...] = RISK_REWARD_THRESHOLDS) -> Dict[str, np.ndarray]:
+    """Tier of every point-carrying component, from the metrics of a single call or any other position"""
+    with np.errstate(invalid='ignore'):
+        m = moneyness
+        tiers = {}
+        tiers['moneyness'] = _tier([(0.95 <= m) & (m <= 1.05), (1.05 < m) & (m <= 1.15),
+                                    (0.90 <= m) & (m < 0.95), (1.15 < m) & (m <= 1.25), m < 0.90, m > 1.25])
+        tiers['expiration'] = _tier([(30 <= days) & (days <= 45) & (time_value_pct < 80),
+                                     ((25 <= days) & (days < 30)) | ((45 < days) & (days <= 60)),
+                                     ((20 <= days) & (days < 25)) | ((60 < days) & (days <= 70)),
+                                     days < 20, days > 70])
+        tiers['delta'] = _tier([(0.25 <= delta) & (delta <= 0.45),
+                                ((0.20 <= delta) & (delta < 0.25)) | ((0.45 < delta) & (delta <= 0.55)),
+                                delta > 0.55, delta < 0.20])
+        tiers['theta'] = _tier([theta_ratio < 0.02, theta_ratio < 0.03, theta_ratio > 0.05])
+        tiers['gamma'] = _tier([(0.01 <= gamma) & (gamma <= 0.05)])
+        # NaN IV is a quoted NaN: like the scalar path, it fails every IV test
+        tiers['iv'] = _tier([(0.3 <= iv) & (iv <= 0.6) & (30 <= iv_percentile) & (iv_percentile <= 70),
+                             ((0.2 <= iv) & (iv < 0.3)) | ((0.6 < iv) & (iv <= 0.8)),
+                             (iv > 0.8) | (iv_percentile > 80),
+                             (iv < 0.2) | (iv_percentile < 20)])
+        tiers['expected_return'] = _tier([expected_return > t for t in return_thresholds], default=4)
+        tiers['risk_reward'] = _tier([risk_reward > t for t in risk_reward_thresholds])
+    return tiers
+
+
+def weighted_score(tiers: Dict[str, np.ndarray], normalized_liquidity: np.ndarray, technical_bonus: float,
+                   weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Total points of point_tiers() plus liquidity and technical points, each term scaled by its weight"""
+    # Accumulate in the scalar path's order so floating-point sums agree exactly
+    weight = lambda term: 1.0 if not weights else float(weights.get(term, 1.0))
+    score = np.zeros(len(normalized_liquidity))
+    score = score + _points(tiers['moneyness'], MONEYNESS_TIERS) * weight('moneyness')
+    score = score + _points(tiers['expiration'], EXPIRATION_TIERS) * weight('expiration')
+    score = score + normalized_liquidity * weight('liquidity')
+    score = score + _points(tiers['delta'], DELTA_TIERS) * weight('delta')
+    score = score + _points(tiers['theta'], THETA_TIERS) * weight('theta')
+    score = score + _points(tiers['gamma'], GAMMA_TIERS) * weight('gamma')
+    score = score + _points(tiers['iv'], IV_TIERS) * weight('iv')
+    score = score + _points(tiers['expected_return'], EXPECTED_RETURN_TIERS) * weight('expected_return')
+    score = score + min(technical_bonus, 15) * weight('technical')
+    score = score + _points(tiers['risk_reward'], RISK_REWARD_TIERS) * weight('risk_reward')
+    return score
+
+
+def score_chain(chain: Union[List[Dict], Dict[str, np.ndarray]], spot: float, technical_bonus: float,
+                simulation: Optional[Dict] = None, weights: Optional[Dict[str, float]] = None) -> Dict:
+    """Score every contract in a chain (or its chain_columns()); returns per-contract arrays plus each component's tiers
+
+    With simulation settings (simulate_calls() keyword arguments), expected return and
+    risk/reward come from the Monte Carlo engine instead of the fixed scenarios, and
+    probability of profit and tail returns are added. weights scales the points of the
+    WEIGHTED_TERMS by name; unit weights leave scores unchanged.
+    """
+    c = chain if isinstance(chain, dict) else chain_columns(chain)
+    n = len(c['strike'])
+    strike = c['strike']
+    ask = c['ask']
+    days = c['days_to_expiration']
+    iv = c['implied_volatility']
+    premium = np.where(ask > 0, ask, c['mid'])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Option value analysis
+        moneyness = spot / strike
+        intrinsic = np.maximum(0, spot - strike)
+        time_value = premium - intrinsic
+        time_value_pct = np.where(premium > 0, time_value / premium * 100, 0)
+
+        volume = _default(c['volume'], 0)
+        open_interest = _default(c['open_interest'], 0)
+        liquidity_score = (np.select([volume > 100, volume > 10], [30, 20], 0)
+                           + np.select([open_interest > 500, open_interest > 100], [30, 20], 0)
+                           + np.select([_default(c['spread_pct'], 0.1) < 0.1,
+                                        _default(c['spread_pct'], 0.1) < 0.2], [40, 20], 0))
+        iv_percentile = _default(c['iv_percentile'], 50)
+
+        normalized_liquidity = np.minimum(liquidity_score / 100 * 20, 20)
+        spread_pct = _default(c['spread_pct'], 0.5)
+        delta = _default(c['delta'], 0.5)
+        theta = _default(c['theta'], -0.01)
+        gamma = _default(c['gamma'], 0.01)
+        theta_ratio = np.abs(theta) / np.where(ask > 0, ask, 0.01)
+
+        if simulation:
+            simulated = simulate_calls(spot, strike, premium, days, iv, **simulation)
+            expected_return = simulated['expected_return']
+            risk_reward = simulated['risk_reward']
+            return_thresholds = SIMULATED_EXPECTED_RETURN_THRESHOLDS
+            risk_reward_thresholds = SIMULATED_RISK_REWARD_THRESHOLDS
+        else:
+            expected_return = _expected_return(spot, strike, premium, days, iv, moneyness)
+            risk_reward = _risk_reward(_default(c['current_stock_price'], 0), strike, premium)
+            return_thresholds = EXPECTED_RETURN_THRESHOLDS
+            risk_reward_thresholds = RISK_REWARD_THRESHOLDS
+
+        tiers = point_tiers(moneyness, days, time_value_pct, delta, theta_ratio, gamma, iv, iv_percentile,
+                            expected_return, risk_reward, return_thresholds, risk_reward_thresholds)
+        # Reason-only components
+        tiers['activity'] = _tier([volume > 100, volume > 10, open_interest > 500, open_interest > 100])
+        tiers['spread'] = _tier([spread_pct < 0.1, spread_pct < 0.2, spread_pct < 0.35])
+
+    score = weighted_score(tiers, normalized_liquidity, technical_bonus, weights)
+
+    batch = {
+        'score': score,
+        'moneyness': moneyness,
+        'time_value_pct': time_value_pct,
+        'liquidity_score': liquidity_score,
+        'iv_percentile': iv_percentile,
+        'expected_return': expected_return,
+        'risk_reward': risk_reward,
+        'tiers': tiers
+    }
+    if simulation:
+        for name in SIMULATED_FIELDS:
+            batch[name] = simulated[name]
+    return batch
+
+
+def _expected_return(spot: float, strike: np.ndarray, premium: np.ndarray, days: np.ndarray,
+                     iv: np.ndarray, moneyness: np.ndarray) -> np.ndarray:
+    """Array form of OptionsAnalyzer._calculate_expected_return"""
+    time_to_exp = days / 365.0
+    expected_move = spot * iv * np.sqrt(time_to_exp) * 0.6
+
+    total = np.zeros(len(strike))
+    for multiple, weight in ((1, 0.4), (2, 0.2), (0.5, 0.3)):
+        price = spot + expected_move * multiple
+        total = total + np.where(price > strike, (price - strike - premium) / premium * weight, 0.0)
+
+    intrinsic = spot - strike
+    loss = np.where(moneyness > 1.05,
+                    np.where(intrinsic > 0, (intrinsic - premium) / premium * 0.1, -0.8 * 0.1),
+                    -0.9 * 0.1)
+    total = total + loss
+    bounded = _py_max(-0.95, _py_min(2.0, total))
+    return np.where(premium <= 0, 0.0, bounded)
+
+
+def _risk_reward(spot: np.ndarray, strike: np.ndarray, premium: np.ndarray) -> np.ndarray:
+    """Array form of OptionsAnalyzer._calculate_risk_reward"""
+    total = np.zeros(len(strike))
+    count = np.zeros(len(strike))
+    for multiple in (1.5, 2.0, 1.25):
+        target = spot * multiple
+        hit = target > strike
+        total = total + np.where(hit, target - strike - premium, 0.0)
+        count = count + hit
+    average = np.where(count > 0, total / np.where(count > 0, count, 1), 0)
+    ratio = np.where(premium > 0, average / premium, 0.0)
+    return np.where((premium <= 0) | (spot <= 0), 0.0, ratio)
+
+
+# Numeric parameters kept per contract for rendering its explanation later
+REASON_PARAMS = ('moneyness', 'time_value_pct', 'liquidity_score', 'iv_percentile', 'expected_return', 'risk_reward')
+
+
+def reason_codes(batch: Dict) -> Tuple[List[List[int]], List[List[float]]]:
+    """Compact per-contract reason codes (one tier per component) and their numeric parameters"""
+    codes = np.stack([batch['tiers'][name] for name, _ in COMPONENTS], axis=1).tolist()
+    params = np.stack([np.asarray(batch[name], dtype=float) for name in REASON_PARAMS], axis=1).tolist()
+    return codes, params
+
+
+def score_fields(chain: Union[List[Dict], Dict[str, np.ndarray]], spot: float, technical_bonus: float,
+                 technical_reasons: List[str], simulation: Optional[Dict] = None,
+                 weights: Optional[Dict[str, float]] = None) -> List[Dict]:
+    """Per-contract fields a batch-scored recommendation carries (score, expected return, reason codes)"""
+    batch = score_chain(chain, spot, technical_bonus, simulation, weights)
+    codes, params = reason_codes(batch)
+    fields = [
+        {
+            'score': score,
+            'expected_return': expected_return,
+            'reason_codes': codes[i],
+            'reason_params': params[i],
+            'technical_reasons': technical_reasons
+        }
+        for i, (score, expected_return) in enumerate(zip(batch['score'].tolist(),
+                                                         batch['expected_return'].tolist()))
+    ]
+    for name in SIMULATED_FIELDS:
+        if name in batch:
+            for contract_fields, value in zip(fields, batch[name].tolist()):
+                contract_fields[name] = value
+    return fields
+
+
+def render_reasons(codes: List[int], params: List[float], option: Dict, technical_reasons: List[str]) -> List[str]:
+    """Human-readable reasons for one scored contract, in the scalar path's order"""
+    values = dict(zip(REASON_PARAMS, params))
+    values.update({
+        'strike': option['strike'],
+        'days': option['days_to_expiration'],
+        'volume': option.get('volume', 0),
+        'open_interest': option.get('open_interest', 0),
+        'delta': option.get('delta', 0.5),
+        'theta': abs(option.get('theta', -0.01)),
+        'gamma': option.get('gamma', 0.01),
+        'iv': option.get('implied_volatility', 0.3)
+    })
+    reasons = []
+    for (name, table), tier in zip(COMPONENTS, codes):
+        if name == 'risk_reward':
+            reasons.extend(technical_reasons)
+        if tier >= 0:
+            reasons.append(table[tier][1].format(**values))
+    return reasons
+
+
+def _assessment(value: float, labels: List[str], thresholds: List[float]) -> str:
+    for label, threshold in zip(labels, thresholds):
+        if value > threshold:
+            return label
+    return labels[-1]
+
+
+def build_analysis(score: float, params: List[float], reasons: List[str]) -> Dict:
+    """The scalar path's analysis dict, rebuilt from a contract's reason parameters"""
+    values = dict(zip(REASON_PARAMS, params))
+    iv_percentile = values['iv_percentile']
+    return {
+        'total_score': score,
+        'moneyness': values['moneyness'],
+        'reasons': reasons,
+        'liquidity_assessment': _assessment(values['liquidity_score'], ['Excellent', 'Good', 'Fair', 'Poor'], [80, 60, 40]),
+        'risk_assessment': _assessment(score, ['Low', 'Medium', 'High', 'Very High'], [80, 60, 40]),
+        'expected_return': values['expected_return'],
+        'risk_reward_ratio': values['risk_reward'],
+        'time_value_pct': values['time_value_pct'],
+        'iv_rank': 'Low' if iv_percentile < 30 else 'High' if iv_percentile > 70 else 'Normal'
+    }
+
+
+def explain(recommendation: Dict) -> Dict:
+    """Render a recommendation's reasons and analysis from its codes, in place (no-op if already done)"""
+    if 'analysis' in recommendation or 'reason_codes' not in recommendation:
+        return recommendation
+    reasons = render_reasons(recommendation['reason_codes'], recommendation['reason_params'],
+                             recommendation, recommendation.get('technical_reasons', []))
+    recommendation['recommendation_reasons'] = reasons
+    recommendation['analysis'] = build_analysis(recommendation['score'], recommendation['reason_params'], reasons)
+    return recommendation
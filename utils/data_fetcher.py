@@ -6,44 +6,69 @@ import logging
 import json
 import time
 import os
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from functools import lru_cache
 import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import pickle
 from pathlib import Path
 from scipy.stats import norm
 import math
 import random
 
+from .intraday import IntradayBarStore
+from .iv_history import IVHistoryStore
+from .iv_solver import DEFAULT_IV, MIN_REPORTED_IV, implied_volatility
+from .vol_surface import VolSurface, fit_surface
+from .records import OptionContract
+
 logger = logging.getLogger(__name__)
 
 
 class RateLimiter:
-    """Rate limiter for API calls"""
+    """Thread-safe rate limiter for API calls"""
     
     def __init__(self, max_requests_per_minute: int = 60):
         self.max_requests = max_requests_per_minute
         self.requests = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        
+    @property
+    def rate_per_second(self) -> float:
+        """Allowed request rate"""
+        return self.max_requests / 60.0
         
     def wait_if_needed(self):
         """Wait if rate limit reached"""
-        now = time.time()
-        
-        # Remove requests older than 1 minute
-        self.requests = [req_time for req_time in self.requests if now - req_time < 60]
-        
-        if len(self.requests) >= self.max_requests:
-            sleep_time = 60 - (now - self.requests[0]) + 1
-            logger.info(f"Rate limit reached, sleeping for {sleep_time:.1f} seconds")
+        while True:
+            with self._lock:
+                now = time.time()
+                
+                # Remove requests older than 1 minute
+                self.requests = [req_time for req_time in self.requests if now - req_time < 60]
+                
+                if len(self.requests) < self.max_requests:
+                    self.requests.append(now)
+                    return
+                
+                sleep_time = 60 - (now - self.requests[0])
+            
+            # Sleep outside the lock so other workers can check in
+            logger.debug(f"Rate limit reached, sleeping for {sleep_time:.1f} seconds")
+            sleep_time = max(sleep_time, 0.01)
+            self._local.waited = getattr(self._local, 'waited', 0.0) + sleep_time
             time.sleep(sleep_time)
-            self.requests = []
         
-        self.requests.append(now)
+    def pop_wait_time(self) -> float:
+        """Time the calling thread spent throttled since the last call"""
+        waited = getattr(self._local, 'waited', 0.0)
+        self._local.waited = 0.0
+        return waited
         
     def add_jitter(self):
         """Add random jitter to requests"""
@@ -51,6 +76,41 @@ class RateLimiter:
         time.sleep(jitter)
 
 
+class AdaptiveBatcher:
+    """Sizes the in-flight request batch from observed latency and error rate"""
+    
+    def __init__(self, max_size: int, min_size: int = 1, target_latency: float = 3.0,
+                 max_error_rate: float = 0.2, smoothing: float = 0.2):
+        self.max_size = max(min_size, max_size)
+        self.min_size = min_size
+        self.size = max(min_size, self.max_size // 2)
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.smoothing = smoothing
+        self.latency = None
+        self.error_rate = 0.0
+        
+    def record(self, latency: float, ok: bool):
+        """Fold one request outcome in: additive increase, multiplicative decrease"""
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
+        self.error_rate += self.smoothing * ((0.0 if ok else 1.0) - self.error_rate)
+        
+        if self.error_rate > self.max_error_rate or self.latency > self.target_latency:
+            self.size = max(self.min_size, self.size // 2)
+        elif ok:
+            self.size = min(self.max_size, self.size + 1)
+        
+    def window(self, rate_per_second: float) -> int:
+        """Requests to keep in flight: no more than the rate limit can serve (Little's law)"""
+        if self.latency is None:
+            return self.size
+        capacity = math.ceil(rate_per_second * self.latency) + 1
+        return max(self.min_size, min(self.size, capacity))
+
+
 class DataFetcher:
     """Data fetcher for stocks and options"""
     
@@ -64,6 +124,16 @@ class DataFetcher:
         self.fundamentals_cache = self._load_fundamentals_cache()
         self.fundamentals_cache_expiry_hours = 24  # Cache expiry in hours
         self.rate_limiter = RateLimiter(max_requests_per_minute=10)
+        # Shared limiter for per-symbol history, fundamentals and quote requests
+        self.request_limiter = RateLimiter(
+            max_requests_per_minute=getattr(config.data, 'requests_per_minute', 120)
+        )
+        self._fundamentals_lock = threading.Lock()
+        self.max_workers = getattr(config.data, 'max_workers', 8)
+        # Today's 1m/5m/15m bars, filled in by get_quote
+        self.intraday = IntradayBarStore(capacity=getattr(config.data, 'intraday_bars', 390))
+        # Daily ATM IV per symbol, for real IV rank/percentile
+        self.iv_history = IVHistoryStore(self.cache_dir / "iv_history.pkl")
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
@@ -87,8 +157,10 @@ class DataFetcher:
     def _save_fundamentals_cache(self):
         try:
             import pickle
+            with self._fundamentals_lock:
+                snapshot = dict(self.fundamentals_cache)
             with open(self.fundamentals_cache_file, 'wb') as f:
-                pickle.dump(self.fundamentals_cache, f)
+                pickle.dump(snapshot, f)
         except Exception as e:
             logger.warning(f"Error saving fundamentals cache: {e}")
 
@@ -119,9 +191,11 @@ class DataFetcher:
                     return data
             # Not cached or stale, fetch from yfinance
             ticker = yf.Ticker(symbol)
+            self.request_limiter.wait_if_needed()
             info = ticker.info
             # Get financial data with error handling
             try:
+                self.request_limiter.wait_if_needed()
                 financials = ticker.quarterly_financials
                 revenue_growth = None
                 if not financials.empty and len(financials.columns) >= 2:
@@ -143,9 +217,11 @@ class DataFetcher:
                 'short_ratio': info.get('shortRatio', 2),
                 'beta': info.get('beta', 1.2)
             }
-            self.fundamentals_cache[symbol] = (data, now)
+            with self._fundamentals_lock:
+                self.fundamentals_cache[symbol] = (data, now)
+                cache_size = len(self.fundamentals_cache)
             # Save cache every 100 updates to avoid excessive disk writes
-            if len(self.fundamentals_cache) % 100 == 0:
+            if cache_size % 100 == 0:
                 self._save_fundamentals_cache()
             return data
         except Exception as e:
@@ -163,7 +239,8 @@ class DataFetcher:
                 'short_ratio': 2,
                 'beta': 1.2
             }
-            self.fundamentals_cache[symbol] = (data, time.time())
+            with self._fundamentals_lock:
+                self.fundamentals_cache[symbol] = (data, time.time())
             return data
 
     # Save fundamentals cache at the end of enrichment (call this from market_scanner after enrichment)
@@ -448,45 +525,30 @@ class DataFetcher:
             return []
 
     def _enrich_finnhub_tickers(self, tickers: list) -> list:
-        """Enrich Finnhub tickers with price and market cap using yfinance (batch)."""
-        import yfinance as yf
-        import time
-        enriched = []
-        batch_size = 100
+        """Enrich Finnhub tickers with price and market cap using yfinance (concurrent, rate limited)."""
         total = len(tickers)
-        for i in range(0, total, batch_size):
-            batch = tickers[i:i+batch_size]
-            symbols = [t['symbol'] for t in batch]
-            try:
-                yf_tickers = yf.Tickers(' '.join(symbols))
-                for symbol in symbols:
-                    t = next((item for item in batch if item['symbol'] == symbol), None)
-                    if not t:
-                        continue
-                    info = None
-                    try:
-                        info = yf_tickers.tickers[symbol].info
-                    except Exception:
-                        continue
-                    price = info.get('regularMarketPrice')
-                    market_cap = info.get('marketCap')
-                    if price and market_cap:
-                        t['price'] = price
-                        t['market_cap'] = market_cap
-                        t['volume'] = info.get('volume', 0)
-                        t['avg_volume'] = info.get('averageVolume', 0)
-                        t['sector'] = info.get('sector', 'Unknown')
-                        t['industry'] = info.get('industry', 'Unknown')
-                        t['exchange'] = info.get('exchange', t.get('exchange', 'US'))
-                        t['pe_ratio'] = info.get('forwardPE')
-                        t['has_options'] = info.get('options', []) != []
-                        t['market_cap_category'] = self._get_market_cap_category(market_cap)
-                        enriched.append(t)
-                self.rate_limiter.add_jitter()
-            except Exception as e:
-                logger.warning(f"Error enriching batch {i}-{i+batch_size}: {e}")
-            logger.info(f"Enriched {min(i+batch_size, total)}/{total} Finnhub tickers...")
-            time.sleep(1)  # avoid rate limits
+        enriched_flags = [False] * total
+        done = 0
+        for i, info in self.map_concurrent(self._fetch_ticker_info, [t['symbol'] for t in tickers]):
+            done += 1
+            t = tickers[i]
+            price = info.get('regularMarketPrice') if info else None
+            market_cap = info.get('marketCap') if info else None
+            if price and market_cap:
+                t['price'] = price
+                t['market_cap'] = market_cap
+                t['volume'] = info.get('volume', 0)
+                t['avg_volume'] = info.get('averageVolume', 0)
+                t['sector'] = info.get('sector', 'Unknown')
+                t['industry'] = info.get('industry', 'Unknown')
+                t['exchange'] = info.get('exchange', t.get('exchange', 'US'))
+                t['pe_ratio'] = info.get('forwardPE')
+                t['has_options'] = info.get('options', []) != []
+                t['market_cap_category'] = self._get_market_cap_category(market_cap)
+                enriched_flags[i] = True
+            if done % 100 == 0 or done == total:
+                logger.info(f"Enriched {done}/{total} Finnhub tickers...")
+        enriched = [t for t, ok in zip(tickers, enriched_flags) if ok]
         logger.info(f"Total enriched Finnhub tickers: {len(enriched)}")
         return enriched
 
@@ -560,69 +622,38 @@ class DataFetcher:
         except:
             return 0
     
+    def _fetch_ticker_info(self, symbol: str) -> Dict:
+        """Fetch yfinance info for one symbol through the shared rate limiter"""
+        self.request_limiter.wait_if_needed()
+        return yf.Ticker(symbol).info
+    
     def update_stock_data_with_current_prices(self, stocks: List[Dict]) -> List[Dict]:
-        """Update stock data with current prices and volumes using batch processing"""
-        updated_stocks = []
-        logger.info(f"Updating current data for {len(stocks)} stocks using batch processing...")
-        
-        # Process in large batches using yf.Tickers (much more efficient)
-        batch_size = 200  # yfinance's optimal batch size
-        total_batches = (len(stocks) + batch_size - 1) // batch_size
+        """Update stock data with current prices and volumes using the rate-limited worker pool"""
+        logger.info(f"Updating current data for {len(stocks)} stocks...")
         
-        for i in range(0, len(stocks), batch_size):
-            batch = stocks[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
-            
-            try:
-                # Get symbols for this batch
-                symbols = [stock['symbol'] for stock in batch]
-                symbols_str = ' '.join(symbols)
-                
-                # Use yf.Tickers for batch processing (much more efficient)
-                yf_tickers = yf.Tickers(symbols_str)
-                
-                for stock in batch:
-                    symbol = stock['symbol']
-                    try:
-                        # Get ticker info from batch
-                        ticker = yf_tickers.tickers[symbol]
-                        info = ticker.info
-                        
-                        # Update stock data with current info
-                        price = info.get('regularMarketPrice')
-                        volume = info.get('volume', 0)
-                        avg_volume = info.get('averageVolume', 0)
-                        
-                        if price is not None and price > 0:
-                            stock['price'] = price
-                        if volume is not None:
-                            stock['volume'] = volume
-                        if avg_volume is not None:
-                            stock['avg_volume'] = avg_volume
-                            
-                        updated_stocks.append(stock)
-                        
-                    except Exception as e:
-                        # Silently skip stocks that fail (no error logging)
-                        updated_stocks.append(stock)
-                        continue
+        done = 0
+        for i, info in self.map_concurrent(self._fetch_ticker_info, [stock['symbol'] for stock in stocks]):
+            done += 1
+            # Stocks that fail keep their existing data
+            if info:
+                stock = stocks[i]
+                price = info.get('regularMarketPrice')
+                volume = info.get('volume', 0)
+                avg_volume = info.get('averageVolume', 0)
                 
-                # Progress logging
-                if batch_num % 5 == 0 or batch_num == total_batches:
-                    logger.info(f"Processed batch {batch_num}/{total_batches} ({min(i + batch_size, len(stocks))}/{len(stocks)} stocks)")
-                
-                # Rate limiting between batches
-                if i + batch_size < len(stocks):
-                    time.sleep(1)  # 1 second between batches
-                    
-            except Exception as e:
-                logger.warning(f"Error processing batch {batch_num}: {e}")
-                # Add stocks from failed batch without updates
-                updated_stocks.extend(batch)
-                continue
+                if price is not None and price > 0:
+                    stock['price'] = price
+                if volume is not None:
+                    stock['volume'] = volume
+                if avg_volume is not None:
+                    stock['avg_volume'] = avg_volume
+            
+            # Progress logging
+            if done % 1000 == 0 or done == len(stocks):
+                logger.info(f"Updated {done}/{len(stocks)} stocks")
         
-        logger.info(f"Updated data for {len(updated_stocks)} stocks")
-        return updated_stocks
+        logger.info(f"Updated data for {len(stocks)} stocks")
+        return list(stocks)
     
     def _get_market_cap_category(self, market_cap: float) -> str:
         """Get market cap category for filtering"""
@@ -635,158 +666,44 @@ class DataFetcher:
         else:
             return 'mega_cap'
     
-    def get_options_chain(self, symbol: str) -> List[Dict]:
-        """Get options chain with IMPROVED analysis for low-volume options"""
-        try:
-            ticker = yf.Ticker(symbol)
-            
-            # Get available expiration dates
-            expirations = ticker.options
-            if not expirations:
-                logger.warning(f"No options available for {symbol}")
-                return []
-                
-            options_data = []
-            current_price = self.get_quote(symbol)['price']
-            
-            # Sort expirations by days to expiration for better selection
-            expirations_with_days = []
-            for exp_date in expirations:
-                exp_datetime = datetime.strptime(exp_date, '%Y-%m-%d')
-                days_to_exp = (exp_datetime - datetime.now()).days
-                if 20 <= days_to_exp <= 70:  # Keep the same range
-                    expirations_with_days.append((exp_date, days_to_exp))
-            
-            # Sort by days to expiration to get variety
-            expirations_with_days.sort(key=lambda x: x[1])
-            
-            # Take a variety of expiration dates (not just the first one)
-            selected_expirations = []
-            if len(expirations_with_days) >= 3:
-                # Take first, middle, and last expiration for variety
-                selected_expirations = [
-                    expirations_with_days[0][0],  # Shortest
-                    expirations_with_days[len(expirations_with_days)//2][0],  # Middle
-                    expirations_with_days[-1][0]  # Longest
-                ]
-            else:
-                selected_expirations = [exp[0] for exp in expirations_with_days]
-            
-            logger.debug(f"Selected {len(selected_expirations)} expiration dates for {symbol}: {selected_expirations}")
-            
-            for exp_date in selected_expirations:
-                # Convert expiration to datetime
-                exp_datetime = datetime.strptime(exp_date, '%Y-%m-%d')
-                days_to_exp = (exp_datetime - datetime.now()).days
-                    
-                # Get options data
-                opt_chain = ticker.option_chain(exp_date)
-                calls = opt_chain.calls
-                
-                # Process calls with RELAXED criteria
-                for _, call in calls.iterrows():
-                    strike = call['strike']
-                    
-                    # RELAXED: Allow wider range (85% to 120% of current price)
-                    if strike < current_price * 0.85 or strike > current_price * 1.20:
-                        continue
-                    
-                    # Get option data
-                    bid = call['bid']
-                    ask = call['ask']
-                    volume = call['volume'] if pd.notna(call['volume']) else 0
-                    open_interest = call['openInterest'] if pd.notna(call['openInterest']) else 0
-                    
-                    # Calculate spread
-                    if ask > 0:
-                        spread_pct = (ask - bid) / ask
-                    else:
-                        spread_pct = 1.0
-                    
-                    # STRICT: Must meet higher liquidity requirements
-                    acceptable = False
-                    liquidity_score = 0
-                    
-                    # Condition 1: Must have significant volume
-                    if volume >= self.min_option_volume:
-                        acceptable = True
-                        liquidity_score += 40
-                    
-                    # Condition 2: Must have significant open interest
-                    if open_interest >= self.min_option_oi:
-                        acceptable = True
-                        liquidity_score += 40
-                    
-                    # Condition 3: Tight spread requirement
-                    if spread_pct <= self.max_bid_ask_spread and ask > 0:
-                        acceptable = True
-                        liquidity_score += 20
-                    
-                    # Condition 4: Near the money options (more liquid)
-                    moneyness = abs(strike - current_price) / current_price
-                    if moneyness <= 0.05:  # Within 5% of current price
-                        liquidity_score += 20
-                    
-                    if not acceptable:
-                        continue
-                    
-                    # Calculate IMPLIED volatility if missing
-                    iv = call.get('impliedVolatility', 0)
-                    if iv == 0 or pd.isna(iv):
-                        # Estimate IV based on bid-ask spread and time
-                        iv = 0.3 + (spread_pct * 0.5)  # Higher spread = higher IV estimate
-                    
-                    option_data = {
-                        'symbol': symbol,
-                        'type': 'CALL',
-                        'strike': strike,
-                        'expiration': exp_date,
-                        'days_to_expiration': days_to_exp,
-                        'bid': bid,
-                        'ask': ask,
-                        'mid': (bid + ask) / 2 if ask > 0 else call.get('lastPrice', 0),
-                        'last': call.get('lastPrice', 0),
-                        'volume': int(volume),
-                        'open_interest': int(open_interest),
-                        'implied_volatility': iv,
-                        'in_the_money': call.get('inTheMoney', False),
-                        'contract_symbol': call.get('contractSymbol', ''),
-                        'spread_pct': spread_pct,
-                        'liquidity_score': liquidity_score,
-                        # Greeks estimates
-                        'delta': self._estimate_delta(current_price, strike, days_to_exp, iv),
-                        'theta': self._estimate_theta(current_price, strike, days_to_exp, iv, ask if ask > 0 else 0.01),
-                        'gamma': self._estimate_gamma(current_price, strike, days_to_exp, iv),
-                        'vega': self._estimate_vega(current_price, strike, days_to_exp, iv),
-                        'iv_percentile': min(95, max(5, iv * 150))  # Rough estimate
-                    }
-                    
-                    options_data.append(option_data)
-                    
-            # Silent processing - no verbose output
-            return options_data
-            
-        except Exception as e:
-            logger.error(f"Error getting options chain for {symbol}: {e}")
-            return []
+    def get_quote(self, symbol: str, max_age: Optional[float] = None) -> Dict:
+        """Get current quote for a symbol, reusing one fetched within max_age minutes
+        
+        max_age defaults to the quote refresh interval, so a long-running process
+        sees fresh prices instead of the first quote it ever fetched.
+        """
+        key = ('quote', symbol)
+        if max_age is None:
+            max_age = self.config.data.quote_refresh_interval
+        cached = self.cache.get(key)
+        if cached is not None and datetime.now() - datetime.fromisoformat(cached['timestamp']) < timedelta(minutes=max_age):
+            return cached
+        quote = self._fetch_quote(symbol)
+        self.cache[key] = quote
+        return quote
     
-    @lru_cache(maxsize=100)
-    def get_quote(self, symbol: str) -> Dict:
-        """Get current quote for a symbol"""
+    def _fetch_quote(self, symbol: str) -> Dict:
         try:
             ticker = yf.Ticker(symbol)
             
-            # Try to get intraday data first
-            data = ticker.history(period='1d', interval='5m')
+            # Try intraday bars first; only bars newer than the store's are fetched
+            session = self._refresh_intraday(symbol, ticker)
             
-            if data.empty:
+            if session is None:
                 # Fall back to daily data
                 data = ticker.history(period='5d')
                 if data.empty:
                     raise ValueError(f"No data available for {symbol}")
-                    
-            current_price = data['Close'].iloc[-1]
-            volume = data['Volume'].iloc[-1] if len(data) == 1 else data['Volume'].sum()
+                current_price = data['Close'].iloc[-1]
+                volume = data['Volume'].iloc[-1] if len(data) == 1 else data['Volume'].sum()
+                session = {
+                    'price': current_price,
+                    'volume': volume,
+                    'day_high': data['High'].max(),
+                    'day_low': data['Low'].min()
+                }
+            current_price = session['price']
+            volume = session['volume']
             
             # Get additional info
             info = ticker.info
@@ -798,8 +715,8 @@ class DataFetcher:
                 'avg_volume': info.get('averageVolume', volume),
                 'bid': info.get('bid', current_price * 0.995),  # Estimate if missing
                 'ask': info.get('ask', current_price * 1.005),  # Estimate if missing
-                'day_high': data['High'].max(),
-                'day_low': data['Low'].min(),
+                'day_high': session['day_high'],
+                'day_low': session['day_low'],
                 'prev_close': info.get('previousClose', current_price),
                 'timestamp': datetime.now().isoformat()
             }
@@ -808,9 +725,74 @@ class DataFetcher:
             logger.error(f"Error getting quote for {symbol}: {e}")
             raise
     
+    def _refresh_intraday(self, symbol: str, ticker) -> Optional[Dict]:
+        """Pull 1m bars since the last one held (or the whole session) into the intraday store"""
+        try:
+            if self.intraday.has_session(symbol):
+                start = datetime.fromtimestamp(self.intraday.last_time(symbol), tz=timezone.utc)
+                data = ticker.history(start=start, interval='1m')
+                new_session = False
+            else:
+                data = ticker.history(period='1d', interval='1m')
+                new_session = True
+            if data.empty:
+                new_session = False
+            else:
+                self.intraday.ingest(
+                    symbol,
+                    np.array([ts.timestamp() for ts in data.index], dtype=np.int64),
+                    data['Open'].to_numpy(), data['High'].to_numpy(), data['Low'].to_numpy(),
+                    data['Close'].to_numpy(), data['Volume'].to_numpy(),
+                    new_session=new_session
+                )
+        except Exception as e:
+            logger.debug(f"Intraday bars unavailable for {symbol}: {e}")
+            new_session = False
+        # Outside market hours the last session's bars still stand in for today's
+        if new_session or self.intraday.has_session(symbol):
+            return self.intraday.session_summary(symbol)
+        return None
+    
+    def map_concurrent(self, func: Callable, items: List, max_workers: Optional[int] = None) -> Iterator[Tuple[int, object]]:
+        """Run func over items on an I/O pool paced by the shared rate limiter, yielding (index, result) as results land"""
+        if not items:
+            return
+        workers = max(1, min(max_workers or self.max_workers, len(items)))
+        batcher = AdaptiveBatcher(max_size=workers)
+        limiter = self.request_limiter
+        
+        def timed(item):
+            start = time.time()
+            limiter.pop_wait_time()
+            try:
+                result, error = func(item), None
+            except Exception as e:
+                result, error = None, e
+            # Time spent waiting on the limiter is not provider latency
+            latency = time.time() - start - limiter.pop_wait_time()
+            return result, latency, error
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            in_flight = {}
+            next_item = 0
+            while next_item < len(items) or in_flight:
+                window = batcher.window(limiter.rate_per_second)
+                while next_item < len(items) and len(in_flight) < window:
+                    in_flight[executor.submit(timed, items[next_item])] = next_item
+                    next_item += 1
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = in_flight.pop(future)
+                    result, latency, error = future.result()
+                    batcher.record(latency, error is None)
+                    if error is not None:
+                        logger.warning(f"Concurrent fetch failed for item {i}: {error}")
+                    yield i, result
+    
     def get_price_history(self, symbol: str, days: int = 100) -> List[Dict]:
         """Get price history for technical analysis (no persistent cache, just lru_cache if needed)"""
         try:
+            self.request_limiter.wait_if_needed()
             ticker = yf.Ticker(symbol)
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
@@ -835,13 +817,28 @@ class DataFetcher:
             return []
 
     def get_options_chain(self, symbol: str) -> List[Dict]:
-        """Get options chain with improved analysis for low-volume options (no persistent cache)"""
+        """Get options chain with improved analysis for low-volume options
+        
+        The chain and its vol surface are kept in memory as one entry for the options
+        refresh interval (no persistent cache), so the surface is never staler than the chain.
+        """
+        key = ('options_chain', symbol)
+        if key in self.cache and datetime.now() < self.cache_expiry.get(key, datetime.min):
+            return list(self.cache[key][0])
+        options_data, surface = self._fetch_options_chain(symbol)
+        if options_data:
+            self.cache[key] = (options_data, surface)
+            self.cache_expiry[key] = datetime.now() + timedelta(minutes=self.config.data.options_refresh_interval)
+        return list(options_data)
+    
+    def _fetch_options_chain(self, symbol: str) -> Tuple[List[Dict], Optional[VolSurface]]:
+        """Fetch a symbol's call chain and the vol surface fitted to it"""
         try:
             ticker = yf.Ticker(symbol)
             expirations = ticker.options
             if not expirations:
                 logger.warning(f"No options available for {symbol}")
-                return []
+                return [], None
             options_data = []
             current_price = self.get_quote(symbol)['price']
             expirations_with_days = []
@@ -860,12 +857,27 @@ class DataFetcher:
                 ]
             else:
                 selected_expirations = [exp[0] for exp in expirations_with_days]
+            expiries = []
             for exp_date in selected_expirations:
                 exp_datetime = datetime.strptime(exp_date, '%Y-%m-%d')
                 days_to_exp = (exp_datetime - datetime.now()).days
                 opt_chain = ticker.option_chain(exp_date)
                 calls = opt_chain.calls
-                for _, call in calls.iterrows():
+                expiries.append((exp_date, days_to_exp, calls,
+                                 self._chain_ivs(calls, current_price, days_to_exp, fill=False)))
+            surface = self._fit_vol_surface(symbol, current_price, expiries)
+            atm_iv = None
+            for exp_date, days_to_exp, calls, ivs in expiries:
+                strikes = calls['strike'].to_numpy(dtype=float)
+                # Greeks come off the smoothed surface; strikes with no IV of their own take its value too
+                smoothed = surface.iv(strikes, days_to_exp) if surface is not None else None
+                ivs = self._fill_ivs(ivs, smoothed)
+                if smoothed is None:
+                    smoothed = ivs
+                if atm_iv is None and len(ivs):
+                    # Nearest selected expiry's closest-to-money strike is the history's ATM reading
+                    atm_iv = float(ivs[np.argmin(np.abs(strikes - current_price))])
+                for (_, call), iv, smooth_iv in zip(calls.iterrows(), ivs, smoothed):
                     strike = call['strike']
                     if strike < current_price * 0.85 or strike > current_price * 1.20:
                         continue
@@ -893,9 +905,6 @@ class DataFetcher:
                         liquidity_score += 20
                     if not acceptable:
                         continue
-                    iv = call.get('impliedVolatility', 0)
-                    if iv == 0 or pd.isna(iv):
-                        iv = 0.3 + (spread_pct * 0.5)
                     option_data = {
                         'symbol': symbol,
                         'type': 'CALL',
@@ -913,20 +922,101 @@ class DataFetcher:
                         'contract_symbol': call.get('contractSymbol', ''),
                         'spread_pct': spread_pct,
                         'liquidity_score': liquidity_score,
-                        'delta': self._estimate_delta(current_price, strike, days_to_exp, iv),
-                        'theta': self._estimate_theta(current_price, strike, days_to_exp, iv, ask if ask > 0 else 0.01),
-                        'gamma': self._estimate_gamma(current_price, strike, days_to_exp, iv),
-                        'vega': self._estimate_vega(current_price, strike, days_to_exp, iv),
-                        'iv_percentile': min(95, max(5, iv * 150))
+                        'delta': self._estimate_delta(current_price, strike, days_to_exp, smooth_iv),
+                        'theta': self._estimate_theta(current_price, strike, days_to_exp, smooth_iv, ask if ask > 0 else 0.01),
+                        'gamma': self._estimate_gamma(current_price, strike, days_to_exp, smooth_iv),
+                        'vega': self._estimate_vega(current_price, strike, days_to_exp, smooth_iv)
                     }
-                    options_data.append(option_data)
-            return options_data
+                    options_data.append(OptionContract(**option_data))
+            if atm_iv is not None:
+                self.iv_history.record(symbol, atm_iv)
+            self._attach_iv_stats(symbol, options_data)
+            return options_data, surface
         except Exception as e:
             logger.error(f"Error getting options chain for {symbol}: {e}")
-            return []
+            return [], None
 
+    def _chain_ivs(self, calls: pd.DataFrame, spot: float, days_to_exp: int, fill: bool = True) -> np.ndarray:
+        """Vendor IVs, with missing or placeholder ones backed out of the contracts' prices
+        
+        Contracts with no usable price either are NaN, or with fill=True take the expiry's median IV.
+        """
+        def column(name):
+            values = calls[name] if name in calls else pd.Series(np.nan, index=calls.index)
+            return pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, copy=True)
+        
+        ivs = column('impliedVolatility')
+        bad = ~np.isfinite(ivs) | (ivs < MIN_REPORTED_IV)
+        if bad.any():
+            bid = np.nan_to_num(column('bid'))
+            ask = np.nan_to_num(column('ask'))
+            price = np.where(ask > 0, (bid + ask) / 2, column('lastPrice'))
+            solved, converged = implied_volatility(price[bad], spot, column('strike')[bad],
+                                                   np.full(int(bad.sum()), days_to_exp))
+            ivs[bad] = solved
+            logger.debug(f"Solved IV for {int(converged.sum())} of {int(bad.sum())} contracts without a usable quote IV")
+        return self._fill_ivs(ivs) if fill else ivs
+    
+    @staticmethod
+    def _fill_ivs(ivs: np.ndarray, smoothed: Optional[np.ndarray] = None) -> np.ndarray:
+        """Fill unknown IVs from the vol surface, else the expiry's median IV"""
+        missing = ~np.isfinite(ivs)
+        if missing.any():
+            ivs = ivs.copy()
+            if smoothed is not None:
+                ivs[missing] = smoothed[missing]
+            else:
+                ivs[missing] = np.median(ivs[~missing]) if (~missing).any() else DEFAULT_IV
+        return ivs
+    
+    def _fit_vol_surface(self, symbol: str, spot: float, expiries: List[Tuple]) -> Optional[VolSurface]:
+        """Fit a symbol's vol surface to its selected expiries, or None if the fit fails"""
+        try:
+            return fit_surface(spot, [(days, calls['strike'].to_numpy(dtype=float), ivs)
+                                      for _, days, calls, ivs in expiries])
+        except Exception as e:
+            logger.debug(f"Vol surface fit failed for {symbol}: {e}")
+            return None
+    
+    def price_from_surface(self, symbol: str, strike: float, expiration: str) -> Optional[Dict]:
+        """Model price and Greeks for any call strike/expiry off the cached surface, or None if there is none"""
+        surface = self.get_vol_surface(symbol)
+        if surface is None:
+            return None
+        days_to_exp = (datetime.strptime(expiration, '%Y-%m-%d') - datetime.now()).days
+        quote = {name: float(value) for name, value in surface.quote(strike, days_to_exp).items()}
+        quote.update({
+            'symbol': symbol,
+            'type': 'CALL',
+            'strike': strike,
+            'expiration': expiration,
+            'days_to_expiration': days_to_exp,
+            'current_stock_price': surface.spot
+        })
+        return quote
+    
+    def get_vol_surface(self, symbol: str) -> Optional[VolSurface]:
+        """The symbol's surface from its cached chain, if still fresh (never refetches)"""
+        key = ('options_chain', symbol)
+        if key in self.cache and datetime.now() < self.cache_expiry.get(key, datetime.min):
+            return self.cache[key][1]
+        return None
+    
+    def _attach_iv_stats(self, symbol: str, options_data: List[Dict]):
+        """Set each contract's IV percentile and rank from the symbol's 52-week ATM IV history
+        
+        Left unset until the history is long enough; scoring then treats IV as mid-range.
+        """
+        percentiles, ranks = self.iv_history.lookup(symbol, (o['implied_volatility'] for o in options_data))
+        if percentiles is None:
+            return
+        for option, percentile, rank in zip(options_data, percentiles.tolist(), ranks.tolist()):
+            option['iv_percentile'] = percentile
+            option['iv_rank'] = rank
+    
     def save_all_caches(self):
         self._save_fundamentals_cache()
+        self.iv_history.save()
     
     def _estimate_delta(self, spot: float, strike: float, days: int, iv: float) -> float:
         """Estimate delta using Black-Scholes approximation"""
@@ -1116,10 +1206,10 @@ class DataFetcher:
             ask = option.get('ask', 0)
             spread_pct = (ask - bid) / ask if ask > 0 else 1.0
             
-            # Estimate Greeks if not available
-            iv = option.get('impliedVolatility', 0.3)
-            if iv == 0 or pd.isna(iv):
-                iv = 0.3  # Default IV
+            # Back IV out of the price if the quote has none, else read it off the vol surface
+            surface = self.get_vol_surface(symbol)
+            iv = self._chain_ivs(option_data.iloc[:1], current_price, days_to_exp, fill=False)
+            iv = float(self._fill_ivs(iv, surface.iv(np.array([strike]), days_to_exp) if surface is not None else None)[0])
             
             return {
                 'symbol': symbol,
@@ -0,0 +1,190 @@
+"""
+Underlying price levels at which a monitored position's exit rules would fire
+
+Whenever a position is fully repriced from its option chain, each price-driven
+exit rule of OptionsAnalyzer.evaluate_position is inverted through
+Black-Scholes at the position's current IV (calibrated to the observed quote)
+into a stock price level. Between repricings a stock quote tick is compared
+against the two nearest levels in constant time; only a price inside the
+TRIGGER_BAND around a level needs the chain refetched.
+"""
+
+import logging
+import time
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy.stats import norm
+
+from .iv_solver import RISK_FREE_RATE
+
+logger = logging.getLogger(__name__)
+
+
+# Exit rules, as evaluate_position applies them
+PROFIT_TARGET = 0.50
+LATE_PROFIT_TARGET = 0.30
+STOP_LOSS = -0.50
+EXPIRY_EXIT_DAYS = 7        # always exit inside this many days
+LATE_DAYS = 14              # late profit target and delta floor apply inside this many days
+MIN_LATE_DELTA = 0.20
+MAX_THETA_RATIO = 0.05      # daily theta as a share of the position's value
+STOCK_STOP = -0.10
+
+TRIGGER_BAND = 0.02  # reprice when the stock is within 2% of a level
+
+
+def call_greeks(spot: np.ndarray, strike: float, days: float, vol: float,
+                rate: float = RISK_FREE_RATE) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Black-Scholes call value, delta, gamma and theta per day"""
+    spot = np.asarray(spot, dtype=float)
+    years = max(days, 1) / 365.0
+    root_t = np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * vol * vol) * years) / (vol * root_t)
+    d2 = d1 - vol * root_t
+    discount = np.exp(-rate * years)
+    value = spot * norm.cdf(d1) - strike * discount * norm.cdf(d2)
+    theta = (-spot * norm.pdf(d1) * vol / (2 * root_t) - rate * strike * discount * norm.cdf(d2)) / 365
+    return value, norm.cdf(d1), norm.pdf(d1) / (spot * vol * root_t), theta
+
+
+def _solve_up(f, spot: float, span: float = 20.0, iterations: int = 60) -> float:
+    """Stock price above which the increasing f is positive (inf if nowhere in range, 0 if everywhere)"""
+    lo, hi = np.log(spot / span), np.log(spot * span)
+    if f(np.exp(hi)) <= 0:
+        return float('inf')
+    if f(np.exp(lo)) > 0:
+        return 0.0
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        if f(np.exp(mid)) > 0:
+            hi = mid
+        else:
+            lo = mid
+    return float(np.exp(hi))
+
+
+def _band(f, spot: float, span: float = 20.0, points: int = 400, iterations: int = 60) -> Tuple[float, float]:
+    """Stock price interval on which a single-peaked f is positive, as (low, high)
+
+    (inf, 0) if f is nowhere positive in range; an open end is 0 or inf.
+    """
+    grid = np.exp(np.linspace(np.log(spot / span), np.log(spot * span), points))
+    values = np.array([f(s) for s in grid])
+    peak = int(np.argmax(values))
+    if values[peak] <= 0:
+        return float('inf'), 0.0
+
+    def crossing(lo: float, hi: float, rising: bool) -> float:
+        lo, hi = np.log(lo), np.log(hi)
+        for _ in range(iterations):
+            mid = 0.5 * (lo + hi)
+            if (f(np.exp(mid)) > 0) == rising:
+                hi = mid
+            else:
+                lo = mid
+        return float(np.exp(hi if rising else lo))
+
+    low = 0.0 if values[0] > 0 else crossing(grid[np.flatnonzero(values[:peak] <= 0)[-1]], grid[peak], True)
+    high = float('inf') if values[-1] > 0 else \
+        crossing(grid[peak], grid[peak + np.flatnonzero(values[peak:] <= 0)[0]], False)
+    return low, high
+
+
+class TriggerLevels:
+    """One position's exit levels and the Greeks to estimate its value between repricings"""
+
+    __slots__ = ('spot', 'value', 'delta', 'gamma', 'theta', 'lower', 'upper', 'levels', 'day', 'computed_at')
+
+    def __init__(self, spot: float, value: float, delta: float, gamma: float, theta: float,
+                 levels: Dict[str, Tuple[str, float]]):
+        self.spot = spot
+        self.value = value
+        self.delta = delta
+        self.gamma = gamma
+        self.theta = theta
+        self.levels = levels  # rule -> ('below' | 'above', stock price)
+        below = [level for side, level in levels.values() if side == 'below']
+        above = [level for side, level in levels.values() if side == 'above']
+        self.lower = max(below, default=0.0)
+        self.upper = min(above, default=float('inf'))
+        self.day = date.today().toordinal()
+        self.computed_at = time.time()
+
+    def stale(self, max_age_minutes: float) -> bool:
+        """Levels depend on days to expiry and IV, so they lapse daily and with the chain cache"""
+        return self.day != date.today().toordinal() or time.time() - self.computed_at > max_age_minutes * 60
+
+    def near(self, spot: float, band: float = TRIGGER_BAND) -> bool:
+        """Whether a stock price is at or within band of any exit level"""
+        return spot <= self.lower * (1 + band) or spot >= self.upper * (1 - band)
+
+    def estimate_value(self, spot: float) -> float:
+        """Second-order Greek estimate of the position's value at a new stock price"""
+        move = spot - self.spot
+        elapsed_days = (time.time() - self.computed_at) / 86400
+        return self.value + self.delta * move + 0.5 * self.gamma * move * move + self.theta * elapsed_days
+
+
+def compute_levels(position: Dict, spot: float, value: float, days: int, iv: float,
+                   theta: Optional[float] = None, short_iv: Optional[float] = None,
+                   rate: float = RISK_FREE_RATE) -> Optional[TriggerLevels]:
+    """Trigger levels for a long call or bull call spread from a fresh quote
+
+    value is the position's observed per-share value and theta the long leg's quoted
+    theta; the model is shifted and scaled to match both at the current price. Returns
+    None inside the expiry exit window or when the inputs cannot be modelled.
+    """
+    entry = position.get('entry_price') or 0
+    if days <= EXPIRY_EXIT_DAYS or entry <= 0 or spot <= 0 or not iv or iv <= 0:
+        return None
+    strike = float(position['strike'])
+    short_strike = position.get('short_strike')
+    short_iv = short_iv if short_iv and short_iv > 0 else iv
+
+    def model(s):
+        long_value, long_delta, long_gamma, long_theta = call_greeks(s, strike, days, iv, rate)
+        if short_strike is None:
+            return long_value, long_delta, long_gamma, long_theta, long_theta
+        short_value, short_delta, short_gamma, short_theta = call_greeks(s, float(short_strike), days, short_iv, rate)
+        return (long_value - short_value, long_delta - short_delta, long_gamma - short_gamma,
+                long_theta - short_theta, long_theta)
+
+    model_value, delta, gamma, net_theta, long_theta = model(spot)
+    offset = value - float(model_value)
+    theta_scale = theta / float(long_theta) if theta and long_theta else 1.0
+    position_value = lambda s: float(model(s)[0]) + offset
+
+    levels = {}
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        levels['profit_target'] = ('above', _solve_up(lambda s: position_value(s) - entry * (1 + PROFIT_TARGET), spot))
+        levels['stop_loss'] = ('below', _solve_up(lambda s: position_value(s) - entry * (1 + STOP_LOSS), spot))
+        if days <= LATE_DAYS:
+            levels['late_profit'] = ('above', _solve_up(
+                lambda s: position_value(s) - entry * (1 + LATE_PROFIT_TARGET), spot))
+            if short_strike is None:
+                years = days / 365.0
+                levels['delta_floor'] = ('below', float(strike * np.exp(norm.ppf(MIN_LATE_DELTA) * iv * np.sqrt(years)
+                                                                       - (rate + 0.5 * iv * iv) * years)))
+            else:
+                # A spread's net delta peaks between the strikes and falls off on both sides
+                low, high = _band(lambda s: float(model(s)[1]) - MIN_LATE_DELTA, spot)
+                levels['delta_floor'] = ('below', low)
+                levels['delta_ceiling'] = ('above', high)
+
+        # Net decay's share of value grows as the stock falls; the rule fires below this level
+        def theta_ratio(s):
+            value = position_value(s)
+            if value <= 0:
+                return np.inf
+            net_theta = float(model(s)[3]) * theta_scale
+            return (abs(net_theta) if short_strike is None else max(-net_theta, 0.0)) / value
+        levels['theta'] = ('below', _solve_up(lambda s: MAX_THETA_RATIO - theta_ratio(s), spot))
+    entry_spot = position.get('current_stock_price_at_entry') or 0
+    if entry_spot > 0:
+        levels['stock_stop'] = ('below', entry_spot * (1 + STOCK_STOP))
+
+    # A level at infinity on the 'above' side can never be reached; one on the 'below' side always fires
+    levels = {rule: (side, level) for rule, (side, level) in levels.items() if side == 'below' or np.isfinite(level)}
+    return TriggerLevels(spot, value, float(delta), float(gamma), float(net_theta) * theta_scale, levels)
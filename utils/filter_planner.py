@@ -0,0 +1,153 @@
+"""
+Cost-based filter planner for stock screening
+
+Predicates declare which data sources they read. The planner evaluates the
+cheapest, most selective predicate first and only loads a source for the
+candidates that are still alive when a predicate needs it, so rejected
+symbols never cost a network call.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Union
+
+logger = logging.getLogger(__name__)
+
+
+class Predicate:
+    """A screening predicate with its data dependencies"""
+
+    def __init__(self, name: str, func: Callable, sources: List[str], cost: float = 0.0,
+                 vectorized: bool = False):
+        self.name = name
+        self.func = func
+        self.sources = list(sources)
+        self.cost = cost
+        # Vectorized predicates take the whole candidate list and return a boolean mask
+        self.vectorized = vectorized
+
+
+class FilterPlanner:
+    """Evaluates predicates in cost order, loading data only for surviving candidates"""
+
+    def __init__(self, stats_file: Path = Path("data/cache/filter_stats.json"),
+                 prior_pass_rate: float = 0.5):
+        self.stats_file = Path(stats_file)
+        self.prior_pass_rate = prior_pass_rate
+        self.sources = {}
+        self.predicates = {}
+        self.stats = self._load_stats()
+
+    def _load_stats(self) -> Dict[str, Dict[str, int]]:
+        try:
+            if self.stats_file.exists():
+                with open(self.stats_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Error loading filter stats: {e}")
+        return {}
+
+    def save_stats(self):
+        """Persist per-predicate selectivity stats"""
+        try:
+            self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.stats_file, 'w') as f:
+                json.dump(self.stats, f, indent=2)
+        except Exception as e:
+            logger.warning(f"Error saving filter stats: {e}")
+
+    def add_source(self, name: str, cost: Union[float, Callable[[List[Dict]], float]] = 0.0,
+                   loader: Optional[Callable[[List[Dict]], None]] = None):
+        """Register a data source; cost is per candidate, loader enriches candidates in place"""
+        self.sources[name] = {'cost': cost, 'loader': loader}
+
+    def add_predicate(self, name: str, func: Callable[[Dict], bool], sources: List[str], cost: float = 0.0):
+        """Register a predicate over one or more sources"""
+        self.predicates[name] = Predicate(name, func, sources, cost)
+
+    def add_screen(self, name: str, mask: Callable[[List[Dict]], Sequence[bool]], sources: List[str],
+                   cost: float = 0.0):
+        """Register a vectorized predicate evaluated over all remaining candidates at once"""
+        self.predicates[name] = Predicate(name, mask, sources, cost, vectorized=True)
+
+    def pass_rate(self, name: str) -> float:
+        """Observed fraction of candidates passing a predicate"""
+        stat = self.stats.get(name)
+        if not stat or not stat.get('evaluated'):
+            return self.prior_pass_rate
+        return stat['passed'] / stat['evaluated']
+
+    def _source_cost(self, name: str, candidates: List[Dict]) -> float:
+        cost = self.sources.get(name, {}).get('cost', 0.0)
+        return cost(candidates) if callable(cost) else cost
+
+    def _rank(self, predicate: Predicate, loaded: Set[str], candidates: List[Dict]) -> float:
+        """Expected cost per rejected candidate; lower runs first"""
+        cost = predicate.cost + sum(self._source_cost(s, candidates) for s in predicate.sources if s not in loaded)
+        rejection = max(1.0 - self.pass_rate(predicate.name), 1e-3)
+        return cost / rejection
+
+    def _eligible(self, sources: Optional[Iterable[str]], applied: Optional[Iterable[str]]) -> List[Predicate]:
+        predicates = list(self.predicates.values())
+        if sources is not None:
+            allowed = set(sources)
+            predicates = [p for p in predicates if set(p.sources) <= allowed]
+        if applied is not None:
+            done = set(applied)
+            predicates = [p for p in predicates if not set(p.sources) <= done]
+        return predicates
+
+    def run(self, candidates: List[Dict], sources: Optional[Iterable[str]] = None,
+            applied: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Filter candidates, restricted to predicates over the given sources if provided
+
+        Predicates reading only sources in applied already ran over these candidates
+        (e.g. an earlier run(sources=['universe'])) and are skipped.
+        """
+        remaining = list(candidates)
+        loaded = {name for name, source in self.sources.items() if source['loader'] is None}
+        pending = self._eligible(sources, applied)
+
+        while pending and remaining:
+            predicate = min(pending, key=lambda p: self._rank(p, loaded, remaining))
+            pending.remove(predicate)
+
+            for source in predicate.sources:
+                if source not in loaded:
+                    loader = self.sources.get(source, {}).get('loader')
+                    if loader:
+                        loader(remaining)
+                    loaded.add(source)
+
+            survivors = self._evaluate(predicate, remaining)
+
+            stat = self.stats.setdefault(predicate.name, {'evaluated': 0, 'passed': 0})
+            stat['evaluated'] += len(remaining)
+            stat['passed'] += len(survivors)
+            logger.info(f"   {predicate.name}: kept {len(survivors)}/{len(remaining)}")
+            remaining = survivors
+
+        self.save_stats()
+        return remaining
+
+    @staticmethod
+    def _evaluate(predicate: Predicate, candidates: List[Dict]) -> List[Dict]:
+        """Candidates passing a predicate"""
+        if predicate.vectorized:
+            try:
+                mask = predicate.func(candidates)
+            except Exception as e:
+                # Fail closed, like a per-candidate predicate that raises
+                logger.error(f"Screen {predicate.name} failed, rejecting all {len(candidates)} candidates: {e}")
+                return []
+            return [candidate for candidate, keep in zip(candidates, mask) if keep]
+
+        survivors = []
+        for candidate in candidates:
+            try:
+                if predicate.func(candidate):
+                    survivors.append(candidate)
+            except Exception as e:
+                logger.debug(f"Predicate {predicate.name} failed for {candidate.get('symbol', '?')}: {e}")
+        return survivors
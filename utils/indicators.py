@@ -0,0 +1,216 @@
+"""
+Incremental indicator state for technical analysis
+"""
+
+import copy
+import logging
+import pickle
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class IndicatorState:
+    """Streaming RSI, ATR, SMA and momentum state for a single symbol"""
+
+    VERSION = 1
+
+    def __init__(self, rsi_period: int = 14, atr_period: int = 14, window: int = 60):
+        self.version = self.VERSION
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.window = window
+
+        self.bar_count = 0
+        self.last_date = None
+        self.prev_close = None
+
+        # Wilder averages, seeded with a simple mean over the first period
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.rsi_count = 0
+        self.atr = 0.0
+        self.atr_count = 0
+
+        # Running sums for the simple moving averages
+        self.sma_windows = {20: deque(), 50: deque()}
+        self.sma_sums = {20: 0.0, 50: 0.0}
+        self.volume_window = deque()
+        self.volume_sum = 0.0
+
+        # Recent (date, high, low, close, volume) bars for price changes and patterns
+        self.bars = deque(maxlen=window)
+
+    @staticmethod
+    def _wilder(avg: float, count: int, value: float, period: int) -> Tuple[float, int]:
+        """Advance a Wilder moving average by one value"""
+        if count < period:
+            avg = (avg * count + value) / (count + 1)
+        else:
+            avg = (avg * (period - 1) + value) / period
+        return avg, count + 1
+
+    def update(self, bar: Dict):
+        """Fold one new bar into the state in O(1)"""
+        high = float(bar['high'])
+        low = float(bar['low'])
+        close = float(bar['close'])
+        volume = float(bar.get('volume', 0) or 0)
+
+        if self.prev_close is not None:
+            delta = close - self.prev_close
+            self.avg_gain, _ = self._wilder(self.avg_gain, self.rsi_count, max(delta, 0.0), self.rsi_period)
+            self.avg_loss, self.rsi_count = self._wilder(self.avg_loss, self.rsi_count, max(-delta, 0.0), self.rsi_period)
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        else:
+            true_range = high - low
+        self.atr, self.atr_count = self._wilder(self.atr, self.atr_count, true_range, self.atr_period)
+
+        for period, window in self.sma_windows.items():
+            window.append(close)
+            self.sma_sums[period] += close
+            if len(window) > period:
+                self.sma_sums[period] -= window.popleft()
+
+        self.volume_window.append(volume)
+        self.volume_sum += volume
+        if len(self.volume_window) > 20:
+            self.volume_sum -= self.volume_window.popleft()
+
+        self.bars.append((bar.get('date'), high, low, close, volume))
+        self.prev_close = close
+        self.last_date = bar.get('date')
+        self.bar_count += 1
+
+    def rsi(self) -> float:
+        """Wilder RSI from the running averages"""
+        if self.rsi_count < self.rsi_period:
+            return float('nan')
+        if self.avg_loss == 0:
+            return 100.0 if self.avg_gain > 0 else 50.0
+        rs = self.avg_gain / self.avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def snapshot(self) -> Optional[Dict]:
+        """Current indicator values, or None until enough bars have been seen"""
+        if len(self.bars) < self.window:
+            return None
+        closes = [b[3] for b in self.bars]
+        volume_avg = self.volume_sum / len(self.volume_window)
+        return {
+            'rsi': self.rsi(),
+            'sma_20': self.sma_sums[20] / len(self.sma_windows[20]),
+            'sma_50': self.sma_sums[50] / len(self.sma_windows[50]),
+            'volume_ratio': self.volume_window[-1] / volume_avg if volume_avg > 0 else 0.0,
+            'price_change_5d': closes[-1] / closes[-5] - 1,
+            'price_change_20d': closes[-1] / closes[-20] - 1,
+            'price_change_60d': closes[-1] / closes[-60] - 1,
+            'atr': self.atr
+        }
+
+    def recent_bars(self) -> Dict[str, np.ndarray]:
+        """Recent bars as arrays for pattern detection"""
+        bars = list(self.bars)
+        return {
+            'date': [b[0] for b in bars],
+            'high': np.array([b[1] for b in bars]),
+            'low': np.array([b[2] for b in bars]),
+            'close': np.array([b[3] for b in bars]),
+            'volume': np.array([b[4] for b in bars])
+        }
+
+
+class IndicatorStore:
+    """Per-symbol indicator state persisted between runs"""
+
+    def __init__(self, cache_file: Path = Path("data/cache/indicator_state.pkl"),
+                 history_days: int = 100, max_gap_days: int = 30):
+        self.cache_file = Path(cache_file)
+        self.history_days = history_days
+        self.max_gap_days = max_gap_days
+        self.states = self._load()
+
+    def _load(self) -> Dict[str, IndicatorState]:
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, 'rb') as f:
+                    states = pickle.load(f)
+                return {symbol: state for symbol, state in states.items()
+                        if getattr(state, 'version', None) == IndicatorState.VERSION}
+        except Exception as e:
+            logger.warning(f"Error loading indicator state, rebuilding: {e}")
+        return {}
+
+    def save(self):
+        """Persist all indicator state"""
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_file, 'wb') as f:
+                pickle.dump(self.states, f)
+        except Exception as e:
+            logger.warning(f"Error saving indicator state: {e}")
+
+    def _fetch_days(self, state: Optional[IndicatorState]) -> int:
+        """Calendar days of history needed to bring a state up to date"""
+        if state is None or not state.last_date:
+            return self.history_days
+        try:
+            gap = (datetime.now() - datetime.strptime(state.last_date, '%Y-%m-%d')).days
+        except (TypeError, ValueError):
+            return self.history_days
+        if gap > self.max_gap_days:
+            return self.history_days
+        # Include the last committed bar so the state can be checked against it
+        return gap + 5
+
+    @staticmethod
+    def _is_consistent(state: IndicatorState, history: List[Dict]) -> bool:
+        """Check the fetched history still agrees with the last committed bar"""
+        for bar in history:
+            if bar.get('date') == state.last_date:
+                close = float(bar['close'])
+                return abs(close - state.prev_close) <= 1e-4 * max(1.0, abs(close))
+        return False
+
+    def fetch_bars(self, symbol: str, fetch: Callable[[str, int], List[Dict]]) -> Tuple[List[Dict], bool]:
+        """Fetch the bars needed to update a symbol; returns (history, rebuild)"""
+        state = self.states.get(symbol)
+        days = self._fetch_days(state)
+        history = fetch(symbol, days)
+        if days < self.history_days:
+            if history and self._is_consistent(state, history):
+                return history, False
+            logger.debug(f"Indicator state for {symbol} is inconsistent, rebuilding from history")
+            history = fetch(symbol, self.history_days)
+        return history, True
+
+    def apply(self, symbol: str, history: List[Dict], rebuild: bool) -> Optional[IndicatorState]:
+        """Fold fetched bars into a symbol's state and return a view including today's bar"""
+        if not history:
+            return None
+        today = datetime.now().strftime('%Y-%m-%d')
+
+        # Today's bar is still forming: show it, but don't commit it
+        pending = history[-1] if history[-1].get('date') == today else None
+        complete = history[:-1] if pending else history
+
+        if rebuild or symbol not in self.states:
+            state = IndicatorState()
+        else:
+            state = self.states[symbol]
+            complete = [bar for bar in complete if bar.get('date') > state.last_date]
+
+        for bar in complete:
+            state.update(bar)
+        self.states[symbol] = state
+
+        if pending is None:
+            return state
+        view = copy.deepcopy(state)
+        view.update(pending)
+        return view
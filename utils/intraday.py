@@ -0,0 +1,215 @@
+"""
+Intraday multi-timeframe bar store backed by fixed-size ring buffers
+"""
+
+import copy
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from .indicators import IndicatorState
+
+logger = logging.getLogger(__name__)
+
+
+# Bar length in seconds for each supported timeframe; the first is the base the quote path fetches
+TIMEFRAMES = {'1m': 60, '5m': 300, '15m': 900}
+BASE_TIMEFRAME = '1m'
+
+SESSION_GAP_SECONDS = 4 * 3600  # a quiet stretch this long between base bars separates two sessions
+MAX_INCREMENTAL_SECONDS = 6 * 86400  # the provider serves 1m bars for about a week back
+
+
+class BarRing:
+    """Preallocated OHLCV ring buffer holding the most recent bars of one timeframe"""
+
+    FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.time = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((len(self.FIELDS), capacity), dtype=float)
+        self.count = 0
+        self.head = 0  # slot the next bar is written to
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def first_time(self) -> Optional[int]:
+        return int(self.time[(self.head - self.count) % self.capacity]) if self.count else None
+
+    @property
+    def last_time(self) -> Optional[int]:
+        return int(self.time[(self.head - 1) % self.capacity]) if self.count else None
+
+    def put(self, timestamp: int, open_: float, high: float, low: float, close: float, volume: float):
+        """Append a bar, or overwrite the last one if it has the same timestamp (still forming)"""
+        last = self.last_time
+        if last is not None and timestamp < last:
+            return
+        if last is not None and timestamp == last:
+            slot = (self.head - 1) % self.capacity
+        else:
+            slot = self.head
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+        self.time[slot] = timestamp
+        self.values[:, slot] = (open_, high, low, close, volume)
+
+    def _order(self) -> np.ndarray:
+        """Slot indices from oldest to newest"""
+        return (self.head - self.count + np.arange(self.count)) % self.capacity
+
+    def arrays(self, since: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Bars oldest-first as a dict of arrays, optionally only those at or after a timestamp"""
+        order = self._order()
+        if since is not None:
+            order = order[np.searchsorted(self.time[order], since, side='left'):]
+        bars = {'time': self.time[order]}
+        for i, field in enumerate(self.FIELDS):
+            bars[field] = self.values[i, order]
+        return bars
+
+    def tail(self, n: int) -> Dict[str, np.ndarray]:
+        """The last n bars, oldest-first"""
+        order = self._order()[-n:] if n > 0 else np.array([], dtype=int)
+        bars = {'time': self.time[order]}
+        for i, field in enumerate(self.FIELDS):
+            bars[field] = self.values[i, order]
+        return bars
+
+
+class IntradayBarStore:
+    """Recent 1m/5m/15m bars per symbol, fed incrementally from the quote path"""
+
+    def __init__(self, capacity: int = 390):
+        self.capacity = capacity
+        self.rings = {}
+        self.session_start = {}
+        self.states = {}
+        self._lock = threading.Lock()
+
+    def _rings(self, symbol: str) -> Dict[str, BarRing]:
+        if symbol not in self.rings:
+            self.rings[symbol] = {timeframe: BarRing(self.capacity) for timeframe in TIMEFRAMES}
+        return self.rings[symbol]
+
+    def last_time(self, symbol: str) -> Optional[int]:
+        """Timestamp of the newest base bar held for a symbol"""
+        rings = self.rings.get(symbol)
+        return rings[BASE_TIMEFRAME].last_time if rings else None
+
+    def has_session(self, symbol: str) -> bool:
+        """Whether the held bars can be extended with only newer ones
+
+        True whenever the newest bar is recent enough to fetch forward from; a new
+        session arriving in those bars is detected by ingest(), so before the open,
+        on weekends and on holidays the latest session the provider has stays current.
+        """
+        last = self.last_time(symbol)
+        return symbol in self.session_start and last is not None and time.time() - last < MAX_INCREMENTAL_SECONDS
+
+    def ingest(self, symbol: str, times: np.ndarray, opens: np.ndarray, highs: np.ndarray,
+               lows: np.ndarray, closes: np.ndarray, volumes: np.ndarray, new_session: bool = False):
+        """Fold base-timeframe bars into every timeframe; re-sent bars overwrite in place"""
+        if not len(times):
+            return
+        with self._lock:
+            rings = self._rings(symbol)
+            base = rings[BASE_TIMEFRAME]
+            previous = base.last_time
+            if new_session or previous is None or symbol not in self.session_start:
+                self.session_start[symbol] = int(times[0])
+                previous = int(times[0])
+            # The session the newest bars belong to starts after the last overnight gap
+            steps = np.diff(np.concatenate(([previous], np.asarray(times, dtype=np.int64))))
+            gaps = np.flatnonzero(steps > SESSION_GAP_SECONDS)
+            if len(gaps):
+                self.session_start[symbol] = int(times[gaps[-1]])
+            for bar in zip(times, opens, highs, lows, closes, volumes):
+                base.put(int(bar[0]), *map(float, bar[1:]))
+
+            # Rebuild each coarser bucket touched by this batch from the base bars inside it
+            for timeframe, seconds in TIMEFRAMES.items():
+                if timeframe == BASE_TIMEFRAME:
+                    continue
+                first_bucket = int(times[0]) - int(times[0]) % seconds
+                bars = base.arrays(since=first_bucket)
+                buckets = bars['time'] - bars['time'] % seconds
+                for bucket in np.unique(buckets):
+                    inside = buckets == bucket
+                    rings[timeframe].put(
+                        int(bucket),
+                        bars['open'][inside][0],
+                        bars['high'][inside].max(),
+                        bars['low'][inside].min(),
+                        bars['close'][inside][-1],
+                        bars['volume'][inside].sum()
+                    )
+
+    def bars(self, symbol: str, timeframe: str = '5m', n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Recent bars for a symbol and timeframe, oldest-first"""
+        rings = self.rings.get(symbol)
+        if not rings or timeframe not in rings:
+            return {}
+        ring = rings[timeframe]
+        return ring.tail(n) if n is not None else ring.arrays()
+
+    def session_summary(self, symbol: str) -> Optional[Dict]:
+        """Last price, high, low and volume over the latest session held"""
+        if symbol not in self.rings:
+            return None
+        bars = self.rings[symbol][BASE_TIMEFRAME].arrays(since=self.session_start.get(symbol))
+        if not len(bars['time']):
+            return None
+        return {
+            'price': float(bars['close'][-1]),
+            'volume': float(bars['volume'].sum()),
+            'day_high': float(bars['high'].max()),
+            'day_low': float(bars['low'].min())
+        }
+
+    def technicals(self, symbol: str, timeframe: str = '5m') -> Optional[Dict]:
+        """Indicator snapshot on an intraday timeframe, kept incrementally like the daily state
+
+        Lookbacks count bars of the timeframe, so price_change_5d is the change over five bars.
+        """
+        rings = self.rings.get(symbol)
+        if not rings:
+            return None
+        with self._lock:
+            key = (symbol, timeframe)
+            state = self.states.get(key)
+            ring = rings[timeframe]
+            since = None if state is None or state.last_date is None else state.last_date + 1
+            if since is not None and ring.count and since <= ring.first_time:
+                # The ring has wrapped past the state's last bar: start over
+                state = None
+                since = None
+            if state is None:
+                state = IndicatorState()
+            bars = ring.arrays(since=since)
+            if not len(bars['time']):
+                view = state
+            else:
+                # The newest bar is still forming: fold it into a view only
+                for i in range(len(bars['time']) - 1):
+                    state.update(self._bar(bars, i))
+                view = copy.deepcopy(state)
+                view.update(self._bar(bars, len(bars['time']) - 1))
+            self.states[key] = state
+        return view.snapshot()
+
+    @staticmethod
+    def _bar(bars: Dict[str, np.ndarray], i: int) -> Dict:
+        return {
+            'date': int(bars['time'][i]),
+            'high': bars['high'][i],
+            'low': bars['low'][i],
+            'close': bars['close'][i],
+            'volume': bars['volume'][i]
+        }
@@ -0,0 +1,106 @@
+"""
+Persistent per-symbol ATM implied-volatility history for IV rank and percentile
+"""
+
+import logging
+import pickle
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class IVHistoryStore:
+    """One ATM IV reading per symbol per day, kept as arrays over a rolling 52-week window
+
+    Besides the time series, each symbol keeps its window's values sorted, so IV
+    percentile is a binary search and IV rank reads the two ends.
+    """
+
+    def __init__(self, path: Path = Path("data/cache/iv_history.pkl"), window_days: int = 365,
+                 min_observations: int = 20):
+        self.path = path
+        self.window_days = window_days
+        self.min_observations = min_observations
+        # symbol -> (day ordinals, ATM IVs in day order, the same IVs sorted)
+        self.series = self._load()
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        try:
+            if self.path.exists():
+                with open(self.path, 'rb') as f:
+                    return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Error loading IV history: {e}")
+        return {}
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            with self._lock:
+                snapshot = dict(self.series)
+                self.dirty = False
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'wb') as f:
+                pickle.dump(snapshot, f)
+        except Exception as e:
+            logger.warning(f"Error saving IV history: {e}")
+
+    def __len__(self) -> int:
+        return len(self.series)
+
+    def record(self, symbol: str, atm_iv: float, day: Optional[date] = None):
+        """Store a symbol's ATM IV for a day; a later reading the same day replaces it"""
+        if not np.isfinite(atm_iv) or atm_iv <= 0:
+            return
+        day = (day or date.today()).toordinal()
+        with self._lock:
+            empty = np.array([], dtype=float)
+            days, values, ordered = self.series.get(symbol, (np.array([], dtype=np.int32), empty, empty))
+            if len(days) and day < days[-1]:
+                return
+            if len(days) and day == days[-1]:
+                ordered = self._remove(ordered, values[-1])
+                values = np.append(values[:-1], atm_iv)
+            else:
+                days = np.append(days, np.int32(day))
+                values = np.append(values, atm_iv)
+            ordered = np.insert(ordered, np.searchsorted(ordered, atm_iv), atm_iv)
+
+            # Drop readings that have aged out of the window
+            expired = int(np.searchsorted(days, day - self.window_days, side='right'))
+            for value in values[:expired]:
+                ordered = self._remove(ordered, value)
+            self.series[symbol] = (days[expired:], values[expired:], ordered)
+            self.dirty = True
+
+    @staticmethod
+    def _remove(ordered: np.ndarray, value: float) -> np.ndarray:
+        return np.delete(ordered, np.searchsorted(ordered, value))
+
+    def observations(self, symbol: str) -> int:
+        entry = self.series.get(symbol)
+        return len(entry[0]) if entry else 0
+
+    def lookup(self, symbol: str, ivs: Iterable[float]) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """IV percentile and IV rank (0-100) of each IV against the symbol's window
+
+        Percentile is the share of days with a lower ATM IV; rank is where the IV sits
+        between the window's low and high. Both are None until there is enough history.
+        """
+        entry = self.series.get(symbol)
+        if entry is None or len(entry[2]) < self.min_observations:
+            return None, None
+        ordered = entry[2]
+        ivs = np.asarray(list(ivs), dtype=float)
+        percentile = np.searchsorted(ordered, ivs, side='left') / len(ordered) * 100
+        low, high = ordered[0], ordered[-1]
+        rank = np.clip((ivs - low) / (high - low) * 100, 0, 100) if high > low else np.full(len(ivs), 50.0)
+        return percentile, rank
@@ -0,0 +1,88 @@
+"""
+Vectorized Black-Scholes implied-volatility solver for call options
+
+Newton iterations on every contract of a chain at once, with a per-contract
+bisection bracket: a Newton step that leaves the bracket (or has too little
+vega to trust) is replaced by the bracket midpoint, so every solvable contract
+converges. Prices outside the no-arbitrage band are flagged, not forced.
+"""
+
+import logging
+from typing import Tuple
+
+import numpy as np
+from scipy.stats import norm
+
+logger = logging.getLogger(__name__)
+
+
+RISK_FREE_RATE = 0.02  # same rate _estimate_delta assumes
+MIN_VOL = 1e-3
+MAX_VOL = 5.0
+MIN_REPORTED_IV = 0.01  # vendor IVs below this are placeholders, not quotes
+DEFAULT_IV = 0.3  # only when a whole chain has no usable IV or price
+
+
+def call_price(spot: np.ndarray, strike: np.ndarray, years: np.ndarray, vol: np.ndarray,
+               rate: float = RISK_FREE_RATE) -> np.ndarray:
+    """Black-Scholes call value"""
+    root_t = np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * vol * vol) * years) / (vol * root_t)
+    return spot * norm.cdf(d1) - strike * np.exp(-rate * years) * norm.cdf(d1 - vol * root_t)
+
+
+def call_vega(spot: np.ndarray, strike: np.ndarray, years: np.ndarray, vol: np.ndarray,
+              rate: float = RISK_FREE_RATE) -> np.ndarray:
+    """Black-Scholes vega per unit of volatility"""
+    root_t = np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * vol * vol) * years) / (vol * root_t)
+    return spot * norm.pdf(d1) * root_t
+
+
+def implied_volatility(price: np.ndarray, spot: float, strike: np.ndarray, days: np.ndarray,
+                       rate: float = RISK_FREE_RATE, tol: float = 1e-6,
+                       max_iter: int = 50) -> Tuple[np.ndarray, np.ndarray]:
+    """Implied volatility of each call from its price; returns (iv, converged), iv is NaN where unsolvable"""
+    price = np.asarray(price, dtype=float)
+    strike = np.asarray(strike, dtype=float)
+    years = np.maximum(np.asarray(days, dtype=float), 1) / 365.0
+    n = len(price)
+    spot_arr = np.full(n, float(spot))
+
+    # A call is worth between its discounted intrinsic value and the stock itself
+    floor = np.maximum(spot - strike * np.exp(-rate * years), 0)
+    solvable = np.isfinite(price) & np.isfinite(strike) & (strike > 0) & (spot > 0) & \
+        (price > floor) & (price < spot)
+
+    lo = np.full(n, MIN_VOL)
+    hi = np.full(n, MAX_VOL)
+    # Brenner-Subrahmanyam starting point, good near the money
+    vol = np.clip(np.sqrt(2 * np.pi / years) * np.where(solvable, price, 0) / spot, 0.05, 2.0)
+    converged = ~solvable
+    active = solvable.copy()
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(max_iter):
+            if not active.any():
+                break
+            idx = np.flatnonzero(active)
+            v = vol[idx]
+            diff = call_price(spot_arr[idx], strike[idx], years[idx], v, rate) - price[idx]
+            done = np.abs(diff) < tol
+            converged[idx[done]] = True
+
+            # Tighten the bracket around the root
+            high = diff > 0
+            hi[idx] = np.where(high, v, hi[idx])
+            lo[idx] = np.where(high, lo[idx], v)
+
+            vega = call_vega(spot_arr[idx], strike[idx], years[idx], v, rate)
+            step = v - diff / vega
+            bisect = ~np.isfinite(step) | (vega < 1e-8) | (step <= lo[idx]) | (step >= hi[idx])
+            vol[idx] = np.where(done, v, np.where(bisect, 0.5 * (lo[idx] + hi[idx]), step))
+            active[idx[done]] = False
+
+    converged &= solvable
+    if active.any():
+        logger.debug(f"IV solver: {int(active.sum())} of {n} contracts did not converge")
+    return np.where(converged, vol, np.nan), converged
@@ -3,14 +3,33 @@ Market Scanner module for finding small-cap opportunities
 """
 
 import logging
-import time
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 
+from .filter_planner import FilterPlanner
+from .indicators import IndicatorStore
+from .patterns import PATTERN_PRIORITY, detect_patterns, pattern_events
+from .screens import Screen, build_columns, compile_screens
+from .universe import UniverseIndex
+
 logger = logging.getLogger(__name__)
 
+# Which data source supplies each screenable field; anything else comes with the universe
+UNIVERSE_FIELDS = {'symbol', 'name', 'market_cap', 'price', 'volume', 'avg_volume', 'sector', 'industry',
+                   'exchange', 'has_options', 'market_cap_category'}
+FUNDAMENTAL_FIELDS = {'pe_ratio', 'revenue_growth', 'earnings_growth', 'institutional_ownership'}
+TECHNICAL_FIELDS = {'rsi', 'sma_20', 'sma_50', 'volume_ratio', 'price_change_5d', 'price_change_20d',
+                    'price_change_60d', 'atr', 'relative_strength', 'pattern'}
+# Indicators on intraday bars, screenable with this prefix (e.g. intraday_rsi, intraday_volume_ratio)
+INTRADAY_PREFIX = 'intraday_'
+INTRADAY_TIMEFRAME = '5m'
+INTRADAY_FIELDS = {'rsi', 'sma_20', 'sma_50', 'volume_ratio', 'price_change_5d', 'price_change_20d',
+                   'price_change_60d', 'atr'}
+SCREEN_FIELDS = UNIVERSE_FIELDS | FUNDAMENTAL_FIELDS | TECHNICAL_FIELDS | \
+    {INTRADAY_PREFIX + field for field in INTRADAY_FIELDS}
+
 
 class MarketScanner:
     """Scans market for small-cap stocks meeting criteria"""
@@ -18,6 +37,17 @@ class MarketScanner:
     def __init__(self, config, data_fetcher):
         self.config = config
         self.data_fetcher = data_fetcher
+        self.indicator_store = IndicatorStore()
+        self._spy_return = None
+        self._spy_return_date = None
+        self._technicals = {}
+        self._intraday = {}
+        self._category_limits = {}
+        # Indexed snapshot of the last universe fetch
+        self.universe = None
+        self.filter_planner = self._build_filter_planner()
+        # Optional RunJournal for checkpointing per-symbol enrichment and technicals
+        self.journal = None
         
     def find_stocks_by_market_cap(self) -> List[Dict]:
         """Find all stocks with market cap between configured min and max"""
@@ -30,230 +60,306 @@ class MarketScanner:
             min_volume=self.config.trading.min_volume
         )
         
-        # Update with current prices and volumes
-        enriched_stocks = self.data_fetcher.update_stock_data_with_current_prices(stocks)
+        # Cap band and sector subset come straight off the sorted index
+        self.universe = UniverseIndex(stocks, self.config.get_market_cap_category)
+        stocks = self.universe.query(
+            min_cap=max(self.config.trading.market_cap_min, 100_000_000),
+            max_cap=self.config.trading.market_cap_max,
+            sectors=getattr(self.config.scanner, 'sectors', None)
+        )
         
-        # Add additional fundamental data for each stock (optional for speed)
-        final_stocks = []
-        batch_size = 10  # Increased from 3 to 10 for faster processing
-        skip_enriching = False  # Enable fundamental enrichment for better quality
+        # Screen on data we already have before spending any per-symbol requests
+        stocks = self.filter_planner.run(stocks, sources=['universe'])
+        logger.info(f"{len(stocks)} stocks passed universe screens")
         
-        if skip_enriching:
-            logger.info(f"Skipping fundamental data enrichment for speed. Using {len(enriched_stocks)} stocks as-is.")
-            return enriched_stocks
+        # Update with current prices and volumes
+        enriched_stocks = self.data_fetcher.update_stock_data_with_current_prices(stocks)
+        logger.info(f"Returning {len(enriched_stocks)} stocks in market cap range")
+        return enriched_stocks
+    
+    def apply_filters(self, stocks: List[Dict]) -> List[Dict]:
+        """Apply technical and fundamental filters, including momentum filter"""
+        self._technicals = {}
+        self._intraday = {}
+        # Universe-only predicates already ran in find_stocks_by_market_cap
+        filtered = self.filter_planner.run(stocks, applied=['universe'])
         
-        logger.info(f"Enriching {len(enriched_stocks)} stocks with fundamental data...")
+        for stock in filtered:
+            stock.update(self._technicals[stock['symbol']])
+            stock.update(self._intraday.get(stock['symbol'], {}))
+        self._technicals = {}
+        self._intraday = {}
         
-        for i in range(0, len(enriched_stocks), batch_size):
-            batch = enriched_stocks[i:i + batch_size]
-            
-            for stock in batch:
-                try:
-                    # Get basic fundamentals
-                    fundamentals = self.data_fetcher.get_fundamentals(stock['symbol'])
-                    stock.update({
-                        'pe_ratio': fundamentals.get('pe_ratio'),
-                        'revenue_growth': fundamentals.get('revenue_growth'),
-                        'earnings_growth': fundamentals.get('earnings_growth'),
-                        'institutional_ownership': fundamentals.get('institutional_ownership', 0),
-                    })
-                    final_stocks.append(stock)
-                except Exception as e:
-                    logger.warning(f"Error enriching data for {stock['symbol']}: {e}")
-                    # Keep the stock with existing data
-                    final_stocks.append(stock)
-            # Rate limiting between batches (reduced from 3 to 1 second)
-            if i + batch_size < len(enriched_stocks):
-                time.sleep(1)
-        logger.info(f"Successfully enriched {len(final_stocks)} stocks")
-        # --- POST-ENRICHMENT MARKET CAP FILTER ---
-        min_cap = self.config.trading.market_cap_min
-        max_cap = self.config.trading.market_cap_max
-        filtered_final = []
-        for stock in final_stocks:
-            try:
-                mc = stock.get('market_cap', 0)
-                # Handle str/int issues
-                if isinstance(mc, str):
-                    try:
-                        mc = float(mc.replace(',', ''))
-                    except Exception:
-                        continue
-                if min_cap <= mc <= max_cap:
-                    stock['market_cap'] = mc
-                    filtered_final.append(stock)
-            except Exception as e:
-                logger.warning(f"Error filtering {stock.get('symbol', '?')}: {e}")
-        # Save fundamentals cache after enrichment
+        self.indicator_store.save()
         if hasattr(self.data_fetcher, '_save_fundamentals_cache'):
             self.data_fetcher._save_fundamentals_cache()
-        logger.info(f"Returning {len(filtered_final)} stocks after post-enrichment market cap filter")
-        return filtered_final
+        return filtered
     
-    def apply_filters(self, stocks: List[Dict]) -> List[Dict]:
-        """Apply technical and fundamental filters, including momentum filter"""
-        filtered = []
+    def refresh_technicals(self, stocks: List[Dict]):
+        """Bring technicals up to date for the given stocks without re-running the screens"""
+        self._technicals = {}
+        self._load_technicals(stocks)
         for stock in stocks:
-            try:
-                # Only keep stocks that look good both fundamentally and technically
-                if not self._passes_fundamental_filters(stock):
-                    continue
-                technicals = self._analyze_technicals(stock['symbol'])
-                if not technicals:
-                    continue
-                # Require at least some positive momentum over 3 months
-                if technicals.get('price_change_60d', 0) < 0:
-                    continue
-                if self._has_bullish_setup(technicals):
-                    stock.update(technicals)
-                    filtered.append(stock)
-            except Exception as e:
-                logger.warning(f"Error filtering {stock['symbol']}: {e}")
-        return filtered
+            stock.update(self._technicals.get(stock['symbol'], {}))
+        self._technicals = {}
+        self.indicator_store.save()
+    
+    def _build_filter_planner(self) -> FilterPlanner:
+        """Register screening predicates with their data sources and per-symbol costs"""
+        planner = FilterPlanner()
+        
+        # Costs are in requests per symbol: universe fields are free, fundamentals
+        # take two yfinance calls unless cached, technicals one history request,
+        # intraday a quote (info plus the 1m bars newer than those held)
+        planner.add_source('universe', cost=0.0)
+        planner.add_source('fundamentals', cost=self._fundamentals_cost, loader=self._load_fundamentals)
+        planner.add_source('technicals', cost=1.0, loader=self._load_technicals)
+        planner.add_source('intraday', cost=2.0, loader=self._load_intraday)
+        
+        planner.add_predicate('market_cap_range', self._in_market_cap_range, ['universe'])
+        
+        planner.add_predicate('pe_ratio', self._passes_pe_filter, ['universe', 'fundamentals'])
+        planner.add_predicate('revenue_growth', self._passes_revenue_growth_filter, ['universe', 'fundamentals'])
+        planner.add_predicate('earnings_growth', self._passes_earnings_growth_filter, ['universe', 'fundamentals'])
+        planner.add_predicate('institutional_ownership', self._passes_ownership_filter, ['universe', 'fundamentals'])
+        
+        planner.add_predicate('bullish_setup', self._passes_bullish_setup, ['technicals'])
+        
+        # Declarative screens from config.json, evaluated as NumPy masks
+        for screen in compile_screens(getattr(self.config.scanner, 'screens', None), SCREEN_FIELDS):
+            planner.add_screen(screen.name, self._screen_mask(screen), self._screen_sources(screen))
+        return planner
+    
+    def _screen_sources(self, screen: Screen) -> List[str]:
+        """Data sources a screen reads, so the planner loads them before evaluating it"""
+        sources = ['universe']
+        if screen.fields & FUNDAMENTAL_FIELDS:
+            sources.append('fundamentals')
+        if screen.fields & TECHNICAL_FIELDS:
+            sources.append('technicals')
+        if any(field.startswith(INTRADAY_PREFIX) for field in screen.fields):
+            sources.append('intraday')
+        return sources
     
-    def _passes_fundamental_filters(self, stock: Dict) -> bool:
-        """Keep only stocks that are fundamentally healthy and not penny stocks"""
-        market_cap = stock.get('market_cap', 0)
+    def _screen_mask(self, screen: Screen):
+        """Mask function over the candidates' universe/fundamental fields joined with their technicals"""
+        uses_technicals = bool(screen.fields & TECHNICAL_FIELDS)
+        uses_intraday = any(field.startswith(INTRADAY_PREFIX) for field in screen.fields)
+        
+        def mask(stocks: List[Dict]) -> np.ndarray:
+            records = stocks
+            if uses_technicals or uses_intraday:
+                records = [{**stock, **self._technicals.get(stock['symbol'], {}),
+                            **self._intraday.get(stock['symbol'], {})} for stock in stocks]
+            return screen.mask(build_columns(records, screen.fields), len(records))
+        return mask
+    
+    def _fundamentals_cost(self, stocks: List[Dict]) -> float:
+        """Per-symbol fundamentals cost, discounted by the fraction already cached"""
+        if not stocks:
+            return 0.0
+        cache = getattr(self.data_fetcher, 'fundamentals_cache', {})
+        uncached = sum(1 for stock in stocks if stock['symbol'] not in cache)
+        return 2.0 * uncached / len(stocks)
+    
+    def _load_fundamentals(self, stocks: List[Dict]):
+        """Enrich the remaining candidates with fundamental data, paced by the shared rate limiter"""
+        todo = self._restore_checkpointed(stocks, 'fundamentals')
+        logger.info(f"Enriching {len(todo)} stocks with fundamental data...")
+        fetch = lambda stock: self.data_fetcher.get_fundamentals(stock['symbol'])
+        
+        for i, fundamentals in self.data_fetcher.map_concurrent(fetch, todo):
+            if not fundamentals:
+                logger.warning(f"Error enriching data for {todo[i]['symbol']}")
+                continue
+            fields = {
+                'pe_ratio': fundamentals.get('pe_ratio'),
+                'revenue_growth': fundamentals.get('revenue_growth'),
+                'earnings_growth': fundamentals.get('earnings_growth'),
+                'institutional_ownership': fundamentals.get('institutional_ownership', 0),
+            }
+            todo[i].update(fields)
+            if self.journal:
+                self.journal.record_symbol(todo[i]['symbol'], 'fundamentals', fields)
+        logger.info(f"Successfully enriched {len(todo)} stocks")
+    
+    def _load_technicals(self, stocks: List[Dict]):
+        """Fetch price histories on the I/O pool and update indicators as each one lands"""
+        todo = []
+        done = self.journal.symbol_results('technicals') if self.journal else {}
+        for stock in stocks:
+            if stock['symbol'] in done:
+                if done[stock['symbol']]:
+                    self._technicals[stock['symbol']] = done[stock['symbol']]
+            else:
+                todo.append(stock)
         
-        # Use adaptive thresholds based on company size
-        growth_min = self.config.get_adaptive_growth_min(market_cap)
-        pe_max = self.config.get_adaptive_pe_max(market_cap)
+        def fetch(stock):
+            return self.indicator_store.fetch_bars(stock['symbol'], self.data_fetcher.get_price_history)
         
-        # Avoid stocks with crazy high or negative PE ratios
+        for i, fetched in self.data_fetcher.map_concurrent(fetch, todo):
+            symbol = todo[i]['symbol']
+            technicals = self._technicals_from_history(symbol, *fetched) if fetched else None
+            if technicals:
+                self._technicals[symbol] = technicals
+            if self.journal:
+                self.journal.record_symbol(symbol, 'technicals', technicals)
+    
+    def _load_intraday(self, stocks: List[Dict]):
+        """Refresh the candidates' intraday bars through the quote path and index their indicators"""
+        fetch = lambda stock: self.data_fetcher.get_quote(stock['symbol'])
+        for i, quote in self.data_fetcher.map_concurrent(fetch, stocks):
+            if not quote:
+                logger.debug(f"No intraday quote for {stocks[i]['symbol']}")
+        technicals = self.intraday_technicals([stock['symbol'] for stock in stocks], INTRADAY_TIMEFRAME)
+        for symbol, values in technicals.items():
+            # Symbols without enough bars get no fields, so their intraday screens see NaN
+            self._intraday[symbol] = {f"{INTRADAY_PREFIX}{field}": value for field, value in values.items()
+                                      if field != 'symbol'}
+    
+    def _restore_checkpointed(self, stocks: List[Dict], stage: str) -> List[Dict]:
+        """Apply journaled per-symbol results and return the stocks still to fetch"""
+        if not self.journal:
+            return stocks
+        done = self.journal.symbol_results(stage)
+        todo = []
+        for stock in stocks:
+            if stock['symbol'] in done:
+                stock.update(done[stock['symbol']])
+            else:
+                todo.append(stock)
+        if len(todo) < len(stocks):
+            logger.info(f"Resumed {stage} for {len(stocks) - len(todo)} stocks from the scan journal")
+        return todo
+    
+    def _in_market_cap_range(self, stock: Dict) -> bool:
+        """Market cap within the configured range (and never below $100M)"""
+        mc = stock.get('market_cap', 0)
+        # Handle str/int issues
+        if isinstance(mc, str):
+            mc = float(mc.replace(',', ''))
+            stock['market_cap'] = mc
+        if mc < 100_000_000:
+            return False
+        return self.config.trading.market_cap_min <= mc <= self.config.trading.market_cap_max
+    
+    def _limits(self, stock: Dict) -> Dict:
+        """Adaptive thresholds for a stock's market cap category, resolved once per category"""
+        category = self.universe.category_of(stock['symbol']) if self.universe else None
+        if category is None:
+            category = self.config.get_market_cap_category(stock.get('market_cap', 0))
+        if category not in self._category_limits:
+            limits = self.config.get_adaptive_thresholds(category)
+            limits['ownership_min'] = {'micro_cap': 0.02, 'mega_cap': 0.10}.get(category, 0.05)
+            self._category_limits[category] = limits
+        return self._category_limits[category]
+    
+    def _passes_pe_filter(self, stock: Dict) -> bool:
+        """Avoid stocks with crazy high or negative PE ratios"""
         if stock.get('pe_ratio'):
-            if stock['pe_ratio'] > pe_max or stock['pe_ratio'] < 0:
+            if stock['pe_ratio'] > self._limits(stock)['pe_max'] or stock['pe_ratio'] < 0:
                 return False
-        # Look for at least some revenue growth
+        return True
+    
+    def _passes_revenue_growth_filter(self, stock: Dict) -> bool:
+        """Look for at least some revenue growth"""
         if stock.get('revenue_growth'):
-            if stock['revenue_growth'] < growth_min:
+            if stock['revenue_growth'] < self._limits(stock)['growth_min']:
                 return False
-        # Earnings growth should be positive too
+        return True
+    
+    def _passes_earnings_growth_filter(self, stock: Dict) -> bool:
+        """Earnings growth should be positive too"""
         if stock.get('earnings_growth'):
-            earnings_min = growth_min * 0.67
+            earnings_min = self._limits(stock)['growth_min'] * 0.67
             if stock['earnings_growth'] < earnings_min:
                 return False
-        # Make sure there's some institutional interest
-        category = self.config.get_market_cap_category(market_cap)
-        ownership_min = 0.05
-        if category == 'micro_cap':
-            ownership_min = 0.02
-        elif category == 'mega_cap':
-            ownership_min = 0.10
-        if stock.get('institutional_ownership', 0) < ownership_min:
-            return False
-        # Skip illiquid and penny stocks
-        if stock.get('volume', 0) < 100000:
-            return False
-        if stock.get('price', 0) < 1.0:
-            return False
-        if market_cap < 100_000_000:
-            return False
         return True
     
-    def _analyze_technicals(self, symbol: str) -> Optional[Dict]:
-        """Analyze technical indicators for a stock, including 3-month momentum"""
+    def _passes_ownership_filter(self, stock: Dict) -> bool:
+        """Make sure there's some institutional interest"""
+        return stock.get('institutional_ownership', 0) >= self._limits(stock)['ownership_min']
+    
+    def _passes_bullish_setup(self, stock: Dict) -> bool:
+        """Bullish technical setup on the fetched technicals"""
+        technicals = self._technicals.get(stock['symbol'])
+        return bool(technicals) and self._has_bullish_setup(technicals)
+    
+    def _technicals_from_history(self, symbol: str, history: List[Dict], rebuild: bool) -> Optional[Dict]:
+        """Update a symbol's indicator state from fetched bars and return its technicals"""
         try:
-            # Get price history
-            history = self.data_fetcher.get_price_history(symbol, days=100)
-            if len(history) < 50:
+            state = self.indicator_store.apply(symbol, history, rebuild)
+            if state is None:
                 return None
-            df = pd.DataFrame(history)
-            # Calculate indicators
-            technicals = {
-                'rsi': self._calculate_rsi(df['close']),
-                'sma_20': df['close'].rolling(20).mean().iloc[-1],
-                'sma_50': df['close'].rolling(50).mean().iloc[-1],
-                'volume_ratio': df['volume'].iloc[-1] / df['volume'].rolling(20).mean().iloc[-1],
-                'price_change_5d': (df['close'].iloc[-1] / df['close'].iloc[-5] - 1),
-                'price_change_20d': (df['close'].iloc[-1] / df['close'].iloc[-20] - 1),
-                'price_change_60d': (df['close'].iloc[-1] / df['close'].iloc[-60] - 1),
-                'atr': self._calculate_atr(df),
-                'relative_strength': self._calculate_relative_strength(df),
-                'pattern': self._detect_pattern(df)
-            }
+            technicals = state.snapshot()
+            if technicals is None:
+                return None
+            technicals['relative_strength'] = self._calculate_relative_strength(technicals['price_change_20d'])
+            bars = state.recent_bars()
+            technicals['pattern'], technicals['recent_patterns'] = self._detect_pattern(bars)
             return technicals
         except Exception as e:
             logger.error(f"Error analyzing technicals for {symbol}: {e}")
             return None
     
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> float:
-        """Calculate RSI indicator"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi.iloc[-1]
+    def intraday_technicals(self, symbols: List[str], timeframe: str = '5m') -> Dict[str, Dict]:
+        """Technicals on an intraday timeframe from bars already in memory (no requests)"""
+        store = getattr(self.data_fetcher, 'intraday', None)
+        if store is None:
+            return {}
+        results = {}
+        for symbol in symbols:
+            technicals = store.technicals(symbol, timeframe)
+            if technicals:
+                technicals['symbol'] = symbol
+                results[symbol] = technicals
+        return results
     
-    def _calculate_atr(self, df: pd.DataFrame, period: int = 14) -> float:
-        """Calculate Average True Range"""
-        high = df['high']
-        low = df['low']
-        close = df['close']
-        
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=period).mean()
-        
-        return atr.iloc[-1]
-    
-    def _calculate_relative_strength(self, df: pd.DataFrame) -> float:
+    def _calculate_relative_strength(self, stock_return: float) -> float:
         """Calculate relative strength vs market"""
-        # Simple implementation - compare to SPY
+        # Simple implementation - compare to SPY, fetched once per day
         try:
-            spy_history = self.data_fetcher.get_price_history('SPY', days=20)
-            spy_return = (spy_history[-1]['close'] / spy_history[0]['close'] - 1)
-            stock_return = (df['close'].iloc[-1] / df['close'].iloc[-20] - 1)
+            today = datetime.now().date()
+            if self._spy_return_date != today:
+                spy_history = self.data_fetcher.get_price_history('SPY', days=20)
+                self._spy_return = (spy_history[-1]['close'] / spy_history[0]['close'] - 1)
+                self._spy_return_date = today
+            spy_return = self._spy_return
             
             return stock_return / spy_return if spy_return != 0 else 1.0
         except:
             return 1.0
     
-    def _detect_pattern(self, df: pd.DataFrame) -> str:
-        """Detect chart patterns"""
-        closes = df['close'].values[-20:]
-        highs = df['high'].values[-20:]
-        lows = df['low'].values[-20:]
-        
-        # Simple pattern detection
-        if self._is_breakout(closes, highs):
-            return 'breakout'
-        elif self._is_flag_pattern(closes, highs, lows):
-            return 'flag'
-        elif self._is_ascending_triangle(highs, lows):
-            return 'ascending_triangle'
-        else:
-            return 'none'
-    
-    def _is_breakout(self, closes: np.ndarray, highs: np.ndarray) -> bool:
-        """Check for breakout pattern"""
-        # Price breaks above recent high with volume
-        recent_high = np.max(highs[:-5])
-        current_price = closes[-1]
+    def _detect_pattern(self, bars: Dict[str, np.ndarray]) -> Tuple[str, Dict[str, str]]:
+        """Detect chart patterns: the one firing on the latest bar, and when each last fired"""
+        signals = detect_patterns(bars, self.config.scanner.patterns)
+        dates = bars.get('date', [])
         
-        return current_price > recent_high * 1.02  # 2% above recent high
+        current = 'none'
+        recent = {}
+        for name in PATTERN_PRIORITY:
+            fired = signals.get(name)
+            if fired is None:
+                continue
+            hits = np.flatnonzero(fired)
+            if not len(hits):
+                continue
+            if current == 'none' and hits[-1] == len(fired) - 1:
+                current = name
+            if hits[-1] < len(dates):
+                recent[name] = dates[hits[-1]]
+        return current, recent
     
-    def _is_flag_pattern(self, closes: np.ndarray, highs: np.ndarray, lows: np.ndarray) -> bool:
-        """Check for flag pattern"""
-        # Simplified flag detection
-        first_half_trend = np.polyfit(range(10), closes[:10], 1)[0]
-        second_half_trend = np.polyfit(range(10), closes[10:], 1)[0]
-        
-        # Strong move up followed by consolidation
-        return first_half_trend > 0.5 and abs(second_half_trend) < 0.1
-    
-    def _is_ascending_triangle(self, highs: np.ndarray, lows: np.ndarray) -> bool:
-        """Check for ascending triangle pattern"""
-        # Higher lows with resistance at top
-        low_trend = np.polyfit(range(len(lows)), lows, 1)[0]
-        high_std = np.std(highs)
-        
-        return low_trend > 0 and high_std < np.mean(highs) * 0.02
+    def scan_pattern_history(self, symbols: List[str], days: int = 365) -> Dict[str, List[Dict]]:
+        """Find every configured pattern firing over each symbol's price history"""
+        histories = {}
+        fetch = lambda symbol: self.data_fetcher.get_price_history(symbol, days=days)
+        for i, history in self.data_fetcher.map_concurrent(fetch, symbols):
+            if not history:
+                continue
+            bars = {key: [bar[key] for bar in history] for key in ('date', 'high', 'low', 'close', 'volume')}
+            histories[symbols[i]] = pattern_events(bars, self.config.scanner.patterns)
+        return histories
     
     def _has_bullish_setup(self, technicals: Dict) -> bool:
         """Check for bullish technical setup with momentum focus - MUCH MORE LENIENT"""
@@ -301,18 +407,33 @@ if __name__ == "__main__":
             min_earnings_growth = 0.05
             min_institutional_ownership = 0.1
             min_relative_strength = 1.1
+            screens = {'min_price': 'price >= 1', 'momentum_60d': 'price_change_60d >= 0',
+                       'not_extended_intraday': 'not (intraday_rsi > 80)'}
+            patterns = ['breakout', 'flag', 'ascending_triangle', 'cup_and_handle', 'momentum_surge']
+        def get_market_cap_category(self, market_cap):
+            return 'mid_cap'
+        def get_adaptive_thresholds(self, category):
+            return {'volume_min': 100_000, 'growth_min': 0.05, 'pe_max': 40}
 
     class DummyDataFetcher:
+        def map_concurrent(self, func, items):
+            for i, item in enumerate(items):
+                yield i, func(item)
         def get_stocks_by_market_cap(self, min_cap, max_cap, min_volume):
-            return [{'symbol': 'TEST', 'name': 'Test Corp', 'market_cap': 1_000_000_000}]
+            return [{'symbol': 'TEST', 'name': 'Test Corp', 'market_cap': 1_000_000_000, 'price': 10, 'volume': 200_000}]
         def get_quote(self, symbol):
             return {'price': 10, 'volume': 200_000, 'avg_volume': 150_000}
+        def update_stock_data_with_current_prices(self, stocks):
+            return [{**stock, **self.get_quote(stock['symbol'])} for stock in stocks]
         def get_fundamentals(self, symbol):
             return {'pe_ratio': 20, 'revenue_growth': 0.1, 'earnings_growth': 0.1, 'institutional_ownership': 0.2}
         def get_price_history(self, symbol, days):
-            return [{'close': 10 + i*0.1, 'high': 10 + i*0.15, 'low': 10 + i*0.05, 'volume': 200_000} for i in range(days)]
+            start = datetime.now() - timedelta(days=days)
+            return [{'date': (start + timedelta(days=i)).strftime('%Y-%m-%d'), 'close': 10 + i*0.1, 'high': 10 + i*0.15, 'low': 10 + i*0.05, 'volume': 200_000} for i in range(days)]
 
     scanner = MarketScanner(DummyConfig(), DummyDataFetcher())
     stocks = scanner.find_stocks_by_market_cap()
     filtered = scanner.apply_filters(stocks)
-    print("Filtered stocks:", filtered)
\ No newline at end of file
+    print("Filtered stocks:", filtered)
+    history = scanner.scan_pattern_history(['TEST'], days=120)
+    print("Pattern history:", {symbol: len(events) for symbol, events in history.items()})
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""
+Long-running position monitor that keeps the analyzer, data fetcher and their caches warm
+
+Every active position sits in a due-time heap. A short scheduler tick evaluates
+the positions that have come due, then re-queues each one: positions near expiry
+or near an exit trigger come back after hot_quote_refresh_interval minutes, quiet
+ones after quote_refresh_interval, so an exit signal surfaces within one
+refresh interval of the move that caused it.
+"""
+
+import heapq
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import schedule
+
+logger = logging.getLogger(__name__)
+
+
+TICK_SECONDS = 15
+NEAR_TRIGGER = 0.8  # this far toward an exit rule's threshold counts as near it
+HOT_BAND = 0.05  # or within 5% of one of the position's trigger levels (utils/exit_triggers.py)
+
+
+def is_hot(evaluation: Dict, trading) -> bool:
+    """Whether a position's last evaluation puts it near expiry or an exit trigger"""
+    if evaluation.get('action', 'HOLD') != 'HOLD':
+        return True
+    if 'pnl_percent' not in evaluation:
+        return False  # no data this time; retried on the quiet schedule
+    if evaluation['days_to_expiration'] <= 2 * trading.days_before_exp_exit:
+        return True
+    if 'trigger_range' in evaluation:
+        lower, upper = evaluation['trigger_range']
+        spot = evaluation['current_stock_price']
+        return spot <= lower * (1 + HOT_BAND) or spot >= upper * (1 - HOT_BAND)
+    pnl_percent = evaluation['pnl_percent']
+    if pnl_percent >= 50 * NEAR_TRIGGER or pnl_percent <= -50 * NEAR_TRIGGER:
+        return True
+    return evaluation.get('stock_change', 0) <= -0.10 * NEAR_TRIGGER
+
+
+class MonitorDaemon:
+    """Re-evaluates monitored positions on a per-position schedule until interrupted"""
+
+    def __init__(self, analyzer, data_fetcher, config, on_signal: Optional[Callable[[List[Dict]], None]] = None):
+        self.analyzer = analyzer
+        self.data_fetcher = data_fetcher
+        self.config = config
+        self.on_signal = on_signal
+        self.scheduler = schedule.Scheduler()
+        self.due: List[Tuple[float, str]] = []  # (due time, position id) heap
+        self.hot = set()
+        self.reported = {}  # position id -> (action, urgency) last passed to on_signal
+
+    @property
+    def quiet_interval(self) -> float:
+        return self.config.data.quote_refresh_interval
+
+    @property
+    def hot_interval(self) -> float:
+        return min(self.config.data.hot_quote_refresh_interval, self.quiet_interval)
+
+    def start(self):
+        """Load positions and register the scheduler jobs"""
+        self.reload()
+        self.scheduler.every(TICK_SECONDS).seconds.do(self._guarded, self.tick)
+        # Positions opened or closed by other processes are picked up on this cadence
+        self.scheduler.every(self.quiet_interval).minutes.do(self._guarded, self.reload)
+        self.scheduler.every(self.config.data.options_refresh_interval).minutes.do(
+            self._guarded, self.data_fetcher.save_all_caches)
+
+    def run(self):
+        """Run until interrupted (Ctrl+C), saving caches on the way out"""
+        self.start()
+        logger.info(f"Monitor daemon watching {len(self.due)} positions "
+                    f"(every {self.quiet_interval}m, {self.hot_interval}m near triggers) - Ctrl+C to stop")
+        try:
+            while True:
+                self.scheduler.run_pending()
+                time.sleep(max(self.scheduler.idle_seconds or 0, 0.5))
+        except KeyboardInterrupt:
+            logger.info("Monitor daemon stopped")
+        finally:
+            self.scheduler.clear()
+            self.data_fetcher.save_all_caches()
+
+    @staticmethod
+    def _guarded(job: Callable):
+        # An exception escaping a job would stop the scheduler loop
+        try:
+            job()
+        except Exception as e:
+            logger.error(f"Monitor daemon job {getattr(job, '__name__', job)} failed: {e}")
+
+    def reload(self):
+        """Re-read monitored positions and queue any active ones not yet scheduled"""
+        self.analyzer.load_monitored_positions()
+        scheduled = {position_id for _, position_id in self.due}
+        now = time.time()
+        for position_id, position in self.analyzer.monitored_positions.items():
+            if position.get('status') == 'ACTIVE' and position_id not in scheduled:
+                heapq.heappush(self.due, (now, position_id))
+        # Closed or removed positions fall out when they next come due
+
+    def tick(self):
+        """Evaluate every position that has come due and re-queue it by how close it is to a trigger"""
+        now = time.time()
+        due = []
+        while self.due and self.due[0][0] <= now:
+            _, position_id = heapq.heappop(self.due)
+            position = self.analyzer.monitored_positions.get(position_id)
+            if position is not None and position.get('status') == 'ACTIVE':
+                due.append((position_id, position))
+            else:
+                self.hot.discard(position_id)
+                self.reported.pop(position_id, None)
+        if not due:
+            return
+
+        signals = []
+        for i, evaluation in self.data_fetcher.map_concurrent(lambda item: self._evaluate(*item), due):
+            position_id, position = due[i]
+            hot = evaluation is not None and is_hot(evaluation, self.config.trading)
+            if hot:
+                self.hot.add(position_id)
+            else:
+                self.hot.discard(position_id)
+            minutes = self.hot_interval if hot else self.quiet_interval
+            heapq.heappush(self.due, (time.time() + minutes * 60, position_id))
+            if evaluation is None or 'pnl_percent' not in evaluation:
+                continue
+
+            logger.info(f"{position['symbol']} ${position['strike']} {position['expiration']}: "
+                        f"{evaluation['pnl_percent']:+.1f}% {evaluation['action']}, next check in {minutes}m")
+            state = (evaluation['action'], evaluation.get('urgency'))
+            # Report a signal once, and again only if it changes
+            if self.reported.get(position_id, ('HOLD', None)) != state:
+                self.reported[position_id] = state
+                if evaluation['action'] != 'HOLD':
+                    signals.append(evaluation)
+        if signals and self.on_signal is not None:
+            self.on_signal(signals)
+
+    def _evaluate(self, position_id: str, position: Dict) -> Optional[Dict]:
+        # A hot position's stock quote may be no older than its own refresh interval
+        max_age = self.hot_interval if position_id in self.hot else None
+        try:
+            # A stock quote against the trigger levels; the chain is repriced only near one
+            return self.analyzer.check_position(position, quote_max_age=max_age)
+        except Exception as e:
+            logger.error(f"Error monitoring {position_id}: {e}")
+            return None
\ No newline at end of file
@@ -3,7 +3,10 @@ Improved Options Analyzer with specific recommendations and monitoring
 """
 
 import logging
-from typing import Dict, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 import numpy as np
 from scipy.stats import norm
@@ -11,9 +14,29 @@ import math
 import json
 from pathlib import Path
 
+from .chain_scoring import chain_columns, explain, score_fields
+from .position_journal import PositionJournal
+from .exit_triggers import (EXPIRY_EXIT_DAYS, LATE_DAYS, LATE_PROFIT_TARGET, MAX_THETA_RATIO, MIN_LATE_DELTA,
+                            PROFIT_TARGET, STOCK_STOP, STOP_LOSS, compute_levels)
+from .records import Recommendation
+from .score_cache import ScoreCache
+from .spreads import STRATEGY as SPREAD_STRATEGY, best_spreads, explain_spread
+
 logger = logging.getLogger(__name__)
 
 
+def _score_task(task: Optional[Tuple]) -> Optional[List[Dict]]:
+    """Batch-score one packed chain (runs in pool workers); None means fall back to per-contract scoring"""
+    if task is None:
+        return None
+    symbol, columns, current_price, technical_bonus, technical_reasons, simulation, weights = task
+    try:
+        return score_fields(columns, current_price, technical_bonus, technical_reasons, simulation, weights)
+    except Exception as e:
+        logger.debug(f"Batch scoring failed for {symbol}, scoring contracts one by one: {e}")
+        return None
+
+
 class OptionsAnalyzer:
     """Enhanced options analyzer with specific recommendations"""
     
@@ -21,53 +44,221 @@ class OptionsAnalyzer:
         self.config = config
         self.data_fetcher = data_fetcher
         self.monitored_positions_file = Path("data/monitored_positions.json")
+        # Snapshot plus append-only event journal; replayed here, appended to per change
+        self.position_store = PositionJournal(self.monitored_positions_file)
+        # Scores of unchanged contracts are reused across scans
+        self.score_cache = ScoreCache() if getattr(config.data, 'use_cache', True) else None
+        # Optional ScanSnapshot that records every chain scored, for --rerank
+        self.snapshot = None
+        # Exit trigger levels per position, refreshed whenever it is fully repriced
+        self.trigger_levels = {}
         self.load_monitored_positions()
         
     def load_monitored_positions(self):
-        """Load positions being monitored"""
-        if self.monitored_positions_file.exists():
-            with open(self.monitored_positions_file, 'r') as f:
-                self.monitored_positions = json.load(f)
-        else:
-            self.monitored_positions = {}
+        """Load positions being monitored, including changes other processes have journaled since"""
+        self.position_store.refresh()
+        self.monitored_positions = self.position_store.positions
     
     def save_monitored_positions(self):
-        """Save monitored positions"""
-        self.monitored_positions_file.parent.mkdir(exist_ok=True)
-        with open(self.monitored_positions_file, 'w') as f:
-            json.dump(self.monitored_positions, f, indent=2)
+        """Compact the position journal into its snapshot (changes are already journaled as they happen)"""
+        self.position_store.compact()
     
     def analyze_stock(self, stock: dict) -> list:
         """Analyze a single stock for call options opportunities (scoring and enrichment logic restored)"""
         symbol = stock['symbol']
-        recommendations = []
         try:
-            options_chain = self.data_fetcher.get_options_chain(symbol)
-            if not options_chain:
+            prepared = self._prepare(stock)
+            if prepared is None:
                 return []
-            current_price = stock.get('price', 0)
-            for option in options_chain:
+            options_chain, task, memo = prepared
+            return self._recommendations(stock, options_chain, _score_task(task), memo)
+        except Exception as e:
+            logger.error(f"Error analyzing options for {symbol}: {e}")
+            return []
+    
+    def analyze_stocks(self, stocks: List[Dict], workers: Optional[int] = None) -> Iterator[Tuple[Dict, List]]:
+        """Analyze many stocks, scoring their chains in a process pool
+        
+        Chains are fetched here and shipped to workers as column arrays; results are
+        yielded as (stock, recommendations) in input order, so ranking is deterministic.
+        workers=None uses every core, workers=1 analyzes in-process. If the pool breaks
+        (a worker died), the remaining chains are batch-scored in-process instead.
+        """
+        if workers == 1 or len(stocks) <= 1:
+            for stock in stocks:
+                yield stock, self.analyze_stock(stock)
+            return
+        
+        pending = deque()
+        pool_usable = True
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for stock in stocks:
                 try:
-                    score, analysis = self._score_option_comprehensive(option, current_price, stock)
-                    recommendation = option.copy()
-                    recommendation['score'] = score
-                    recommendation['analysis'] = analysis
-                    recommendation['recommendation_reasons'] = analysis.get('reasons', [])
-                    recommendation['expected_return'] = analysis.get('expected_return', 0)
-                    recommendation['current_stock_price'] = current_price
-                    recommendation['entry_price'] = option.get('ask', option.get('mid', 0))
-                    recommendations.append(recommendation)
+                    prepared = self._prepare(stock)
                 except Exception as e:
-                    logger.warning(f"Error analyzing option for {symbol}: {e}")
-                    continue
-            return recommendations
+                    logger.error(f"Error analyzing options for {stock['symbol']}: {e}")
+                    prepared = None
+                if prepared is None:
+                    pending.append((stock, None, None, None, None))
+                else:
+                    options_chain, task, memo = prepared
+                    future = None
+                    if task is not None and pool_usable:
+                        try:
+                            future = pool.submit(_score_task, task)
+                        except (BrokenProcessPool, RuntimeError) as e:
+                            logger.warning(f"Process pool unavailable, scoring the remaining chains in-process: {e}")
+                            pool_usable = False
+                    if task is not None and future is None:
+                        future = Future()
+                        future.set_result(_score_task(task))
+                    pending.append((stock, options_chain, future, memo, task))
+                # Hand back finished results while later chains are still being fetched
+                while pending and (pending[0][2] is None or pending[0][2].done()):
+                    yield self._collect(*pending.popleft())
+            while pending:
+                yield self._collect(*pending.popleft())
+    
+    def _prepare(self, stock: Dict) -> Optional[Tuple[List[Dict], Optional[Tuple], Tuple]]:
+        """Fetch a stock's chain and pack the contracts that need scoring
+        
+        Returns (chain, task, memo). The task holds only score-cache misses and is None
+        if there is nothing to batch-score; memo is (keys, cached fields, miss positions).
+        """
+        symbol = stock['symbol']
+        options_chain = self.data_fetcher.get_options_chain(symbol)
+        if not options_chain:
+            return None
+        if self.snapshot is not None:
+            self.snapshot.add_chain(symbol, options_chain)
+        current_price = stock.get('price', 0)
+        keys = None
+        cached = [None] * len(options_chain)
+        misses = list(range(len(options_chain)))
+        try:
+            technical_bonus, technical_reasons = self._technical_bonus(stock)
+            columns = chain_columns(options_chain)
+            simulation = self._simulation()
+            weights = self.config.trading.scoring_weights or {}
+            if self.score_cache is not None:
+                context = (current_price, technical_bonus, technical_reasons, simulation, sorted(weights.items()))
+                keys = self.score_cache.keys(options_chain, columns, context)
+                cached = self.score_cache.get_many(keys)
+                misses = [i for i, fields in enumerate(cached) if fields is None]
+                columns = {name: values[misses] for name, values in columns.items()}
+            task = (symbol, columns, current_price, technical_bonus, technical_reasons, simulation,
+                    weights) if misses else None
         except Exception as e:
-            logger.error(f"Error analyzing options for {symbol}: {e}")
+            logger.debug(f"Batch scoring unavailable for {symbol}, scoring contracts one by one: {e}")
+            task = None
+        return options_chain, task, (keys, cached, misses)
+    
+    def _simulation(self) -> Optional[Dict]:
+        """Monte Carlo settings for the batch scorer, or None to keep the scenario estimates"""
+        trading = self.config.trading
+        if trading.monte_carlo_paths <= 0:
+            return None
+        return {'paths': trading.monte_carlo_paths, 'seed': trading.monte_carlo_seed,
+                'drift': trading.monte_carlo_drift}
+    
+    def _collect(self, stock: Dict, options_chain: Optional[List[Dict]], future,
+                 memo: Optional[Tuple], task: Optional[Tuple]) -> Tuple[Dict, List]:
+        """Wait for one stock's scores and turn them into recommendations"""
+        if options_chain is None:
+            return stock, []
+        try:
+            try:
+                scored = future.result() if future is not None else None
+            except BrokenProcessPool:
+                # The worker scoring this chain died; score it here rather than drop the stock
+                scored = _score_task(task)
+            return stock, self._recommendations(stock, options_chain, scored, memo)
+        except Exception as e:
+            logger.error(f"Error analyzing options for {stock['symbol']}: {e}")
+            return stock, []
+    
+    def _recommendations(self, stock: Dict, options_chain: List[Dict], scored: Optional[List[Dict]],
+                         memo: Tuple) -> List[Dict]:
+        """Merge fresh scores for the cache misses with cached ones and attach them to their contracts
+        
+        scored=None with misses left falls back to per-contract scoring. That scorer has no
+        Monte Carlo engine, so with a simulation configured its rows are marked
+        fallback_scored and kept out of the score cache. Batch-scored contracts carry
+        reason codes only; call explain() before showing them.
+        """
+        current_price = stock.get('price', 0)
+        keys, cached, misses = memo
+        if misses and scored is None:
+            scored = self._score_contracts([options_chain[i] for i in misses], current_price, stock,
+                                           self.config.trading.scoring_weights)
+            if self._simulation() is not None:
+                logger.warning(f"Scored {stock['symbol']} without the Monte Carlo simulation; "
+                               f"its scenario-based scores are not cached")
+                keys = None
+                for fields in scored:
+                    if fields is not None:
+                        fields['fallback_scored'] = True
+        all_fields = list(cached)
+        for i, fields in zip(misses, scored or []):
+            all_fields[i] = fields
+            if keys is not None and fields is not None:
+                self.score_cache.put(keys[i], fields)
+        
+        recommendations = []
+        for option, fields in zip(options_chain, all_fields):
+            if fields is None:
+                continue
+            # References the contract instead of copying its fields
+            recommendation = Recommendation(option, current_stock_price=current_price,
+                                            entry_price=option.get('ask', option.get('mid', 0)), **fields)
+            recommendations.append(recommendation)
+        if self.config.trading.enable_spreads:
+            recommendations.extend(self._spreads(options_chain, current_price, stock))
+        return recommendations
+    
+    def _spreads(self, options_chain: List[Dict], current_price: float, stock: Dict) -> List[Dict]:
+        """Best bull call debit spreads from the chain, ranked alongside the single legs"""
+        try:
+            technical_bonus, _ = self._technical_bonus(stock)
+            trading = self.config.trading
+            return best_spreads(options_chain, current_price, technical_bonus,
+                                trading.spread_max_width_pct, trading.spread_max_legs_apart,
+                                weights=trading.scoring_weights)
+        except Exception as e:
+            logger.warning(f"Error searching spreads for {stock['symbol']}: {e}")
             return []
     
+    def _score_contracts(self, options_chain: List[Dict], current_price: float,
+                         stock: Dict, weights: Optional[Dict[str, float]] = None) -> List[Optional[Dict]]:
+        """Score a chain one contract at a time (fallback when batch scoring fails)"""
+        scored = []
+        for option in options_chain:
+            try:
+                score, analysis = self._score_option_comprehensive(option, current_price, stock, weights)
+                scored.append({
+                    'score': score,
+                    'analysis': analysis,
+                    'recommendation_reasons': analysis.get('reasons', []),
+                    'expected_return': analysis.get('expected_return', 0)
+                })
+            except Exception as e:
+                logger.warning(f"Error analyzing option for {stock['symbol']}: {e}")
+                scored.append(None)
+        return scored
+    
+    def explain(self, recommendation: Dict) -> Dict:
+        """Render a recommendation's reasons and analysis (only needed for displayed/persisted ones)"""
+        if recommendation.get('strategy') == SPREAD_STRATEGY:
+            return explain_spread(recommendation)
+        return explain(recommendation)
+    
     def _score_option_comprehensive(self, option: Dict, current_price: float, 
-                                   stock: Dict) -> Tuple[float, Dict]:
-        """Comprehensive scoring system for options with better reasoning"""
+                                   stock: Dict, weights: Optional[Dict[str, float]] = None) -> Tuple[float, Dict]:
+        """Comprehensive scoring system for options with better reasoning
+        
+        weights scales each term's points like the batch scorer's (see WEIGHTED_TERMS).
+        """
+        weight = lambda term: 1.0 if not weights else float(weights.get(term, 1.0))
         score = 0
         reasons = []
         analysis = {}
@@ -78,22 +269,22 @@ class OptionsAnalyzer:
         # 1. Moneyness Score (25 points) - Most important for call options
         moneyness = value_analysis.get('moneyness', 1.0)
         if 0.95 <= moneyness <= 1.05:  # ATM to slightly OTM - optimal for calls
-            score += 25
+            score += 25 * weight('moneyness')
             reasons.append(f"Optimal strike near money (${option['strike']:.2f})")
         elif 1.05 < moneyness <= 1.15:  # Slightly OTM - good for momentum
-            score += 20
+            score += 20 * weight('moneyness')
             reasons.append(f"Good OTM strike for momentum (${option['strike']:.2f})")
         elif 0.90 <= moneyness < 0.95:  # Slightly ITM - safer
-            score += 18
+            score += 18 * weight('moneyness')
             reasons.append(f"Slightly ITM with intrinsic value (${option['strike']:.2f})")
         elif 1.15 < moneyness <= 1.25:  # Further OTM - higher risk/reward
-            score += 15
+            score += 15 * weight('moneyness')
             reasons.append(f"Further OTM for higher leverage (${option['strike']:.2f})")
         elif moneyness < 0.90:  # Deep ITM - expensive
-            score += 10
+            score += 10 * weight('moneyness')
             reasons.append(f"Deep ITM - expensive but safer (${option['strike']:.2f})")
         elif moneyness > 1.25:  # Far OTM - very risky
-            score += 5
+            score += 5 * weight('moneyness')
             reasons.append(f"Far OTM - high risk (${option['strike']:.2f})")
         
         # 2. Time Value Analysis (20 points)
@@ -101,19 +292,19 @@ class OptionsAnalyzer:
         days = option['days_to_expiration']
         
         if 30 <= days <= 45 and time_value_pct < 80:  # Optimal time decay
-            score += 20
+            score += 20 * weight('expiration')
             reasons.append(f"Optimal expiration ({days} days) with reasonable time value")
         elif 25 <= days < 30 or 45 < days <= 60:
-            score += 15
+            score += 15 * weight('expiration')
             reasons.append(f"Good expiration ({days} days)")
         elif 20 <= days < 25 or 60 < days <= 70:
-            score += 10
+            score += 10 * weight('expiration')
             reasons.append(f"Acceptable expiration ({days} days)")
         elif days < 20:
-            score += 5
+            score += 5 * weight('expiration')
             reasons.append(f"Short expiration ({days} days) - high theta risk")
         elif days > 70:
-            score += 8
+            score += 8 * weight('expiration')
             reasons.append(f"Long expiration ({days} days) - expensive time value")
         
         # 3. Liquidity Score (20 points)
@@ -124,7 +315,7 @@ class OptionsAnalyzer:
         
         # Normalize liquidity score
         normalized_liquidity = min(liquidity_score / 100 * 20, 20)
-        score += normalized_liquidity
+        score += normalized_liquidity * weight('liquidity')
         
         if volume > 100:
             reasons.append(f"High volume ({volume}) - easy to trade")
@@ -149,33 +340,33 @@ class OptionsAnalyzer:
         
         # Delta analysis
         if 0.25 <= delta <= 0.45:  # Sweet spot for calls
-            score += 8
+            score += 8 * weight('delta')
             reasons.append(f"Good delta ({delta:.2f}) - balanced risk/reward")
         elif 0.20 <= delta < 0.25 or 0.45 < delta <= 0.55:
-            score += 6
+            score += 6 * weight('delta')
             reasons.append(f"Acceptable delta ({delta:.2f})")
         elif delta > 0.55:  # High delta - expensive
-            score += 4
+            score += 4 * weight('delta')
             reasons.append(f"High delta ({delta:.2f}) - expensive but safer")
         elif delta < 0.20:  # Low delta - risky
-            score += 3
+            score += 3 * weight('delta')
             reasons.append(f"Low delta ({delta:.2f}) - high leverage")
         
         # Theta analysis (want low theta relative to price)
         theta_ratio = abs(theta) / (option['ask'] if option['ask'] > 0 else 0.01)
         if theta_ratio < 0.02:  # Less than 2% daily decay
-            score += 4
+            score += 4 * weight('theta')
             reasons.append(f"Low theta decay ({abs(theta):.3f})")
         elif theta_ratio < 0.03:
-            score += 2
+            score += 2 * weight('theta')
             reasons.append(f"Moderate theta decay ({abs(theta):.3f})")
         elif theta_ratio > 0.05:
-            score -= 2
+            score -= 2 * weight('theta')
             reasons.append(f"High theta decay ({abs(theta):.3f}) - time decay risk")
         
         # Gamma analysis
         if 0.01 <= gamma <= 0.05:
-            score += 3
+            score += 3 * weight('gamma')
             reasons.append(f"Good gamma ({gamma:.3f}) - responsive to stock moves")
         
         # 5. Volatility Analysis (10 points)
@@ -183,38 +374,76 @@ class OptionsAnalyzer:
         iv_percentile = option.get('iv_percentile', 50)
         
         if 0.3 <= iv <= 0.6 and 30 <= iv_percentile <= 70:  # Moderate IV
-            score += 10
+            score += 10 * weight('iv')
             reasons.append(f"Reasonable IV ({iv:.1%}) - not overpriced")
         elif 0.2 <= iv < 0.3 or 0.6 < iv <= 0.8:
-            score += 7
+            score += 7 * weight('iv')
             reasons.append(f"Acceptable IV ({iv:.1%})")
         elif iv > 0.8 or iv_percentile > 80:
-            score += 3
+            score += 3 * weight('iv')
             reasons.append(f"High IV ({iv:.1%}) - expensive but potential for IV crush")
         elif iv < 0.2 or iv_percentile < 20:
-            score += 5
+            score += 5 * weight('iv')
             reasons.append(f"Low IV ({iv:.1%}) - cheap but low volatility")
         
         # 6. Expected Return Analysis (10 points)
         expected_return = self._calculate_expected_return(current_price, option, stock.get('atr', current_price * 0.02))
         
         if expected_return > 0.3:
-            score += 10
+            score += 10 * weight('expected_return')
             reasons.append(f"High expected return ({expected_return:.1%})")
         elif expected_return > 0.1:
-            score += 7
+            score += 7 * weight('expected_return')
             reasons.append(f"Good expected return ({expected_return:.1%})")
         elif expected_return > 0:
-            score += 4
+            score += 4 * weight('expected_return')
             reasons.append(f"Positive expected return ({expected_return:.1%})")
         elif expected_return > -0.2:
-            score += 2
+            score += 2 * weight('expected_return')
             reasons.append(f"Moderate expected return ({expected_return:.1%})")
         else:
-            score -= 5
+            score -= 5 * weight('expected_return')
             reasons.append(f"Poor expected return ({expected_return:.1%})")
         
-        # 7. Technical Setup Bonus (up to 15 points) - Enhanced for negative momentum analysis
+        # 7. Technical Setup Bonus (up to 15 points)
+        technical_bonus, technical_reasons = self._technical_bonus(stock)
+        reasons.extend(technical_reasons)
+        score += min(technical_bonus, 15) * weight('technical')  # Cap at 15 points
+        
+        # 8. Risk/Reward Analysis (10 points)
+        risk_reward = self._calculate_risk_reward(option)
+        
+        if risk_reward > 2.0:
+            score += 10 * weight('risk_reward')
+            reasons.append(f"Excellent risk/reward ratio ({risk_reward:.1f})")
+        elif risk_reward > 1.5:
+            score += 8 * weight('risk_reward')
+            reasons.append(f"Good risk/reward ratio ({risk_reward:.1f})")
+        elif risk_reward > 1.0:
+            score += 5 * weight('risk_reward')
+            reasons.append(f"Acceptable risk/reward ratio ({risk_reward:.1f})")
+        elif risk_reward > 0.5:
+            score += 2 * weight('risk_reward')
+            reasons.append(f"Moderate risk/reward ratio ({risk_reward:.1f})")
+        
+        # Compile analysis
+        analysis = {
+            'total_score': score,
+            'moneyness': moneyness,
+            'reasons': reasons,
+            'liquidity_assessment': 'Excellent' if liquidity_score > 80 else 'Good' if liquidity_score > 60 else 'Fair' if liquidity_score > 40 else 'Poor',
+            'risk_assessment': 'Low' if score > 80 else 'Medium' if score > 60 else 'High' if score > 40 else 'Very High',
+            'expected_return': expected_return,
+            'risk_reward_ratio': risk_reward,
+            'time_value_pct': time_value_pct,
+            'iv_rank': value_analysis.get('iv_rank', 'Normal')
+        }
+        
+        return score, analysis
+    
+    def _technical_bonus(self, stock: Dict) -> Tuple[int, List[str]]:
+        """Technical setup bonus for a stock (uncapped) with its reasons - enhanced for negative momentum analysis"""
+        reasons = []
         technical_bonus = 0
         
         # RSI analysis for oversold conditions
@@ -278,38 +507,7 @@ class OptionsAnalyzer:
             technical_bonus += 2
             reasons.append(f"{sector} sector - growth potential")
         
-        score += min(technical_bonus, 15)  # Cap at 15 points
-        
-        # 8. Risk/Reward Analysis (10 points)
-        risk_reward = self._calculate_risk_reward(option)
-        
-        if risk_reward > 2.0:
-            score += 10
-            reasons.append(f"Excellent risk/reward ratio ({risk_reward:.1f})")
-        elif risk_reward > 1.5:
-            score += 8
-            reasons.append(f"Good risk/reward ratio ({risk_reward:.1f})")
-        elif risk_reward > 1.0:
-            score += 5
-            reasons.append(f"Acceptable risk/reward ratio ({risk_reward:.1f})")
-        elif risk_reward > 0.5:
-            score += 2
-            reasons.append(f"Moderate risk/reward ratio ({risk_reward:.1f})")
-        
-        # Compile analysis
-        analysis = {
-            'total_score': score,
-            'moneyness': moneyness,
-            'reasons': reasons,
-            'liquidity_assessment': 'Excellent' if liquidity_score > 80 else 'Good' if liquidity_score > 60 else 'Fair' if liquidity_score > 40 else 'Poor',
-            'risk_assessment': 'Low' if score > 80 else 'Medium' if score > 60 else 'High' if score > 40 else 'Very High',
-            'expected_return': expected_return,
-            'risk_reward_ratio': risk_reward,
-            'time_value_pct': time_value_pct,
-            'iv_rank': value_analysis.get('iv_rank', 'Normal')
-        }
-        
-        return score, analysis
+        return technical_bonus, reasons
     
     def _print_recommendations(self, symbol: str, current_price: float, 
                               recommendations: List[Dict]):
@@ -320,8 +518,11 @@ class OptionsAnalyzer:
     def add_to_monitoring(self, recommendation: Dict, contracts: int = 1):
         """Add position to monitoring list"""
         position_id = f"{recommendation['symbol']}_{recommendation['strike']}_{recommendation['expiration']}"
+        if recommendation.get('short_strike') is not None:
+            position_id = f"{position_id}_{recommendation['short_strike']}"
+        self.explain(recommendation)
         
-        self.monitored_positions[position_id] = {
+        self.position_store.open(position_id, {
             'symbol': recommendation['symbol'],
             'strike': recommendation['strike'],
             'expiration': recommendation['expiration'],
@@ -329,12 +530,12 @@ class OptionsAnalyzer:
             'entry_price': recommendation['entry_price'],
             'contracts': contracts,
             'current_stock_price_at_entry': recommendation['current_stock_price'],
-            'entry_analysis': recommendation,
+            'entry_analysis': dict(recommendation),
+            'strategy': recommendation.get('strategy', 'long_call'),
+            'short_strike': recommendation.get('short_strike'),
             'status': 'ACTIVE',
             'alerts': []
-        }
-        
-        self.save_monitored_positions()
+        })
         logger.info(f"Added {position_id} to monitoring")
         
     def monitor_positions(self) -> List[Dict]:
@@ -358,10 +559,18 @@ class OptionsAnalyzer:
         
         return exit_signals
     
-    def evaluate_position(self, position: Dict) -> Dict:
-        """Evaluate a monitored position for exit signals"""
+    def evaluate_position(self, position: Dict, quote_max_age: Optional[float] = None) -> Dict:
+        """Evaluate a monitored position for exit signals
+        
+        quote_max_age (minutes) bounds how old a cached stock quote may be; the
+        option quote below reuses the same stock quote.
+        """
         symbol = position['symbol']
         
+        # Get current stock price
+        stock_quote = self.data_fetcher.get_quote(symbol, quote_max_age)
+        current_stock_price = stock_quote['price']
+        
         # Get current data
         current_contract = self.data_fetcher.get_option_quote(
             symbol,
@@ -371,12 +580,9 @@ class OptionsAnalyzer:
         )
         
         if not current_contract:
+            self.trigger_levels.pop(self._position_key(position), None)
             return {'action': 'HOLD', 'reason': 'Unable to get current data'}
         
-        # Get current stock price
-        stock_quote = self.data_fetcher.get_quote(symbol)
-        current_stock_price = stock_quote['price']
-        
         # Calculate metrics
         days_held = (datetime.now() - datetime.fromisoformat(position['entry_date'])).days
         days_to_expiration = (datetime.fromisoformat(position['expiration']) - datetime.now()).days
@@ -384,6 +590,28 @@ class OptionsAnalyzer:
         # Current P&L
         entry_price = position['entry_price']
         current_price = current_contract.get('mid', current_contract.get('last', 0))
+        if position.get('short_strike') is not None:
+            # Debit spread: value is the long leg less the short leg
+            short_contract = self.data_fetcher.get_option_quote(
+                symbol,
+                position['short_strike'],
+                position['expiration'],
+                'CALL'
+            )
+            if not short_contract:
+                self.trigger_levels.pop(self._position_key(position), None)
+                return {'action': 'HOLD', 'reason': 'Unable to get current data'}
+            current_price -= short_contract.get('mid', short_contract.get('last', 0))
+            # Net Greeks: the long leg less the short leg
+            delta = current_contract.get('delta', 0) - short_contract.get('delta', 0)
+            theta = current_contract.get('theta', 0) - short_contract.get('theta', 0)
+            # A spread whose short leg decays faster gains from time; only net decay counts
+            decay = max(-theta, 0)
+        else:
+            short_contract = None
+            delta = current_contract.get('delta', 0)
+            theta = current_contract.get('theta', 0)
+            decay = abs(theta)
         pnl = current_price - entry_price
         pnl_percent = (pnl / entry_price) * 100 if entry_price > 0 else 0
         
@@ -400,8 +628,8 @@ class OptionsAnalyzer:
             'pnl_percent': pnl_percent,
             'days_held': days_held,
             'days_to_expiration': days_to_expiration,
-            'current_delta': current_contract.get('delta', 0),
-            'current_theta': current_contract.get('theta', 0),
+            'current_delta': delta,
+            'current_theta': theta,
             'current_iv': current_contract.get('implied_volatility', 0)
         }
         
@@ -409,36 +637,36 @@ class OptionsAnalyzer:
         reasons = []
         
         # 1. Profit targets
-        if pnl_percent >= 50:
+        if pnl_percent >= PROFIT_TARGET * 100:
             evaluation['action'] = 'SELL'
             evaluation['urgency'] = 'RECOMMENDED'
-            reasons.append(f"Hit 50% profit target (currently +{pnl_percent:.1f}%)")
-        elif pnl_percent >= 30 and days_to_expiration <= 14:
+            reasons.append(f"Hit {PROFIT_TARGET:.0%} profit target (currently +{pnl_percent:.1f}%)")
+        elif pnl_percent >= LATE_PROFIT_TARGET * 100 and days_to_expiration <= LATE_DAYS:
             evaluation['action'] = 'SELL'
             evaluation['urgency'] = 'RECOMMENDED'
             reasons.append(f"Good profit (+{pnl_percent:.1f}%) with {days_to_expiration} days left")
         
         # 2. Stop loss
-        if pnl_percent <= -50:
+        if pnl_percent <= STOP_LOSS * 100:
             evaluation['action'] = 'SELL'
             evaluation['urgency'] = 'URGENT'
             reasons.append(f"Stop loss triggered ({pnl_percent:.1f}%)")
         
         # 3. Time-based exits
-        if days_to_expiration <= 7:
+        if days_to_expiration <= EXPIRY_EXIT_DAYS:
             if evaluation['action'] != 'SELL':
                 evaluation['action'] = 'SELL'
                 evaluation['urgency'] = 'URGENT'
             reasons.append(f"Only {days_to_expiration} days to expiration")
-        elif days_to_expiration <= 14 and current_contract.get('delta', 0) < 0.20:
+        elif days_to_expiration <= LATE_DAYS and delta < MIN_LATE_DELTA:
             if evaluation['action'] != 'SELL':
                 evaluation['action'] = 'SELL'
                 evaluation['urgency'] = 'RECOMMENDED'
-            reasons.append(f"Low delta ({current_contract.get('delta', 0):.2f}) with {days_to_expiration} days left")
+            reasons.append(f"Low delta ({delta:.2f}) with {days_to_expiration} days left")
         
         # 4. Theta decay
-        theta_ratio = abs(current_contract.get('theta', 0)) / current_price if current_price > 0 else 0
-        if theta_ratio > 0.05:  # Losing more than 5% per day
+        theta_ratio = decay / current_price if current_price > 0 else 0
+        if theta_ratio > MAX_THETA_RATIO:  # Losing more than 5% per day
             if evaluation['action'] != 'SELL':
                 evaluation['action'] = 'SELL'
                 evaluation['urgency'] = 'CONSIDER'
@@ -446,17 +674,70 @@ class OptionsAnalyzer:
         
         # 5. Stock moved against us
         stock_change = (current_stock_price - position['current_stock_price_at_entry']) / position['current_stock_price_at_entry']
-        if stock_change < -0.10:  # Stock down 10%
+        if stock_change < STOCK_STOP:  # Stock down 10%
             if evaluation['action'] != 'SELL':
                 evaluation['action'] = 'SELL'
                 evaluation['urgency'] = 'RECOMMENDED'
             reasons.append(f"Stock down {stock_change:.1%} since entry")
         
+        evaluation['stock_change'] = stock_change
         evaluation['reasons'] = reasons
         evaluation['recommendation'] = self._get_action_recommendation(evaluation)
         
+        # Stock prices at which each exit rule would fire, for cheap checks until the next repricing
+        levels = compute_levels(position, current_stock_price, current_price, days_to_expiration,
+                                current_contract.get('implied_volatility', 0), current_contract.get('theta'),
+                                short_contract.get('implied_volatility') if short_contract else None)
+        key = self._position_key(position)
+        if levels is None:
+            self.trigger_levels.pop(key, None)
+        else:
+            self.trigger_levels[key] = levels
+            evaluation['trigger_range'] = (levels.lower, levels.upper)
+        
         return evaluation
     
+    def check_position(self, position: Dict, quote_max_age: Optional[float] = None) -> Dict:
+        """Check a position against its precomputed trigger levels from a stock quote alone
+        
+        Falls back to a full evaluate_position (option quotes and new levels) when there
+        are no fresh levels or the stock is near one; otherwise returns a HOLD evaluation
+        with the position's value estimated from its Greeks.
+        """
+        levels = self.trigger_levels.get(self._position_key(position))
+        if levels is None or levels.stale(self.config.data.options_refresh_interval):
+            return self.evaluate_position(position, quote_max_age)
+        current_stock_price = self.data_fetcher.get_quote(position['symbol'], quote_max_age)['price']
+        if levels.near(current_stock_price):
+            return self.evaluate_position(position, quote_max_age)
+        
+        entry_price = position['entry_price']
+        current_price = levels.estimate_value(current_stock_price)
+        pnl = current_price - entry_price
+        entry_stock_price = position['current_stock_price_at_entry']
+        evaluation = {
+            'action': 'HOLD',
+            'estimated': True,
+            'symbol': position['symbol'],
+            'strike': position['strike'],
+            'expiration': position['expiration'],
+            'current_stock_price': current_stock_price,
+            'current_option_price': current_price,
+            'entry_price': entry_price,
+            'pnl': pnl,
+            'pnl_percent': (pnl / entry_price) * 100 if entry_price > 0 else 0,
+            'days_to_expiration': (datetime.fromisoformat(position['expiration']) - datetime.now()).days,
+            'stock_change': (current_stock_price - entry_stock_price) / entry_stock_price,
+            'trigger_range': (levels.lower, levels.upper),
+            'reasons': []
+        }
+        evaluation['recommendation'] = self._get_action_recommendation(evaluation)
+        return evaluation
+    
+    @staticmethod
+    def _position_key(position: Dict) -> Tuple:
+        return position['symbol'], position['strike'], position['expiration'], position.get('short_strike')
+    
     def _get_action_recommendation(self, evaluation: Dict) -> str:
         """Get detailed recommendation based on evaluation"""
         if evaluation['action'] == 'HOLD':
@@ -0,0 +1,186 @@
+"""
+Chart pattern detection with O(n) rolling detectors
+
+Every detector takes a bar panel (dict of equal-length numpy arrays with
+'high', 'low', 'close' and 'volume') and returns a boolean array marking the
+bars the pattern fired on, so a whole price history is scanned in one pass.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Patterns are reported in this order when several fire on the same bar
+PATTERN_PRIORITY = ['breakout', 'flag', 'ascending_triangle', 'cup_and_handle', 'momentum_surge']
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """Lag an array by periods bars, padding with NaN"""
+    out = np.full(len(values), np.nan)
+    if periods < len(values):
+        out[periods:] = values[:len(values) - periods]
+    return out
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing window sum from prefix sums (NaN until the window fills)"""
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if window <= len(values):
+        prefix = np.concatenate(([0.0], np.cumsum(values)))
+        out[window - 1:] = prefix[window:] - prefix[:-window]
+    return out
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing window mean"""
+    return rolling_sum(values, window) / window
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing window population standard deviation"""
+    values = np.asarray(values, dtype=float)
+    mean = rolling_mean(values, window)
+    mean_sq = rolling_mean(values * values, window)
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+def rolling_slope(values: np.ndarray, window: int) -> np.ndarray:
+    """Closed-form least-squares slope over a trailing window (x = 0..window-1)"""
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    index = np.arange(n, dtype=float)
+    sum_y = rolling_sum(values, window)
+    # sum(x * y) with x local to the window: sum(i * y) - window_start * sum(y)
+    sum_xy = rolling_sum(index * values, window) - (index - window + 1) * sum_y
+    sum_x = window * (window - 1) / 2
+    sum_xx = (window - 1) * window * (2 * window - 1) / 6
+    return (window * sum_xy - sum_x * sum_y) / (window * sum_xx - sum_x ** 2)
+
+
+def _rolling_extreme(values: np.ndarray, window: int, func) -> np.ndarray:
+    """Trailing window max/min in O(n) using block prefix/suffix scans"""
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    out = np.full(n, np.nan)
+    if window > n:
+        return out
+    if window == 1:
+        return values.copy()
+    fill = -np.inf if func is np.maximum else np.inf
+    blocks = -(-n // window)
+    padded = np.full(blocks * window, fill)
+    padded[:n] = values
+    grid = padded.reshape(blocks, window)
+    prefix = func.accumulate(grid, axis=1).ravel()
+    suffix = func.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+    starts = np.arange(n - window + 1)
+    out[window - 1:] = func(suffix[starts], prefix[starts + window - 1])
+    return out
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing window maximum"""
+    return _rolling_extreme(values, window, np.maximum)
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing window minimum"""
+    return _rolling_extreme(values, window, np.minimum)
+
+
+def detect_breakout(bars: Dict[str, np.ndarray]) -> np.ndarray:
+    """Close 2% above the high of the 15 bars ending 5 bars ago"""
+    prior_high = _shift(rolling_max(bars['high'], 15), 5)
+    with np.errstate(invalid='ignore'):
+        return bars['close'] > prior_high * 1.02
+
+
+def detect_flag(bars: Dict[str, np.ndarray]) -> np.ndarray:
+    """Strong 10-bar rise (pole) followed by a flat 10-bar consolidation"""
+    slope = rolling_slope(bars['close'], 10)
+    pole = _shift(slope, 10)
+    with np.errstate(invalid='ignore'):
+        return (pole > 0.5) & (np.abs(slope) < 0.1)
+
+
+def detect_ascending_triangle(bars: Dict[str, np.ndarray]) -> np.ndarray:
+    """Rising lows against flat highs over 20 bars"""
+    low_trend = rolling_slope(bars['low'], 20)
+    high_std = rolling_std(bars['high'], 20)
+    high_mean = rolling_mean(bars['high'], 20)
+    with np.errstate(invalid='ignore'):
+        return (low_trend > 0) & (high_std < high_mean * 0.02)
+
+
+def detect_cup_and_handle(bars: Dict[str, np.ndarray], cup: int = 39, handle: int = 10) -> np.ndarray:
+    """Rounded 12-35% cup that recovers its left rim, then a shallow handle near the rim"""
+    third = cup // 3
+    left_rim = _shift(rolling_max(bars['high'], third), handle + 2 * third)
+    bottom = _shift(rolling_min(bars['low'], third), handle + third)
+    right_rim = _shift(rolling_max(bars['high'], third), handle)
+    handle_high = rolling_max(bars['high'], handle)
+    handle_low = rolling_min(bars['low'], handle)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        depth = (left_rim - bottom) / left_rim
+        cup_formed = (depth >= 0.12) & (depth <= 0.35) & (right_rim >= left_rim * 0.95)
+        shallow_handle = (handle_low >= bottom + 0.5 * (right_rim - bottom)) & (handle_high <= right_rim * 1.05)
+        at_rim = bars['close'] >= right_rim * 0.97
+        return cup_formed & shallow_handle & at_rim
+
+
+def detect_momentum_surge(bars: Dict[str, np.ndarray]) -> np.ndarray:
+    """8%+ move in 5 bars on 1.5x average volume while above the 20-bar average"""
+    close = np.asarray(bars['close'], dtype=float)
+    prior_volume = _shift(rolling_mean(bars['volume'], 20), 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change_5 = close / _shift(close, 4) - 1
+        return ((change_5 >= 0.08) & (bars['volume'] >= prior_volume * 1.5)
+                & (close > rolling_mean(close, 20)))
+
+
+PATTERN_DETECTORS = {
+    'breakout': detect_breakout,
+    'flag': detect_flag,
+    'ascending_triangle': detect_ascending_triangle,
+    'cup_and_handle': detect_cup_and_handle,
+    'momentum_surge': detect_momentum_surge
+}
+
+
+def _as_panel(bars: Dict) -> Dict[str, np.ndarray]:
+    panel = {key: np.asarray(bars[key], dtype=float) for key in ('high', 'low', 'close', 'volume')}
+    panel['date'] = list(bars.get('date', []))
+    return panel
+
+
+def detect_patterns(bars: Dict, patterns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """Run each requested detector over the full bar panel"""
+    panel = _as_panel(bars)
+    signals = {}
+    for name in patterns or PATTERN_PRIORITY:
+        detector = PATTERN_DETECTORS.get(name)
+        if detector is None:
+            logger.debug(f"Unknown pattern '{name}' - skipping")
+            continue
+        signals[name] = detector(panel)
+    return signals
+
+
+def pattern_events(bars: Dict, patterns: Optional[List[str]] = None) -> List[Dict]:
+    """Every (pattern, bar) firing in the panel, in bar order"""
+    dates = list(bars.get('date', []))
+    events = []
+    for name, fired in detect_patterns(bars, patterns).items():
+        for index in np.flatnonzero(fired):
+            events.append({
+                'pattern': name,
+                'index': int(index),
+                'date': dates[index] if index < len(dates) else None
+            })
+    events.sort(key=lambda e: (e['index'], PATTERN_PRIORITY.index(e['pattern'])))
+    return events
@@ -15,8 +15,9 @@ logger = logging.getLogger(__name__)
 class PortfolioManager:
     """Manages portfolio positions and tracks performance"""
     
-    def __init__(self, config, portfolio_file: str = 'data/portfolio.json'):
+    def __init__(self, config, portfolio_file: str = 'data/portfolio.json', data_fetcher=None):
         self.config = config
+        self.data_fetcher = data_fetcher
         self.portfolio_file = portfolio_file
         self.initial_capital = 100000  # $100k starting capital
         self.positions = self._load_portfolio()
@@ -43,20 +44,15 @@ class PortfolioManager:
         with open(self.portfolio_file, 'w') as f:
             json.dump(self.positions, f, indent=2, default=str)
     
-    def open_position(self, signal: Dict) -> bool:
-        """Open a new position based on signal"""
+    def open_position(self, signal: Dict, contracts: Optional[int] = None) -> bool:
+        """Open a new position based on signal (sized from the portfolio unless contracts is given)"""
         try:
-            # Calculate position size
-            position_size = self._calculate_position_size(signal)
-            if position_size == 0:
+            if contracts is None:
+                contracts = self._contracts_for(signal)
+            if contracts == 0:
                 logger.warning(f"Position size is 0 for {signal['symbol']}")
                 return False
                 
-            # Calculate cost
-            contracts = position_size // 100  # Each contract is 100 shares
-            if contracts == 0:
-                contracts = 1
-                
             total_cost = contracts * 100 * signal['entry_price']
             
             # Check if we have enough cash
@@ -111,6 +107,14 @@ class PortfolioManager:
             logger.error(f"Error opening position: {e}")
             return False
     
+    def _contracts_for(self, signal: Dict) -> int:
+        """Contracts to buy for a signal (0 if the sizing rules allow none)"""
+        position_size = self._calculate_position_size(signal)
+        if position_size == 0:
+            return 0
+        # Each contract is 100 shares
+        return max(int(position_size // 100), 1)
+    
     def close_position(self, symbol: str, exit_price: float, reason: str) -> bool:
         """Close an existing position"""
         try:
@@ -170,15 +174,51 @@ class PortfolioManager:
             return False
     
     def roll_position(self, symbol: str, new_strike: float, new_expiration: str, current_price: float) -> bool:
-        """Roll a position to new strike/expiration"""
+        """Roll a position to new strike/expiration; the old leg is sold only once the new one can be bought"""
         try:
-            # Close current position
-            if self.close_position(symbol, current_price, "Rolling position"):
-                # Open new position with rolled parameters
-                # This would need proper option chain lookup in real implementation
-                logger.info(f"Position rolled: {symbol} to ${new_strike}C exp {new_expiration}")
-                return True
-            return False
+            position = next((pos for pos in self.get_open_positions() if pos['symbol'] == symbol), None)
+            if position is None:
+                logger.warning(f"No open position found for {symbol}")
+                return False
+            
+            # Price the new leg off the cached vol surface before touching the old one
+            quote = None
+            if self.data_fetcher is not None:
+                quote = self.data_fetcher.price_from_surface(symbol, new_strike, new_expiration)
+            if quote is None or quote['price'] <= 0:
+                logger.warning(f"Cannot price {symbol} ${new_strike}C exp {new_expiration} without a vol surface "
+                               f"- position not rolled")
+                return False
+            
+            entry_price = round(quote['price'], 2)
+            signal = dict(quote)
+            signal.update({
+                'entry_price': entry_price,
+                'stop_loss': entry_price * (1 - self.config.trading.stop_loss_percent),
+                'take_profit': entry_price * (1 + self.config.trading.take_profit_percent)
+            })
+            
+            # Size the new leg and check it is affordable with the close proceeds
+            contracts = self._contracts_for(signal)
+            if contracts == 0:
+                logger.warning(f"Position size is 0 for the {symbol} roll - position not rolled")
+                return False
+            total_cost = contracts * 100 * entry_price
+            available = self.cash + position['contracts'] * 100 * current_price
+            if total_cost > available:
+                logger.warning(f"Insufficient cash to roll {symbol}. Need ${total_cost:.2f}, "
+                               f"have ${available:.2f} after closing - position not rolled")
+                return False
+            
+            if not self.close_position(symbol, current_price, "Rolling position"):
+                return False
+            if not self.open_position(signal, contracts):
+                logger.error(f"Closed {symbol} to roll but could not open ${new_strike}C exp {new_expiration} "
+                             f"- no position held")
+                return False
+            logger.info(f"Position rolled: {symbol} to ${new_strike}C exp {new_expiration} "
+                        f"@ ${entry_price:.2f} (surface IV {quote['implied_volatility']:.1%})")
+            return True
             
         except Exception as e:
             logger.error(f"Error rolling position: {e}")
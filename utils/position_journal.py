@@ -0,0 +1,207 @@
+"""
+Append-only store for monitored positions: a compacted JSON snapshot plus a JSONL event journal
+
+Opening, updating or removing a position appends one event line, so a change
+costs O(1) however many positions exist. Every writer appends with a single
+O_APPEND write, so concurrent monitor and scan processes interleave whole
+events instead of overwriting each other's files. Startup replays the
+snapshot and then the journal; refresh() reads only events appended since the
+last read. Every compact_every events the journal is folded into the snapshot
+under a lock file, and another process that finds the lock held just skips
+that round.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from .run_journal import json_default
+
+logger = logging.getLogger(__name__)
+
+
+STALE_LOCK_SECONDS = 60  # a compaction lock this old was left by a crashed process
+
+
+class PositionJournal:
+    """Monitored positions by id, kept in sync with the snapshot and journal on disk"""
+
+    def __init__(self, snapshot_path: Path = Path("data/monitored_positions.json"), compact_every: int = 500):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_suffix('.journal.jsonl')
+        self.lock_path = self.snapshot_path.with_suffix('.lock')
+        self.compact_every = compact_every
+        self.positions: Dict[str, Dict] = {}
+        self.pending_events = 0  # journal events not yet folded into the snapshot
+        self._offset = 0
+        self._journal_id = None
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self, wait: bool = True):
+        """Replay the snapshot, any segment a compaction has not finished folding in, then the journal"""
+        if wait:
+            self._wait_for_compaction()
+        with self._lock:
+            self.positions.clear()
+            self.pending_events = 0
+            try:
+                if self.snapshot_path.exists():
+                    with open(self.snapshot_path, 'r') as f:
+                        self.positions.update(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Error loading position snapshot {self.snapshot_path}: {e}")
+            for segment in sorted(self.snapshot_path.parent.glob(f"{self.journal_path.name}.*.compacting")):
+                self._replay(segment)
+            self._offset = 0
+            self._journal_id = self._file_id()
+            self._offset = self._replay(self.journal_path)
+
+    def refresh(self):
+        """Apply events other processes appended since the last read (full reload after a compaction)"""
+        with self._lock:
+            rotated = self._file_id() != self._journal_id
+            if not rotated:
+                try:
+                    rotated = self.journal_path.stat().st_size < self._offset
+                except FileNotFoundError:
+                    rotated = self._offset > 0
+        if rotated:
+            self.load()
+            return
+        with self._lock:
+            self._offset = self._replay(self.journal_path, self._offset)
+
+    def _wait_for_compaction(self, timeout: float = 2.0):
+        # Mid-compaction the snapshot and segment can both be one step behind; give it a moment
+        deadline = time.time() + timeout
+        while self.lock_path.exists() and time.time() < deadline:
+            time.sleep(0.02)
+
+    def _file_id(self) -> Optional[int]:
+        try:
+            return self.journal_path.stat().st_ino
+        except FileNotFoundError:
+            return None
+
+    def _replay(self, path: Path, offset: int = 0) -> int:
+        """Apply complete event lines from offset on; returns the offset after the last one"""
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return offset
+        # A line without its newline is still being written (or was torn by a crash)
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._apply(json.loads(line))
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                logger.debug(f"Skipping bad position event in {path}: {e}")
+                continue
+            self.pending_events += 1
+        return offset + end
+
+    def _apply(self, event: Dict):
+        kind, position_id = event['type'], event['id']
+        if kind == 'open':
+            self.positions[position_id] = event['position']
+        elif kind == 'update':
+            if position_id in self.positions:
+                self.positions[position_id].update(event['fields'])
+        elif kind == 'remove':
+            self.positions.pop(position_id, None)
+
+    def _append(self, event: Dict):
+        line = (json.dumps(event, default=json_default, separators=(',', ':')) + '\n').encode()
+        with self._lock:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            if self._torn_tail():
+                # Terminate a half-written event left by a crashed writer
+                line = b'\n' + line
+            fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        # Read the event back in file order, together with anything other processes appended
+        self.refresh()
+        if self.pending_events >= self.compact_every:
+            self.compact()
+
+    def _torn_tail(self) -> bool:
+        try:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return False
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b'\n'
+        except FileNotFoundError:
+            return False
+
+    def open(self, position_id: str, position: Dict):
+        self._append({'type': 'open', 'id': position_id, 'position': position, 'time': time.time()})
+
+    def update(self, position_id: str, **fields):
+        self._append({'type': 'update', 'id': position_id, 'fields': fields, 'time': time.time()})
+
+    def remove(self, position_id: str):
+        self._append({'type': 'remove', 'id': position_id, 'time': time.time()})
+
+    def compact(self) -> bool:
+        """Fold the journal into the snapshot; False if another process is compacting"""
+        if not self._acquire():
+            return False
+        try:
+            # New events go to a fresh journal while this segment is folded in
+            segment = self.journal_path.with_name(f"{self.journal_path.name}.{os.getpid()}.compacting")
+            try:
+                os.replace(self.journal_path, segment)
+            except FileNotFoundError:
+                return True
+            self.load(wait=False)  # snapshot + segment (+ anything already in the fresh journal)
+            with self._lock:
+                snapshot = {position_id: position for position_id, position in self.positions.items()}
+            temporary = self.snapshot_path.with_suffix('.json.tmp')
+            with open(temporary, 'w') as f:
+                json.dump(snapshot, f, default=json_default, separators=(',', ':'))
+            os.replace(temporary, self.snapshot_path)
+            segment.unlink()
+            # The fresh journal's events are now also in the snapshot; replaying them again is harmless
+            self.load(wait=False)
+            logger.debug(f"Compacted {len(snapshot)} positions into {self.snapshot_path}")
+            return True
+        except OSError as e:
+            logger.warning(f"Error compacting position journal: {e}")
+            return False
+        finally:
+            self._release()
+
+    def _acquire(self) -> bool:
+        try:
+            fd = os.open(self.lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - self.lock_path.stat().st_mtime > STALE_LOCK_SECONDS:
+                    self.lock_path.unlink()
+                    return self._acquire()
+            except FileNotFoundError:
+                return self._acquire()
+            return False
+
+    def _release(self):
+        try:
+            self.lock_path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,54 @@
+"""
+Streaming top-K ranking of scored option contracts
+"""
+
+import heapq
+import itertools
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def best_of(recommendations: Iterable[Dict], key: str = 'score') -> List[Dict]:
+    """The one recommendation TopKRanker would keep from a symbol's list, as a list (empty if none scored)"""
+    scored = [recommendation for recommendation in recommendations if recommendation.get(key) is not None]
+    # max() returns the first of equal scores, like the ranker's tie rule
+    return [max(scored, key=lambda recommendation: recommendation[key])] if scored else []
+
+
+class TopKRanker:
+    """Keeps the best-scoring contract per symbol as results stream in"""
+
+    def __init__(self, k: int = 10, key: str = 'score'):
+        self.k = k
+        self.key = key
+        self.best = {}
+        self.offered = 0
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.best)
+
+    def offer(self, recommendation: Dict) -> bool:
+        """Consider one scored contract; returns True if it is now its symbol's best"""
+        self.offered += 1
+        score = recommendation.get(self.key)
+        if score is None:
+            return False
+        symbol = recommendation['symbol']
+        current = self.best.get(symbol)
+        # Ties keep the earlier contract, matching a stable sort by score
+        if current is not None and score <= current[0]:
+            return False
+        self.best[symbol] = (score, -next(self._sequence), recommendation)
+        return True
+
+    def offer_all(self, recommendations: Iterable[Dict]):
+        for recommendation in recommendations:
+            self.offer(recommendation)
+
+    def top(self, n: Optional[int] = None) -> List[Dict]:
+        """Current top n symbols' best contracts, highest score first"""
+        entries = heapq.nlargest(n or self.k, self.best.values(), key=lambda entry: entry[:2])
+        return [recommendation for _, _, recommendation in entries]
@@ -0,0 +1,123 @@
+"""
+Compact record types for option contracts and recommendations
+
+Contracts and recommendations are __slots__ objects instead of dicts, and a
+recommendation references its contract rather than copying it. Both keep a
+dict-style interface (rec['strike'], rec.get(...), 'analysis' in rec,
+dict(rec)) so display, ranking, journaling and monitoring code is unchanged.
+Fields that were never set behave like missing dict keys.
+"""
+
+import logging
+from typing import Any, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+class Record:
+    """Base for slotted records with a dict-compatible interface"""
+
+    FIELDS = ()
+    __slots__ = ('_extra',)
+
+    def __init__(self, **fields):
+        self._extra = None
+        for key, value in fields.items():
+            self[key] = value
+
+    def _own(self, key: str) -> Any:
+        if key in self.FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def _own_keys(self) -> List[str]:
+        keys = [key for key in self.FIELDS if hasattr(self, key)]
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def __getitem__(self, key: str) -> Any:
+        return self._own(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            # Rare ad-hoc fields go in a side dict so the common ones stay slotted
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        return self._own_keys()
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def update(self, fields: Dict):
+        for key, value in fields.items():
+            self[key] = value
+
+    def to_dict(self) -> Dict:
+        """Plain dict copy, e.g. for JSON"""
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class OptionContract(Record):
+    """One option contract from a chain"""
+
+    FIELDS = ('symbol', 'type', 'strike', 'expiration', 'days_to_expiration', 'bid', 'ask', 'mid',
+              'last', 'volume', 'open_interest', 'implied_volatility', 'in_the_money',
+              'contract_symbol', 'spread_pct', 'liquidity_score', 'delta', 'theta', 'gamma', 'vega',
+              'iv_percentile', 'iv_rank')
+    __slots__ = FIELDS
+
+
+class Recommendation(Record):
+    """A scored contract; contract fields are read through, never copied"""
+
+    FIELDS = ('score', 'expected_return', 'reason_codes', 'reason_params', 'technical_reasons',
+              'current_stock_price', 'entry_price', 'analysis', 'recommendation_reasons',
+              'probability_of_profit', 'return_p5', 'return_p95')
+    __slots__ = FIELDS + ('contract',)
+
+    def __init__(self, contract, **fields):
+        self.contract = contract
+        super().__init__(**fields)
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._own(key)
+        except KeyError:
+            return self.contract[key]
+
+    def keys(self) -> List[str]:
+        own = self._own_keys()
+        return [key for key in self.contract.keys() if key not in own] + own
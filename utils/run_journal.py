@@ -0,0 +1,148 @@
+"""
+Run journal for checkpointed, resumable scans
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+
+from .records import Record
+
+logger = logging.getLogger(__name__)
+
+
+def json_default(value):
+    """Serialize numpy scalars/arrays, records and other stragglers in journal records"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, Path)):
+        return str(value)
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class RunJournal:
+    """Append-only JSONL journal of one scan's stage results"""
+
+    def __init__(self, path: Path, run_id: str, params: Dict):
+        self.path = Path(path)
+        self.run_id = run_id
+        self.params = params
+        self.stages = {}
+        self.symbols = {}
+        self.completed = False
+        self._torn_tail = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def start(cls, params: Dict, journal_dir: Path = Path("data/runs"), keep: int = 5) -> 'RunJournal':
+        """Begin a new run journal"""
+        journal_dir = Path(journal_dir)
+        journal_dir.mkdir(parents=True, exist_ok=True)
+        cls._prune(journal_dir, keep)
+        run_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        journal = cls(journal_dir / f"scan_{run_id}.jsonl", run_id, params)
+        journal._append({'type': 'start', 'run_id': run_id, 'params': params})
+        logger.info(f"Started scan journal {journal.path}")
+        return journal
+
+    @classmethod
+    def latest_incomplete(cls, journal_dir: Path = Path("data/runs")) -> Optional['RunJournal']:
+        """Load the most recent run if it never completed"""
+        journal = next(cls._newest_first(journal_dir), None)
+        return journal if journal is not None and not journal.completed else None
+
+    @classmethod
+    def latest_completed(cls, journal_dir: Path = Path("data/runs")) -> Optional['RunJournal']:
+        """Load the most recent run that finished, as a baseline for delta scans"""
+        return next((j for j in cls._newest_first(journal_dir) if j.completed), None)
+
+    @classmethod
+    def _newest_first(cls, journal_dir: Path) -> Iterator['RunJournal']:
+        journal_dir = Path(journal_dir)
+        if not journal_dir.exists():
+            return
+        for path in sorted(journal_dir.glob("scan_*.jsonl"), reverse=True):
+            journal = cls.load(path)
+            if journal is not None:
+                yield journal
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['RunJournal']:
+        """Replay a journal file; a torn final line from a crash is ignored"""
+        journal = None
+        line = '\n'
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.debug(f"Skipping torn record in {path}")
+                    continue
+                kind = record.get('type')
+                if kind == 'start':
+                    journal = cls(path, record['run_id'], record.get('params', {}))
+                elif journal is None:
+                    continue
+                elif kind == 'stage':
+                    journal.stages[record['stage']] = record['result']
+                elif kind == 'symbol':
+                    journal.symbols.setdefault(record['stage'], {})[record['symbol']] = record['result']
+                elif kind == 'complete':
+                    journal.completed = True
+        if journal is not None:
+            journal._torn_tail = not line.endswith('\n')
+        return journal
+
+    @staticmethod
+    def _prune(journal_dir: Path, keep: int):
+        """Drop all but the newest few journals"""
+        journals = sorted(journal_dir.glob("scan_*.jsonl"))
+        for path in journals[:-keep] if keep > 0 else journals:
+            try:
+                path.unlink()
+            except OSError as e:
+                logger.debug(f"Could not remove old journal {path}: {e}")
+
+    def _append(self, record: Dict):
+        with self._lock:
+            with open(self.path, 'a') as f:
+                if self._torn_tail:
+                    # Terminate a half-written record left by a crash
+                    f.write('\n')
+                    self._torn_tail = False
+                f.write(json.dumps(record, default=json_default) + '\n')
+                f.flush()
+
+    def has_stage(self, stage: str) -> bool:
+        return stage in self.stages
+
+    def stage_result(self, stage: str) -> Any:
+        return self.stages.get(stage)
+
+    def record_stage(self, stage: str, result: Any):
+        """Checkpoint a whole-run stage (e.g. the candidate list)"""
+        self.stages[stage] = result
+        self._append({'type': 'stage', 'stage': stage, 'result': result})
+
+    def symbol_results(self, stage: str) -> Dict[str, Any]:
+        """Finished per-symbol results for a stage"""
+        return self.symbols.get(stage, {})
+
+    def record_symbol(self, symbol: str, stage: str, result: Any):
+        """Checkpoint one symbol's result for a stage"""
+        self.symbols.setdefault(stage, {})[symbol] = result
+        self._append({'type': 'symbol', 'stage': stage, 'symbol': symbol, 'result': result})
+
+    def complete(self):
+        """Mark the run finished so it is not resumed"""
+        self.completed = True
+        self._append({'type': 'complete', 'time': datetime.now().isoformat()})
@@ -0,0 +1,136 @@
+"""
+Snapshot of one scan's scoring inputs, for re-ranking without refetching
+
+A snapshot holds the analyzed stocks (quote fields plus technicals) and every
+normalized option chain the scan scored. Chains are stored column-wise, one
+array per field with a mask of contracts that lack it, which pickles far
+smaller than a list of per-contract dicts and rebuilds the same contracts.
+"""
+
+import logging
+import pickle
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .records import OptionContract
+
+logger = logging.getLogger(__name__)
+
+
+def pack_chain(chain: List[Dict]) -> Dict[str, tuple]:
+    """Columnar form of a chain: field -> (values, packed missing mask, length)"""
+    fields = []
+    for contract in chain:
+        for key in contract.keys():
+            if key not in fields:
+                fields.append(key)
+
+    packed = {}
+    for field in fields:
+        missing = np.array([field not in contract for contract in chain], dtype=bool)
+        values = [contract.get(field) for contract in chain]
+        present = [value for value, absent in zip(values, missing) if not absent]
+        if present and all(isinstance(v, (int, np.integer)) and not isinstance(v, (bool, np.bool_)) for v in present):
+            column = np.array([0 if absent else v for v, absent in zip(values, missing)], dtype=np.int64)
+            column = column.astype(np.result_type(np.min_scalar_type(column.min()), np.min_scalar_type(column.max())))
+        elif present and all(isinstance(v, (float, np.floating)) for v in present):
+            column = np.array([0.0 if absent else v for v, absent in zip(values, missing)], dtype=float)
+        else:
+            column = _encode(values)
+        packed[field] = (column, np.packbits(missing), len(chain))
+    return packed
+
+
+def _encode(values: List) -> tuple:
+    """Dictionary-encode a non-numeric column (symbols, expirations, flags repeat a lot)"""
+    uniques, index, codes = [], {}, []
+    for value in values:
+        key = (type(value), value)
+        if key not in index:
+            index[key] = len(uniques)
+            uniques.append(value)
+        codes.append(index[key])
+    return uniques, np.array(codes, dtype=np.min_scalar_type(max(len(uniques) - 1, 0)))
+
+
+def unpack_chain(packed: Dict[str, tuple]) -> List[OptionContract]:
+    """Rebuild the contracts pack_chain() stored"""
+    if not packed:
+        return []
+    size = next(iter(packed.values()))[2]
+    records = [{} for _ in range(size)]
+    for field, (column, missing, _) in packed.items():
+        missing = np.unpackbits(missing, count=size).astype(bool)
+        if isinstance(column, np.ndarray):
+            values = column.tolist()
+        else:
+            uniques, codes = column
+            values = [uniques[code] for code in codes.tolist()]
+        for record, value, absent in zip(records, values, missing):
+            if not absent:
+                record[field] = value
+    return [OptionContract(**record) for record in records]
+
+
+class ScanSnapshot:
+    """Stocks and chains one scan scored; also serves chains back in place of the data fetcher
+
+    During a scan OptionsAnalyzer adds every chain it fetches; for --rerank an
+    OptionsAnalyzer built on a loaded snapshot reads its chains from here, so
+    scoring and ranking run without a single network call.
+    """
+
+    def __init__(self, stocks: Optional[List[Dict]] = None, chains: Optional[Dict[str, Dict]] = None,
+                 created: Optional[str] = None):
+        self.stocks = stocks or []
+        self.chains = chains or {}  # symbol -> pack_chain() columns
+        self.created = created or datetime.now().isoformat()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path = Path("data/cache/scan_snapshot.pkl")) -> Optional['ScanSnapshot']:
+        try:
+            if path.exists():
+                with open(path, 'rb') as f:
+                    state = pickle.load(f)
+                return cls(state['stocks'], state['chains'], state['created'])
+        except Exception as e:
+            logger.warning(f"Error loading scan snapshot: {e}")
+        return None
+
+    def save(self, path: Path = Path("data/cache/scan_snapshot.pkl")):
+        try:
+            with self._lock:
+                state = {'stocks': list(self.stocks), 'chains': dict(self.chains), 'created': self.created}
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            logger.info(f"Saved scan snapshot of {len(state['chains'])} chains to {path}")
+        except Exception as e:
+            logger.warning(f"Error saving scan snapshot: {e}")
+
+    def __len__(self) -> int:
+        return len(self.chains)
+
+    def add_chain(self, symbol: str, chain: List[Dict]):
+        packed = pack_chain(chain)
+        with self._lock:
+            self.chains[symbol] = packed
+
+    def carry_forward(self, previous: Optional['ScanSnapshot'], symbols: List[str]):
+        """Reuse the previous snapshot's chains for symbols this scan did not refetch"""
+        if previous is None:
+            return
+        with self._lock:
+            for symbol in symbols:
+                if symbol not in self.chains and symbol in previous.chains:
+                    self.chains[symbol] = previous.chains[symbol]
+
+    def get_options_chain(self, symbol: str) -> List[OptionContract]:
+        """The stored chain, rebuilt as contracts (DataFetcher.get_options_chain stand-in)"""
+        packed = self.chains.get(symbol)
+        return unpack_chain(packed) if packed else []
@@ -0,0 +1,107 @@
+"""
+Persistent memo of contract scores keyed by contract and a hash of its scoring inputs
+"""
+
+import hashlib
+import logging
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreCache:
+    """Reuses a contract's score fields while its quote, the underlying and the scoring config are unchanged
+
+    A key is the contract plus a digest of every number the scorer reads for it
+    and of the chain-wide context (spot, technicals bonus, scoring settings), so
+    any change in inputs is simply a miss. Entries older than max_age_hours are
+    dropped when the cache is loaded or saved.
+    """
+
+    def __init__(self, path: Path = Path("data/cache/score_cache.pkl"), max_entries: int = 200_000,
+                 max_age_hours: float = 24):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_hours = max_age_hours
+        self.entries = self._prune(self._load())  # key -> (stored at, score fields)
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict:
+        try:
+            if self.path.exists():
+                with open(self.path, 'rb') as f:
+                    return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Error loading score cache: {e}")
+        return {}
+
+    def _prune(self, entries: Dict) -> Dict:
+        cutoff = time.time() - self.max_age_hours * 3600
+        fresh = {key: entry for key, entry in entries.items() if entry[0] >= cutoff}
+        # Insertion order is age order, so the oldest go first when over the cap
+        if len(fresh) > self.max_entries:
+            fresh = dict(list(fresh.items())[-self.max_entries:])
+        return fresh
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            with self._lock:
+                snapshot = self._prune(self.entries)
+                self.entries = snapshot
+                self.dirty = False
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'wb') as f:
+                pickle.dump(snapshot, f)
+        except Exception as e:
+            logger.warning(f"Error saving score cache: {e}")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def keys(contracts: Sequence[Dict], columns: Dict[str, np.ndarray], context) -> List[str]:
+        """One key per contract from its identity, its scoring columns and the chain-wide context"""
+        base = hashlib.blake2b(repr(context).encode(), digest_size=8)
+        rows = np.ascontiguousarray(np.column_stack([columns[name] for name in sorted(columns)]))
+        keys = []
+        for contract, row in zip(contracts, rows):
+            digest = base.copy()
+            digest.update(row.tobytes())
+            identity = contract.get('contract_symbol') or \
+                f"{contract.get('symbol')}_{contract.get('strike')}_{contract.get('expiration')}"
+            keys.append(f"{identity}:{digest.hexdigest()}")
+        return keys
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[Dict]]:
+        with self._lock:
+            found = [self.entries.get(key) for key in keys]
+        fields = [entry[1] if entry is not None else None for entry in found]
+        hits = sum(entry is not None for entry in fields)
+        self.hits += hits
+        self.misses += len(fields) - hits
+        return fields
+
+    def put(self, key: str, fields: Dict):
+        with self._lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (time.time(), fields)
+            self.dirty = True
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
\ No newline at end of file
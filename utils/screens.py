@@ -0,0 +1,166 @@
+"""
+Declarative stock screens compiled to vectorized NumPy masks
+
+A screen is an expression over named fields, e.g.
+
+    rsi < 40 and volume_ratio > 1.2 and market_cap between 1e9 and 1e10
+
+It is parsed once into a tree of NumPy operations and then evaluated over a
+columnar table (dict of field name -> array), so a screen over thousands of
+symbols is a handful of array comparisons. Missing values are NaN and fail
+every comparison; use known(field) to test for presence.
+"""
+
+import ast
+import logging
+import operator
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+_BETWEEN = re.compile(r'([\w.]+)\s+between\s+([-+\w.]+)\s+and\s+([-+\w.]+)', re.IGNORECASE)
+
+_COMPARISONS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne
+}
+
+_ARITHMETIC = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv
+}
+
+
+def _known(values: np.ndarray) -> np.ndarray:
+    if values.dtype == object:
+        return np.array([value is not None for value in values], dtype=bool)
+    return ~np.isnan(values)
+
+
+_FUNCTIONS = {
+    'abs': np.abs,
+    'known': _known,
+    'min': np.minimum,
+    'max': np.maximum
+}
+
+
+def build_columns(records: List[Dict], fields: Iterable[str]) -> Dict[str, np.ndarray]:
+    """Columnar view of the given fields: float arrays with NaN for missing, object arrays for text"""
+    columns = {}
+    for field in fields:
+        values = [record.get(field) for record in records]
+        try:
+            columns[field] = np.array([np.nan if value is None else value for value in values], dtype=float)
+        except (TypeError, ValueError):
+            columns[field] = np.array(values, dtype=object)
+    return columns
+
+
+class Screen:
+    """A screening expression compiled once into a vectorized mask function"""
+
+    def __init__(self, name: str, expression: str, known_fields: Optional[Set[str]] = None):
+        self.name = name
+        self.expression = expression
+        self.fields = set()
+        source = _BETWEEN.sub(r'(\2 <= \1 <= \3)', expression.strip())
+        try:
+            tree = ast.parse(source, mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f"Screen '{name}' is not a valid expression: {e.msg}")
+        self._evaluate = self._compile(tree.body)
+        # A misspelled field would read as all-NaN and silently reject (or under not, pass) everything
+        unknown = self.fields - known_fields if known_fields is not None else set()
+        if unknown:
+            raise ValueError(f"Screen '{name}' uses unknown field(s): {', '.join(sorted(unknown))}")
+
+    def _compile(self, node: ast.AST) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+        """Turn an expression node into a function of the column table"""
+        if isinstance(node, ast.BoolOp):
+            parts = [self._compile(value) for value in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return lambda table: combine.reduce([part(table) for part in parts])
+
+        if isinstance(node, ast.UnaryOp):
+            operand = self._compile(node.operand)
+            if isinstance(node.op, ast.Not):
+                return lambda table: np.logical_not(operand(table))
+            if isinstance(node.op, ast.USub):
+                return lambda table: -operand(table)
+            if isinstance(node.op, ast.UAdd):
+                return operand
+
+        if isinstance(node, ast.Compare):
+            terms = [self._compile(node.left)] + [self._compile(c) for c in node.comparators]
+            ops = []
+            for op in node.ops:
+                if type(op) not in _COMPARISONS:
+                    raise ValueError(f"Screen '{self.name}': unsupported comparison {type(op).__name__}")
+                ops.append(_COMPARISONS[type(op)])
+
+            def compare(table):
+                values = [term(table) for term in terms]
+                return np.logical_and.reduce([op(values[i], values[i + 1]) for i, op in enumerate(ops)])
+            return compare
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+            left, right = self._compile(node.left), self._compile(node.right)
+            op = _ARITHMETIC[type(node.op)]
+            return lambda table: op(left(table), right(table))
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS \
+                and not node.keywords:
+            func = _FUNCTIONS[node.func.id]
+            args = [self._compile(arg) for arg in node.args]
+            return lambda table: func(*[arg(table) for arg in args])
+
+        if isinstance(node, ast.Name):
+            field = node.id
+            self.fields.add(field)
+            return lambda table: table[field]
+
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str, bool)):
+            value = node.value
+            return lambda table: value
+
+        raise ValueError(f"Screen '{self.name}': unsupported syntax {ast.dump(node)[:60]}")
+
+    def mask(self, table: Dict[str, np.ndarray], size: int) -> np.ndarray:
+        """Boolean mask of rows passing the screen"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = self._evaluate(table)
+        return np.broadcast_to(np.asarray(result, dtype=bool), (size,))
+
+    def apply(self, records: List[Dict]) -> np.ndarray:
+        """Evaluate the screen directly over a list of records"""
+        return self.mask(build_columns(records, self.fields), len(records))
+
+
+def compile_screens(definitions: Dict[str, str], known_fields: Optional[Set[str]] = None) -> List[Screen]:
+    """Compile configured screens, skipping (and logging) any that don't parse or read unknown fields"""
+    screens = []
+    for name, expression in (definitions or {}).items():
+        try:
+            screens.append(Screen(name, expression, known_fields))
+        except ValueError as e:
+            logger.error(f"{e} - skipping")
+    return screens
+
+
+def screen_fields(screens: Iterable[Screen]) -> Set[str]:
+    """All fields referenced by a set of screens"""
+    fields = set()
+    for screen in screens:
+        fields |= screen.fields
+    return fields
@@ -0,0 +1,200 @@
+"""
+Bull call debit spread search and scoring over a fetched option chain
+
+For each expiry the chain's calls are sorted by strike and every long leg is
+paired only with the next few higher strikes inside the width bound, so the
+search is O(strikes x max_legs_apart) per expiry. Pairs dominated by a cheaper
+spread with at least the same max profit are pruned before scoring, and the
+survivors are scored with array math on max profit, max loss, breakeven and
+probability of profit. Spreads earn points on the same components and scale as
+single calls (utils/chain_scoring.py), from the position's net Greeks and its
+two-outcome expected return, so the two rank against each other directly.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.stats import norm
+
+from .chain_scoring import point_tiers, weighted_score
+from .iv_solver import RISK_FREE_RATE
+from .records import Record
+
+logger = logging.getLogger(__name__)
+
+
+STRATEGY = 'bull_call_spread'
+
+
+class Spread(Record):
+    """A bull call debit spread; strike/entry_price are the long leg's strike and the net debit"""
+
+    FIELDS = ('symbol', 'type', 'strategy', 'strike', 'short_strike', 'expiration', 'days_to_expiration',
+              'entry_price', 'current_stock_price', 'max_profit', 'max_loss', 'breakeven',
+              'probability_of_profit', 'reward_risk', 'expected_return', 'implied_volatility',
+              'liquidity_score', 'contract_symbol', 'short_contract_symbol', 'score',
+              'recommendation_reasons', 'analysis')
+    __slots__ = FIELDS
+
+
+def candidate_pairs(strike: np.ndarray, ask: np.ndarray, bid: np.ndarray, spot: float,
+                    max_width_pct: float, max_legs_apart: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(long, short) index pairs into one expiry's strike-sorted arrays with a positive debit and profit"""
+    longs, shorts = [], []
+    n = len(strike)
+    for offset in range(1, min(max_legs_apart, n - 1) + 1):
+        long_idx = np.arange(n - offset)
+        short_idx = long_idx + offset
+        debit = ask[long_idx] - bid[short_idx]
+        width = strike[short_idx] - strike[long_idx]
+        ok = (ask[long_idx] > 0) & (bid[short_idx] > 0) & (debit > 0) & (width > debit) & \
+            (width <= spot * max_width_pct)
+        longs.append(long_idx[ok])
+        shorts.append(short_idx[ok])
+    if not longs:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    return np.concatenate(longs), np.concatenate(shorts)
+
+
+def prune_dominated(debit: np.ndarray, max_profit: np.ndarray) -> np.ndarray:
+    """Indices of pairs no cheaper (or equally priced) pair beats on max profit"""
+    order = np.lexsort((-max_profit, debit))
+    best_so_far = np.maximum.accumulate(max_profit[order])
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = max_profit[order][1:] > best_so_far[:-1]
+    return np.sort(order[keep])
+
+
+def _leg_values(contracts: List[Dict], field: str, default: float) -> np.ndarray:
+    """A chain field per contract, with the single-leg scorer's default where it is missing"""
+    return np.array([default if c.get(field) is None else float(c[field]) for c in contracts], dtype=float)
+
+
+def find_spreads(chain: List[Dict], spot: float, technical_bonus: float = 0,
+                 max_width_pct: float = 0.10, max_legs_apart: int = 5,
+                 weights: Optional[Dict[str, float]] = None) -> List[Spread]:
+    """Score the undominated bull call spreads in each expiry of a chain"""
+    expiries = defaultdict(list)
+    for contract in chain:
+        if contract.get('strike'):
+            expiries[contract['expiration']].append(contract)
+
+    spreads = []
+    for expiration, contracts in expiries.items():
+        contracts = sorted(contracts, key=lambda c: c['strike'])
+        strike = np.array([float(c['strike']) for c in contracts])
+        ask = np.nan_to_num(np.array([float(c.get('ask') or 0) for c in contracts]))
+        bid = np.nan_to_num(np.array([float(c.get('bid') or 0) for c in contracts]))
+        long_idx, short_idx = candidate_pairs(strike, ask, bid, spot, max_width_pct, max_legs_apart)
+        if not len(long_idx):
+            continue
+
+        debit = ask[long_idx] - bid[short_idx]
+        max_profit = strike[short_idx] - strike[long_idx] - debit
+        keep = prune_dominated(debit, max_profit)
+        long_idx, short_idx, debit, max_profit = long_idx[keep], short_idx[keep], debit[keep], max_profit[keep]
+
+        days = float(contracts[0]['days_to_expiration'])
+        iv = np.array([float(c.get('implied_volatility') or 0.3) for c in contracts])
+        delta = _leg_values(contracts, 'delta', 0.5)
+        theta = _leg_values(contracts, 'theta', -0.01)
+        gamma = _leg_values(contracts, 'gamma', 0.01)
+        iv_percentile = _leg_values(contracts, 'iv_percentile', 50)
+        metrics = score_spreads(spot, strike[long_idx], debit, max_profit,
+                                (iv[long_idx] + iv[short_idx]) / 2, days,
+                                np.array([min(contracts[l].get('liquidity_score', 0), contracts[s].get('liquidity_score', 0))
+                                          for l, s in zip(long_idx, short_idx)], dtype=float),
+                                technical_bonus,
+                                delta[long_idx] - delta[short_idx], theta[long_idx] - theta[short_idx],
+                                gamma[long_idx] - gamma[short_idx], iv_percentile[long_idx], weights)
+        for i, (l, s) in enumerate(zip(long_idx, short_idx)):
+            long_leg, short_leg = contracts[l], contracts[s]
+            spreads.append(Spread(
+                symbol=long_leg['symbol'],
+                type='CALL_SPREAD',
+                strategy=STRATEGY,
+                strike=long_leg['strike'],
+                short_strike=short_leg['strike'],
+                expiration=expiration,
+                days_to_expiration=long_leg['days_to_expiration'],
+                entry_price=float(debit[i]),
+                current_stock_price=spot,
+                max_profit=float(max_profit[i]),
+                max_loss=float(debit[i]),
+                breakeven=float(metrics['breakeven'][i]),
+                probability_of_profit=float(metrics['probability_of_profit'][i]),
+                reward_risk=float(metrics['reward_risk'][i]),
+                expected_return=float(metrics['expected_return'][i]),
+                implied_volatility=float(iv[l]),
+                liquidity_score=min(long_leg.get('liquidity_score', 0), short_leg.get('liquidity_score', 0)),
+                contract_symbol=long_leg.get('contract_symbol', ''),
+                short_contract_symbol=short_leg.get('contract_symbol', ''),
+                score=float(metrics['score'][i])
+            ))
+    return spreads
+
+
+def score_spreads(spot: float, long_strike: np.ndarray, debit: np.ndarray, max_profit: np.ndarray,
+                  iv: np.ndarray, days: float, liquidity: np.ndarray, technical_bonus: float,
+                  delta: np.ndarray, theta: np.ndarray, gamma: np.ndarray, iv_percentile: np.ndarray,
+                  weights: Optional[Dict[str, float]] = None) -> Dict[str, np.ndarray]:
+    """Breakeven, lognormal probability of profit, expected return and score per spread
+
+    delta, theta and gamma are the net (long minus short) Greeks. The score uses the
+    single-leg components, tiers and weights; the long strike sets moneyness.
+    """
+    years = max(days, 1) / 365.0
+    vol = np.where(iv > 0, iv, 0.3)
+    breakeven = long_strike + debit
+    d2 = (np.log(spot / breakeven) + (RISK_FREE_RATE - 0.5 * vol ** 2) * years) / (vol * np.sqrt(years))
+    probability_of_profit = norm.cdf(d2)
+    reward_risk = max_profit / debit
+    # Two-outcome edge per dollar risked: win max profit or lose the debit
+    expected_return = (probability_of_profit * max_profit - (1 - probability_of_profit) * debit) / debit
+
+    intrinsic = np.clip(spot - long_strike, 0, max_profit + debit)
+    time_value_pct = (debit - intrinsic) / debit * 100
+    tiers = point_tiers(spot / long_strike, np.full(len(debit), float(days)), time_value_pct, delta,
+                        np.abs(theta) / debit, gamma, iv, iv_percentile, expected_return, reward_risk)
+    score = weighted_score(tiers, np.minimum(liquidity / 100 * 20, 20), technical_bonus, weights)
+    return {
+        'breakeven': breakeven,
+        'probability_of_profit': probability_of_profit,
+        'reward_risk': reward_risk,
+        'expected_return': expected_return,
+        'score': score,
+        'tiers': tiers
+    }
+
+
+def explain_spread(spread: Dict) -> Dict:
+    """Render a spread's reasons and analysis in place (no-op if already done)"""
+    if spread.get('analysis') is not None:
+        return spread
+    reasons = [
+        f"Bull call spread ${spread['strike']:.2f}/${spread['short_strike']:.2f} for ${spread['entry_price']:.2f} debit",
+        f"Max profit ${spread['max_profit']:.2f} vs max loss ${spread['max_loss']:.2f} "
+        f"({spread['reward_risk']:.1f}:1)",
+        f"Breakeven ${spread['breakeven']:.2f}, {spread['probability_of_profit']:.0%} probability of profit"
+    ]
+    spread['recommendation_reasons'] = reasons
+    spread['analysis'] = {
+        'total_score': spread['score'],
+        'reasons': reasons,
+        'expected_return': spread['expected_return'],
+        'risk_reward_ratio': spread['reward_risk'],
+        'risk_assessment': 'Low' if spread['probability_of_profit'] > 0.5 else
+        'Medium' if spread['probability_of_profit'] > 0.3 else 'High'
+    }
+    return spread
+
+
+def best_spreads(chain: List[Dict], spot: float, technical_bonus: float = 0, max_width_pct: float = 0.10,
+                 max_legs_apart: int = 5, limit: Optional[int] = 3,
+                 weights: Optional[Dict[str, float]] = None) -> List[Spread]:
+    """Highest-scoring spreads of a chain"""
+    spreads = find_spreads(chain, spot, technical_bonus, max_width_pct, max_legs_apart, weights)
+    spreads.sort(key=lambda spread: spread['score'], reverse=True)
+    return spreads[:limit] if limit else spreads
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Indexed universe snapshot for market-cap, sector and category queries
+"""
+
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class UniverseIndex:
+    """Market-cap-sorted universe with per-sector and per-category posting lists"""
+
+    def __init__(self, stocks: List[Dict], categorize: Callable[[float], str]):
+        rows = []
+        for stock in stocks:
+            market_cap = stock.get('market_cap', 0)
+            try:
+                if isinstance(market_cap, str):
+                    market_cap = float(market_cap.replace(',', ''))
+                    stock['market_cap'] = market_cap
+                rows.append((float(market_cap or 0), len(rows), stock))
+            except ValueError:
+                logger.debug(f"Skipping {stock.get('symbol', '?')}: unparseable market cap {market_cap!r}")
+        rows.sort(key=lambda row: row[0])
+
+        self.stocks = [stock for _, _, stock in rows]
+        self.caps = np.array([cap for cap, _, _ in rows], dtype=float)
+        # Fetch order of each position, so query results keep the source's ranking
+        self.order = np.array([order for _, order, _ in rows], dtype=int)
+        self._categories = {}
+        sectors = defaultdict(list)
+        categories = defaultdict(list)
+        for position, (cap, _, stock) in enumerate(rows):
+            category = categorize(cap)
+            self._categories[stock['symbol']] = category
+            sectors[stock.get('sector') or 'Unknown'].append(position)
+            categories[category].append(position)
+
+        # Postings are in ascending cap order, so each keeps a cap array for bisecting
+        self.sectors = {name: self._posting(positions) for name, positions in sectors.items()}
+        self.categories = {name: self._posting(positions) for name, positions in categories.items()}
+
+    def __len__(self) -> int:
+        return len(self.stocks)
+
+    def _posting(self, positions: List[int]) -> Dict[str, np.ndarray]:
+        positions = np.array(positions, dtype=int)
+        return {'positions': positions, 'caps': self.caps[positions]}
+
+    @staticmethod
+    def _bounds(caps: np.ndarray, min_cap: Optional[float], max_cap: Optional[float]) -> slice:
+        start = 0 if min_cap is None else int(np.searchsorted(caps, min_cap, side='left'))
+        end = len(caps) if max_cap is None else int(np.searchsorted(caps, max_cap, side='right'))
+        return slice(start, max(start, end))
+
+    def _positions(self, min_cap: Optional[float], max_cap: Optional[float],
+                   postings: Iterable[Dict[str, np.ndarray]]) -> np.ndarray:
+        """Positions within a cap band across a union of posting lists"""
+        parts = [posting['positions'][self._bounds(posting['caps'], min_cap, max_cap)] for posting in postings]
+        return np.concatenate(parts) if parts else np.array([], dtype=int)
+
+    def _collect(self, positions: np.ndarray) -> List[Dict]:
+        """Stocks at the given positions, in original fetch order"""
+        positions = positions[np.argsort(self.order[positions], kind='stable')]
+        return [self.stocks[p] for p in positions]
+
+    def cap_range(self, min_cap: Optional[float] = None, max_cap: Optional[float] = None) -> List[Dict]:
+        """Stocks with min_cap <= market cap <= max_cap"""
+        bounds = self._bounds(self.caps, min_cap, max_cap)
+        return self._collect(np.arange(bounds.start, bounds.stop))
+
+    def query(self, min_cap: Optional[float] = None, max_cap: Optional[float] = None,
+              sectors: Optional[Iterable[str]] = None, categories: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Stocks in a cap band, optionally limited to some sectors and/or cap categories"""
+        if sectors is None and categories is None:
+            return self.cap_range(min_cap, max_cap)
+
+        if sectors is not None:
+            positions = self._positions(min_cap, max_cap, [self.sectors[s] for s in sectors if s in self.sectors])
+            if categories is not None:
+                wanted = set(categories)
+                positions = np.array([p for p in positions
+                                      if self._categories[self.stocks[p]['symbol']] in wanted], dtype=int)
+        else:
+            positions = self._positions(min_cap, max_cap,
+                                        [self.categories[c] for c in categories if c in self.categories])
+        return self._collect(positions)
+
+    def category_of(self, symbol: str) -> Optional[str]:
+        """Market cap category resolved when the index was built"""
+        return self._categories.get(symbol)
@@ -0,0 +1,117 @@
+"""
+Per-symbol implied-volatility surface: an SVI smile per expiry plus term structure
+
+Each expiry's calls are fitted with raw SVI total variance
+w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + sigma^2)), k = log(strike / forward).
+Between expiries total variance is interpolated linearly in time at fixed k, so
+IVs, prices and Greeks can be read for any strike and expiry, including ones
+that were never quoted.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy.optimize import least_squares
+from scipy.stats import norm
+
+from .iv_solver import RISK_FREE_RATE
+
+logger = logging.getLogger(__name__)
+
+
+MIN_SLICE_POINTS = 5  # SVI has five parameters; thinner slices get a flat smile
+SVI_LOWER = [0.0, 0.0, -0.999, -1.0, 1e-4]
+SVI_UPPER = [np.inf, 5.0, 0.999, 1.0, 2.0]
+
+
+def svi_total_variance(params: np.ndarray, k: np.ndarray) -> np.ndarray:
+    a, b, rho, m, sigma = params
+    return a + b * (rho * (k - m) + np.sqrt((k - m) ** 2 + sigma ** 2))
+
+
+def fit_svi(k: np.ndarray, total_variance: np.ndarray) -> np.ndarray:
+    """Raw SVI parameters (a, b, rho, m, sigma) for one expiry's log-moneyness/total-variance points"""
+    atm = float(np.median(total_variance))
+    if len(k) < MIN_SLICE_POINTS:
+        return np.array([atm, 0.0, 0.0, 0.0, 0.1])
+    start = np.array([atm * 0.8, 0.1, -0.3, 0.0, 0.1])
+    start = np.clip(start, np.array(SVI_LOWER) + 1e-9, np.array(SVI_UPPER) - 1e-9)
+    fit = least_squares(lambda p: svi_total_variance(p, k) - total_variance, start,
+                        bounds=(SVI_LOWER, SVI_UPPER), method='trf')
+    return fit.x
+
+
+class VolSurface:
+    """Fitted smiles for one symbol, queried by strike and days to expiry"""
+
+    def __init__(self, spot: float, years: np.ndarray, params: np.ndarray, rate: float = RISK_FREE_RATE):
+        self.spot = spot
+        self.years = years      # ascending, one per fitted expiry
+        self.params = params    # (expiries, 5) SVI parameters
+        self.rate = rate
+
+    def total_variance(self, strike: np.ndarray, years: np.ndarray) -> np.ndarray:
+        strike, years = np.broadcast_arrays(np.asarray(strike, dtype=float), np.asarray(years, dtype=float))
+        shape = strike.shape
+        strike, years = strike.ravel(), years.ravel()
+        k = np.log(strike / (self.spot * np.exp(self.rate * years)))
+        slices = np.stack([svi_total_variance(p, k) for p in self.params])  # (expiries, contracts)
+        if len(self.years) == 1:
+            # One expiry: hold its vol flat across time
+            return (slices[0] / self.years[0] * years).reshape(shape)
+
+        right = np.clip(np.searchsorted(self.years, years), 1, len(self.years) - 1)
+        left = right - 1
+        columns = np.arange(len(strike))
+        t0, t1 = self.years[left], self.years[right]
+        w0, w1 = slices[left, columns], slices[right, columns]
+        inside = w0 + (w1 - w0) * (years - t0) / (t1 - t0)
+        # Outside the fitted expiries, keep the nearest slice's vol
+        before = slices[0] / self.years[0] * years
+        after = slices[-1] / self.years[-1] * years
+        variance = np.where(years < self.years[0], before, np.where(years > self.years[-1], after, inside))
+        return variance.reshape(shape)
+
+    def iv(self, strike, days) -> np.ndarray:
+        years = np.maximum(np.asarray(days, dtype=float), 1) / 365.0
+        return np.sqrt(np.maximum(self.total_variance(strike, years), 1e-8) / years)
+
+    def quote(self, strike, days) -> dict:
+        """Black-Scholes value and Greeks of calls priced off the surface (theta per day, vega per vol point)"""
+        strike = np.asarray(strike, dtype=float)
+        years = np.maximum(np.asarray(days, dtype=float), 1) / 365.0
+        vol = self.iv(strike, days)
+        root_t = np.sqrt(years)
+        d1 = (np.log(self.spot / strike) + (self.rate + 0.5 * vol ** 2) * years) / (vol * root_t)
+        d2 = d1 - vol * root_t
+        discount = np.exp(-self.rate * years)
+        return {
+            'implied_volatility': vol,
+            'price': self.spot * norm.cdf(d1) - strike * discount * norm.cdf(d2),
+            'delta': norm.cdf(d1),
+            'gamma': norm.pdf(d1) / (self.spot * vol * root_t),
+            'theta': (-self.spot * norm.pdf(d1) * vol / (2 * root_t)
+                      - self.rate * strike * discount * norm.cdf(d2)) / 365,
+            'vega': self.spot * norm.pdf(d1) * root_t / 100
+        }
+
+
+def fit_surface(spot: float, slices: List[Tuple[int, np.ndarray, np.ndarray]],
+                rate: float = RISK_FREE_RATE) -> Optional[VolSurface]:
+    """Fit a surface from (days to expiry, strikes, IVs) per expiry; NaN IVs are ignored"""
+    years, params = [], []
+    for days, strikes, ivs in sorted(slices, key=lambda s: s[0]):
+        t = max(days, 1) / 365.0
+        usable = np.isfinite(ivs) & (ivs > 0) & np.isfinite(strikes) & (strikes > 0)
+        if not usable.any() or (years and t <= years[-1]):
+            continue
+        k = np.log(strikes[usable] / (spot * np.exp(rate * t)))
+        try:
+            params.append(fit_svi(k, ivs[usable] ** 2 * t))
+            years.append(t)
+        except Exception as e:
+            logger.debug(f"SVI fit failed for {days}d slice: {e}")
+    if not years:
+        return None
+    return VolSurface(spot, np.array(years), np.array(params), rate)